@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Customer, Service, Transaction, TransactionItem
+from .models import User, Customer, Service, Transaction, TransactionItem, DailyRollup
 
 
 @admin.register(User)
@@ -17,14 +17,10 @@ class UserAdmin(BaseUserAdmin):
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
-    list_display = ['name', 'phone', 'email', 'transaction_count', 'created_at']
+    list_display = ['name', 'phone', 'email', 'transaction_count', 'total_spent', 'last_transaction_at', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['name', 'phone', 'email']
-    readonly_fields = ['created_at', 'updated_at']
-    
-    def transaction_count(self, obj):
-        return obj.transactions.count()
-    transaction_count.short_description = 'Jumlah Transaksi'
+    search_fields = ['name', 'phone', 'phone_normalized', 'email']
+    readonly_fields = ['phone_normalized', 'transaction_count', 'total_spent', 'last_transaction_at', 'created_at', 'updated_at']
 
 
 class TransactionItemInline(admin.TabularInline):
@@ -67,3 +63,15 @@ class ServiceAdmin(admin.ModelAdmin):
     list_filter = ['service_type', 'is_active', 'created_at']
     search_fields = ['name']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'cashier', 'transaction_count', 'revenue', 'paid_amount']
+    list_filter = ['date', 'cashier']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,193 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import JsonResponse
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import User
+
+
+class TokenUserCache:
+    """Cache LRU + TTL di memori proses: token -> (snapshot user, token).
+    
+    Entri dihapus saat logout (token dihapus) dan saat user disimpan
+    (password, role, is_active, dll.) lewat signal di signals.py. Perubahan
+    dari proses lain atau lewat queryset.update() baru terlihat setelah TTL.
+    """
+    
+    def __init__(self, max_size=None, ttl=None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (kedaluwarsa, user, token)
+        self._keys_by_user = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def max_size(self):
+        return self._max_size or getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000)
+    
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user, token = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user, token
+    
+    def set(self, key, user, token, generation):
+        """Simpan hasil query; diabaikan jika ada invalidasi sejak `generation` dibaca"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[1].pk)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry[1].pk]
+    
+    def invalidate_token(self, key):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._discard(key)
+    
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+    
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_user.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+token_cache = TokenUserCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication dengan cache token -> user, tanpa query per request saat hit"""
+    
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            generation = token_cache.generation
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token, generation)
+        else:
+            user, token = cached
+        
+        # Salinan per request agar perubahan atribut tidak bocor ke request lain
+        user, token = copy.copy(user), copy.copy(token)
+        token.user = user
+        return user, token
+
+
+STREAM_TICKET_SALT = 'app.authentication.stream_ticket'
+
+
+def issue_stream_ticket(user):
+    """Tiket bertanda tangan berumur pendek (EVENT_STREAM_TICKET_MAX_AGE) untuk membuka stream event.
+    
+    EventSource di browser tidak bisa mengirim header, jadi kredensial ikut di
+    URL; yang dikirim tiket ini, bukan token DRF yang berlaku lama, agar URL
+    yang tercatat di log proxy atau riwayat browser cepat kedaluwarsa.
+    """
+    return signing.dumps(user.pk, salt=STREAM_TICKET_SALT)
+
+
+async def aauthenticate_stream_ticket(ticket):
+    """User aktif pemilik tiket stream; None jika tiket salah atau kedaluwarsa"""
+    try:
+        user_id = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=settings.EVENT_STREAM_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return await User.objects.filter(pk=user_id, is_active=True).afirst()
+
+
+async def aauthenticate(request, stream_ticket=False):
+    """User untuk view async non-DRF (stream event, view ASGI); None jika tidak terautentikasi.
+    
+    Token diterima lewat header Authorization, selain itu sesi. ?ticket= dari
+    issue_stream_ticket hanya diterima jika stream_ticket=True (stream event).
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) == 2 and auth[0].lower() == b'token':
+        try:
+            user, token = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(auth[1].decode())
+        except AuthenticationFailed:
+            return None
+        return user
+    if stream_ticket and request.GET.get('ticket'):
+        return await aauthenticate_stream_ticket(request.GET['ticket'])
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def async_login_required(view_func=None, *, stream_ticket=False):
+    """Decorator view async: 401 seperti DRF jika tidak terautentikasi, selain itu request.user diisi"""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            user = await aauthenticate(request, stream_ticket=stream_ticket)
+            if user is None:
+                response = JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+                response['WWW-Authenticate'] = 'Token'
+                return response
+            request.user = user
+            return await view_func(request, *args, **kwargs)
+        return wrapper
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,118 @@
+"""Cache katalog layanan (Service) berversi untuk layar transaksi baru.
+
+Katalog dimuat sekali per versi: objek Service per id (untuk validasi item
+dan harga saat membuat transaksi) dan hasil ServiceSerializer (untuk list
+API). Versi disimpan di cache Django dan diganti setiap Service disimpan
+atau dihapus (signal di signals.py), sehingga proses yang memakai cache
+bersama (Redis/Memcached) ikut memuat ulang. Dengan LocMemCache bawaan,
+perubahan dari proses lain atau lewat queryset.update() baru terlihat
+setelah SERVICE_CATALOG_TTL.
+"""
+import copy
+import hashlib
+import json
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+
+CATALOG_VERSION_KEY = 'service-catalog-version'
+
+
+class ServiceCatalog:
+    """Snapshot katalog layanan di memori proses, dimuat ulang saat versi berubah"""
+    
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._version = None
+        self._services = {}  # id -> Service
+        self._data = []  # hasil ServiceSerializer, urut service_type, name
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+    
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'SERVICE_CATALOG_TTL', 300)
+    
+    def version(self):
+        version = cache.get(CATALOG_VERSION_KEY)
+        if version is None:
+            # Belum ada (restart/eviction): versi baru, jangan pakai ulang nomor lama
+            cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, self.ttl)
+            version = cache.get(CATALOG_VERSION_KEY)
+        return version
+    
+    def bump(self):
+        """Tandai katalog berubah; dipanggil dari signal Service"""
+        cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, self.ttl)
+    
+    def load(self, version):
+        from .models import Service
+        from .serializers import ServiceSerializer
+        
+        services = list(Service.objects.order_by('service_type', 'name', 'id'))
+        data = json.loads(json.dumps(ServiceSerializer(services, many=True).data))
+        with self._lock:
+            self._version = version
+            self._services = {service.pk: service for service in services}
+            self._data = data
+    
+    def snapshot(self):
+        """(versi, services, data) terbaru; versi dibaca sebelum query agar bump selama load tidak hilang"""
+        version = self.version()
+        with self._lock:
+            if self._version == version:
+                self.hits += 1
+                return self._version, self._services, self._data
+            self.misses += 1
+        self.load(version)
+        with self._lock:
+            return self._version, self._services, self._data
+    
+    def list(self, is_active=None, service_type=None):
+        """Data serializer katalog, difilter seperti ServiceViewSet.get_queryset()"""
+        version, services, data = self.snapshot()
+        if is_active is not None:
+            data = [service for service in data if service['is_active'] == is_active]
+        if service_type:
+            data = [service for service in data if service['service_type'] == service_type]
+        return version, data
+    
+    def get_service(self, pk):
+        """Salinan Service dari katalog, None jika tidak ada"""
+        version, services, data = self.snapshot()
+        service = services.get(pk)
+        return copy.copy(service) if service is not None else None
+    
+    def etag(self, version, params):
+        """ETag kuat: versi katalog + parameter yang memengaruhi isi response"""
+        payload = json.dumps([version, sorted(params.items())])
+        return quote_etag(hashlib.sha256(payload.encode()).hexdigest()[:32])
+    
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+    
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._services = {}
+            self._data = []
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self._version,
+                'size': len(self._services),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+            }
+
+
+service_catalog = ServiceCatalog()
@@ -0,0 +1,267 @@
+"""Stream event real-time transaksi dan dashboard (Server-Sent Events, ASGI).
+
+Signal transaksi dan Transaction.bulk_set_status menerbitkan event setelah
+commit: baris transaksi yang berubah (format list API) dan selisih angka
+dashboard (field dashboard/stats/). Klien menerapkan selisih itu ke data
+yang sudah dimuat, tanpa polling dan tanpa menghitung ulang agregat.
+
+Event dibagikan lewat backend EVENT_BUS_BACKEND. LocalBackend bawaan hanya
+menjangkau koneksi di proses yang sama; deployment dengan beberapa worker
+memerlukan backend bersama (mis. Redis pub/sub) dengan antarmuka yang sama.
+Setiap koneksi menunggu event sebagai coroutine dengan satu asyncio.Queue.
+Handler ASGI Django tetap menyimpan satu thread idle per request yang masih
+berjalan (konteks sync_to_async per request), tetapi ratusan koneksi idle
+per worker tetap murah (lihat benchmarks/event_stream.py).
+"""
+import asyncio
+import itertools
+import threading
+import uuid
+from collections import deque
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .renderers import FastJSONRenderer
+
+
+# Klien tertinggal (antrian penuh atau Last-Event-ID sudah hilang): muat ulang data lewat REST
+RESET_MESSAGE = b'event: reset\ndata: {}\n\n'
+HEARTBEAT_MESSAGE = b': ping\n\n'
+
+_renderer = FastJSONRenderer()
+
+
+class Event:
+    """Satu event dengan payload JSON per proyeksi: None (semua transaksi) dan per id kasir"""
+    
+    def __init__(self, event_type, payloads):
+        self.id = None
+        self.seq = None
+        self.type = event_type
+        self.payloads = payloads
+        self._messages = {}
+    
+    def message(self, cashier_id=None):
+        """Pesan SSE untuk satu proyeksi, dirender sekali untuk semua koneksi"""
+        message = self._messages.get(cashier_id)
+        if message is None:
+            message = self._messages[cashier_id] = b'id: %s\nevent: %s\ndata: %s\n\n' % (
+                self.id.encode(), self.type.encode(), self.payloads[cashier_id],
+            )
+        return message
+
+
+class Subscription:
+    """Antrian pesan satu koneksi stream; `cashier_id` membatasi event untuk kasir"""
+    
+    def __init__(self, loop, cashier_id=None, max_size=100):
+        self.loop = loop
+        self.cashier_id = cashier_id
+        self.queue = asyncio.Queue(max_size)
+        self.overflowed = False
+    
+    def accepts(self, event):
+        return self.cashier_id is None or self.cashier_id in event.payloads
+    
+    def notify(self, event):
+        """Boleh dipanggil dari thread mana pun (view sinkron); RuntimeError jika event loop sudah ditutup"""
+        self.loop.call_soon_threadsafe(self.deliver, event.message(self.cashier_id))
+    
+    def deliver(self, message):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Klien terlalu lambat: antrian dibuang, klien diminta memuat ulang data
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET_MESSAGE)
+    
+    async def get(self, timeout):
+        """Pesan berikutnya, None jika tidak ada event selama `timeout` detik"""
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is RESET_MESSAGE:
+            self.overflowed = False
+        return message
+
+
+class LocalBackend:
+    """Fan-out event ke semua koneksi stream di proses ini"""
+    
+    def __init__(self, history=None, queue_size=None):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._counter = itertools.count(1)
+        self._last_seq = 0
+        # Id event dari proses lain atau sebelum restart tidak bisa dilanjutkan
+        self._prefix = uuid.uuid4().hex[:8]
+        self._history = deque(maxlen=history or getattr(settings, 'EVENT_STREAM_HISTORY', 256))
+        self._queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+    
+    @property
+    def queue_size(self):
+        return self._queue_size or getattr(settings, 'EVENT_STREAM_QUEUE_SIZE', 100)
+    
+    def has_subscribers(self):
+        """Backend bersama antar proses cukup selalu mengembalikan True"""
+        return bool(self._subscriptions)
+    
+    def publish(self, event):
+        with self._lock:
+            event.seq = self._last_seq = next(self._counter)
+            event.id = f'{self._prefix}-{event.seq}'
+            self._history.append(event)
+            subscriptions = [subscription for subscription in self._subscriptions if subscription.accepts(event)]
+            self.published += 1
+        
+        for subscription in subscriptions:
+            try:
+                subscription.notify(event)
+            except RuntimeError:
+                # Event loop koneksi sudah ditutup tanpa sempat berhenti berlangganan
+                self.unsubscribe(subscription)
+        with self._lock:
+            self.delivered += len(subscriptions)
+    
+    def skip(self):
+        """Event yang tidak dibuat karena tidak ada koneksi: klien yang kembali dengan Last-Event-ID lama menerima reset"""
+        with self._lock:
+            self._last_seq = next(self._counter)
+    
+    def subscribe(self, cashier_id=None, last_event_id=None):
+        """Subscription untuk event loop yang sedang berjalan.
+        
+        Dengan `last_event_id`, event yang terlewat sejak id itu diantrikan
+        lebih dulu; jika sudah tidak ada di riwayat, klien menerima `reset`.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), cashier_id, self.queue_size)
+        with self._lock:
+            if last_event_id:
+                missed = self._missed_since(last_event_id)
+                if missed is None:
+                    subscription.deliver(RESET_MESSAGE)
+                else:
+                    for event in missed:
+                        if subscription.accepts(event):
+                            subscription.deliver(event.message(cashier_id))
+            self._subscriptions.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+    
+    def _missed_since(self, last_event_id):
+        prefix, _, seq = last_event_id.partition('-')
+        if prefix != self._prefix or not seq.isdigit():
+            return None
+        seq = int(seq)
+        missed = [event for event in self._history if event.seq > seq]
+        # Ada event sesudah `seq` yang sudah keluar dari riwayat atau tidak pernah disimpan
+        if [event.seq for event in missed] != list(range(seq + 1, self._last_seq + 1)):
+            return None
+        return missed
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscriptions),
+                'history': len(self._history),
+                'published': self.published,
+                'delivered': self.delivered,
+            }
+
+
+class EventBus:
+    """Penerbit event transaksi; backend dipilih lewat EVENT_BUS_BACKEND"""
+    
+    def __init__(self):
+        self._backend = None
+    
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = import_string(getattr(settings, 'EVENT_BUS_BACKEND', 'app.events.LocalBackend'))()
+        return self._backend
+    
+    def publish_transactions(self, event_type, changes):
+        """Terbitkan event setelah commit; `changes` berisi (pk, old, new) dengan dict TRACKED_FIELDS"""
+        changes = list(changes)
+        if changes:
+            db_transaction.on_commit(lambda: self.publish_committed(event_type, changes))
+    
+    def publish_committed(self, event_type, changes):
+        # Tanpa koneksi stream tidak perlu membaca ulang baris transaksi
+        if self.backend.has_subscribers():
+            self.backend.publish(build_transaction_event(event_type, changes))
+        else:
+            self.backend.skip()
+    
+    def subscribe(self, cashier_id=None, last_event_id=None):
+        return self.backend.subscribe(cashier_id, last_event_id)
+    
+    def unsubscribe(self, subscription):
+        self.backend.unsubscribe(subscription)
+    
+    async def stream(self, cashier_id=None, last_event_id=None, heartbeat=None):
+        """Pesan SSE untuk StreamingHttpResponse; berhenti berlangganan saat koneksi ditutup"""
+        heartbeat = heartbeat or getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+        subscription = self.subscribe(cashier_id, last_event_id)
+        try:
+            yield b'retry: 3000\n\n'
+            while True:
+                message = await subscription.get(heartbeat)
+                # Komentar SSE menjaga koneksi idle tetap terbuka di proxy
+                yield message if message is not None else HEARTBEAT_MESSAGE
+        finally:
+            self.unsubscribe(subscription)
+
+
+def build_transaction_event(event_type, changes):
+    """Event untuk perubahan transaksi yang sudah di-commit.
+    
+    Baris transaksi dibaca ulang dengan satu query (jalur list API) agar item
+    yang disimpan setelah post_save ikut terkirim; transaksi yang dihapus
+    hanya dikirim id-nya. Kasir hanya menerima transaksi dan selisih
+    dashboard miliknya sendiri, sama seperti dashboard/stats/.
+    """
+    from .models import Transaction, DailyRollup
+    from .serializers import TransactionReadSerializer
+    
+    pks = [pk for pk, old, new in changes if new]
+    rows = {}
+    if pks:
+        queryset = TransactionReadSerializer.values(Transaction.objects.filter(pk__in=pks))
+        rows = {row['id']: row for row in TransactionReadSerializer(queryset).data}
+    
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    cashier_ids = {values['cashier_id'] for pk, old, new in changes for values in (old, new) if values} - {None}
+    payloads = {}
+    for cashier_id in [None, *cashier_ids]:
+        selected = [
+            (pk, old, new) for pk, old, new in changes
+            if cashier_id is None or cashier_id in {values['cashier_id'] for values in (old, new) if values}
+        ]
+        dashboard = DailyRollup.dashboard_delta([(old, new) for pk, old, new in selected], today, month_start, cashier_id)
+        payloads[cashier_id] = _renderer.render({
+            'type': event_type,
+            'transactions': [rows.get(pk, {'id': pk}) for pk, old, new in selected],
+            # Sama seperti DashboardStatsSerializer: nominal sebagai string desimal
+            'dashboard': {field: str(delta) if isinstance(delta, Decimal) else delta for field, delta in dashboard.items()},
+        })
+    return Event(event_type, payloads)
+
+
+event_bus = EventBus()
@@ -0,0 +1,59 @@
+import csv
+
+from django.utils import timezone
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (judul kolom, field values_list) — satu baris per item transaksi
+EXPORT_COLUMNS = [
+    ('Nomor Invoice', 'invoice_number'),
+    ('Tanggal', 'created_at'),
+    ('Status', 'status'),
+    ('Pelanggan', 'customer__name'),
+    ('Nomor HP', 'customer__phone'),
+    ('Kasir', 'cashier__username'),
+    ('Layanan', 'items__service__name'),
+    ('Jenis Layanan', 'items__service__service_type'),
+    ('Jumlah', 'items__quantity'),
+    ('Harga Satuan', 'items__unit_price'),
+    ('Subtotal', 'items__subtotal'),
+    ('Total Harga', 'total_amount'),
+    ('Diskon', 'discount'),
+    ('Total Bayar', 'final_amount'),
+    ('Jumlah Bayar', 'paid_amount'),
+]
+
+
+class Echo:
+    """Objek file semu: csv.writer langsung mengembalikan baris yang ditulis"""
+    
+    def write(self, value):
+        return value
+
+
+def export_transactions_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Generator baris CSV transaksi untuk StreamingHttpResponse.
+    
+    Header dikirim sebelum query dijalankan; data dibaca bertahap dengan
+    .iterator() sehingga memori tetap datar berapapun jumlah barisnya.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([title for title, _ in EXPORT_COLUMNS])
+    
+    created_at_index = [field for _, field in EXPORT_COLUMNS].index('created_at')
+    rows = (
+        queryset.prefetch_related(None)
+        .values_list(*[field for _, field in EXPORT_COLUMNS])
+        .iterator(chunk_size=chunk_size)
+    )
+    buffer = []
+    for row in rows:
+        row = list(row)
+        row[created_at_index] = timezone.localtime(row[created_at_index]).strftime('%Y-%m-%d %H:%M:%S')
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,21 @@
+"""Handler ASGI yang memakai versi async view jika tersedia.
+
+Di WSGI (runserver, gunicorn sync) view DRF sinkron dipakai seperti biasa.
+Di ASGI Django menjalankan view sinkron lewat sync_to_async, jadi untuk view
+yang terdaftar di app.urls.async_views (nama URL -> view async) handler ini
+memakai versi async dengan async ORM. Parameter, response dan routing baca
+ke replika sama dengan versi sinkronnya.
+"""
+from django.core.handlers.asgi import ASGIHandler
+
+
+class AsyncViewASGIHandler(ASGIHandler):
+    def resolve_request(self, request):
+        from .urls import async_views
+        
+        resolver_match = super().resolve_request(request)
+        async_view = async_views.get(resolver_match.view_name)
+        if async_view is not None:
+            # Unpacking ResolverMatch di BaseHandler memakai atribut func
+            resolver_match.func = async_view
+        return resolver_match
@@ -0,0 +1,171 @@
+"""Render struk A4 (ReportLab) dari dict get_invoice_data().
+
+Modul ini sengaja tidak mengimpor Django: worker pool render massal
+(pdf_utils.render_invoice_batch) dijalankan dengan konteks spawn dan hanya
+memuat modul ini, tanpa django.setup().
+"""
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+
+def render_invoice_pdf(data):
+    """Render struk A4 dari dict get_invoice_data() menjadi bytes PDF"""
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    
+    # Header
+    y_position = height - 50
+    
+    # Judul
+    p.setFont("Helvetica-Bold", 20)
+    p.setFillColor(colors.HexColor('#2563eb'))
+    p.drawCentredString(width / 2, y_position, "LAUNDRY EXPRESS")
+    y_position -= 30
+    
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.HexColor('#64748b'))
+    p.drawCentredString(width / 2, y_position, "Jl. Contoh No. 123, Jakarta")
+    y_position -= 15
+    p.drawCentredString(width / 2, y_position, "Telp: 021-12345678 | Email: info@laundry.com")
+    y_position -= 40
+    
+    # Garis pemisah
+    p.setStrokeColor(colors.HexColor('#e2e8f0'))
+    p.line(50, y_position, width - 50, y_position)
+    y_position -= 30
+    
+    # Informasi Invoice
+    p.setFont("Helvetica-Bold", 12)
+    p.setFillColor(colors.HexColor('#1e293b'))
+    p.drawString(50, y_position, f"INVOICE: {data['invoice_number']}")
+    y_position -= 20
+    
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.HexColor('#475569'))
+    p.drawString(50, y_position, f"Tanggal: {data['received_at']}")
+    y_position -= 20
+    p.drawString(50, y_position, f"Kasir: {data['cashier_name']}")
+    y_position -= 30
+    
+    # Informasi Pelanggan
+    p.setFont("Helvetica-Bold", 11)
+    p.setFillColor(colors.HexColor('#1e293b'))
+    p.drawString(50, y_position, "PELANGGAN:")
+    y_position -= 20
+    
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.HexColor('#475569'))
+    p.drawString(50, y_position, f"Nama: {data['customer_name']}")
+    y_position -= 15
+    p.drawString(50, y_position, f"Telp: {data['customer_phone']}")
+    y_position -= 30
+    
+    # Tabel Items
+    p.setFont("Helvetica-Bold", 11)
+    p.setFillColor(colors.HexColor('#1e293b'))
+    p.drawString(50, y_position, "DETAIL LAYANAN:")
+    y_position -= 25
+    
+    # Header tabel
+    table_data = [['Layanan', 'Jumlah', 'Harga', 'Subtotal']]
+    
+    # Data items
+    for item in data['items']:
+        table_data.append([
+            f"{item['service_name']}",
+            f"{item['quantity']} {item['unit']}",
+            f"Rp {item['unit_price']:,.0f}",
+            f"Rp {item['subtotal']:,.0f}"
+        ])
+    
+    # Buat tabel
+    table = Table(table_data, colWidths=[80*mm, 30*mm, 32*mm, 32*mm])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+        ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+    ]))
+    
+    # Render tabel
+    table_width, table_height = table.wrap(width - 100, height)
+    table.drawOn(p, 50, y_position - table_height)
+    y_position -= table_height + 30
+    
+    # Total
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.HexColor('#475569'))
+    p.drawRightString(width - 50, y_position, f"Subtotal: Rp {data['total_amount']:,.0f}")
+    y_position -= 20
+    
+    if data['discount'] > 0:
+        p.drawRightString(width - 50, y_position, f"Diskon: Rp {data['discount']:,.0f}")
+        y_position -= 20
+    
+    p.setFont("Helvetica-Bold", 12)
+    p.setFillColor(colors.HexColor('#1e293b'))
+    p.drawRightString(width - 50, y_position, f"TOTAL: Rp {data['final_amount']:,.0f}")
+    y_position -= 20
+    
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.HexColor('#475569'))
+    p.drawRightString(width - 50, y_position, f"Bayar: Rp {data['paid_amount']:,.0f}")
+    y_position -= 20
+    
+    kembalian = data['paid_amount'] - data['final_amount']
+    if kembalian > 0:
+        p.drawRightString(width - 50, y_position, f"Kembalian: Rp {kembalian:,.0f}")
+        y_position -= 30
+    
+    # Status
+    y_position -= 20
+    p.setFont("Helvetica-Bold", 10)
+    p.setFillColor(colors.HexColor('#1e293b'))
+    p.drawString(50, y_position, f"Status: {data['status_display']}")
+    
+    if data['estimated_completion']:
+        y_position -= 20
+        p.setFont("Helvetica", 9)
+        p.setFillColor(colors.HexColor('#64748b'))
+        p.drawString(50, y_position, f"Estimasi Selesai: {data['estimated_completion']}")
+    
+    # Catatan
+    if data['notes']:
+        y_position -= 30
+        p.setFont("Helvetica", 9)
+        p.setFillColor(colors.HexColor('#64748b'))
+        p.drawString(50, y_position, f"Catatan: {data['notes']}")
+    
+    # Footer
+    y_position = 80
+    p.setStrokeColor(colors.HexColor('#e2e8f0'))
+    p.line(50, y_position, width - 50, y_position)
+    y_position -= 20
+    
+    p.setFont("Helvetica", 8)
+    p.setFillColor(colors.HexColor('#94a3b8'))
+    p.drawCentredString(width / 2, y_position, "Terima kasih atas kunjungan Anda!")
+    y_position -= 15
+    p.drawCentredString(width / 2, y_position, "Struk ini adalah bukti pembayaran yang sah")
+    
+    # Save PDF
+    p.showPage()
+    p.save()
+    
+    return buffer.getvalue()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Customer
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang statistik transaksi pelanggan (jumlah transaksi, total belanja, transaksi terakhir)'
+
+    def handle(self, *args, **options):
+        updated = Customer.rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Statistik {updated} pelanggan diperbarui'))
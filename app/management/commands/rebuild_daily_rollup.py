@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import DailyRollup
+
+FIELDS = ['transaction_count', 'revenue', 'paid_amount', *DailyRollup.STATUS_FIELDS.values()]
+
+
+class Command(BaseCommand):
+    help = 'Isi ulang rekap harian dari tabel transaksi, atau cek kecocokannya dengan --verify'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Hanya bandingkan rekap dengan data transaksi')
+
+    def handle(self, *args, **options):
+        expected = {(row.date, row.cashier_id): row for row in DailyRollup.compute_from_transactions()}
+
+        if not options['verify']:
+            with transaction.atomic():
+                DailyRollup.objects.all().delete()
+                DailyRollup.objects.bulk_create(expected.values())
+            self.stdout.write(self.style.SUCCESS(f'{len(expected)} baris rekap harian dibuat ulang'))
+            return
+
+        actual = {(row.date, row.cashier_id): row for row in DailyRollup.objects.all()}
+        mismatches = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            want = [getattr(expected[key], f) if key in expected else 0 for f in FIELDS]
+            have = [getattr(actual[key], f) if key in actual else 0 for f in FIELDS]
+            if want != have:
+                mismatches.append(key)
+                self.stdout.write(self.style.ERROR(f'Tidak cocok {key[0]} kasir={key[1]}: rekap={have} transaksi={want}'))
+
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} baris rekap harian tidak cocok')
+        self.stdout.write(self.style.SUCCESS(f'{len(expected)} baris rekap harian cocok'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.search_utils import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang indeks pencarian full-text (FTS5) pelanggan dan transaksi'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Alias database')
+    
+    def handle(self, *args, **options):
+        if not ensure_search_index(options['database']):
+            raise CommandError('Database tidak mendukung FTS5, pencarian memakai LIKE')
+        rebuild_search_index(options['database'])
+        self.stdout.write(self.style.SUCCESS('Indeks pencarian dibangun ulang'))
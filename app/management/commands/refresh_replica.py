@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.routers import refresh_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = 'Salin database utama ke replika baca SQLite (backup API), sekali atau berkala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Ulangi setiap N detik (0 = sekali)')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'READ_REPLICA', None):
+            raise CommandError('READ_REPLICA belum diatur')
+
+        while True:
+            start = time.perf_counter()
+            try:
+                path = refresh_sqlite_replica()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'Replika {path} diperbarui ({time.perf_counter() - start:.2f} detik)'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
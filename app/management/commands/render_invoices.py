@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Transaction
+from app.pdf_utils import get_invoice_data, render_invoice_batch, merge_invoice_pdfs, stream_invoice_zip
+from app.report_utils import parse_date_bound
+
+
+class Command(BaseCommand):
+    help = 'Render struk semua transaksi sesuai filter ke satu PDF gabungan atau file ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File tujuan (.pdf atau .zip)')
+        parser.add_argument('--date-from', help='Tanggal awal (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Tanggal akhir (YYYY-MM-DD, inklusif)')
+        parser.add_argument('--cashier', type=int, help='ID kasir')
+        parser.add_argument('--status', choices=[choice for choice, _ in Transaction.STATUS_CHOICES])
+        parser.add_argument('--workers', type=int, help='Jumlah proses render (default: jumlah CPU)')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not output.endswith(('.pdf', '.zip')):
+            raise CommandError('File tujuan harus berakhiran .pdf atau .zip')
+
+        queryset = Transaction.objects.with_details().order_by('created_at')
+        if options['date_from']:
+            queryset = queryset.filter(created_at__gte=parse_date_bound(options['date_from']))
+        if options['date_to']:
+            queryset = queryset.filter(created_at__lt=parse_date_bound(options['date_to'], end=True))
+        if options['cashier']:
+            queryset = queryset.filter(cashier_id=options['cashier'])
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        start = time.perf_counter()
+        invoices = [get_invoice_data(transaction) for transaction in queryset]
+        if not invoices:
+            raise CommandError('Tidak ada transaksi yang cocok')
+
+        pdfs = render_invoice_batch(invoices, workers=options['workers'])
+        with open(output, 'wb') as f:
+            if output.endswith('.zip'):
+                for chunk in stream_invoice_zip(invoices, pdfs):
+                    f.write(chunk)
+            else:
+                f.write(merge_invoice_pdfs(pdfs))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'{len(invoices)} struk ditulis ke {output} dalam {elapsed:.2f} s'))
@@ -0,0 +1,91 @@
+try:
+    import brotli
+except ImportError:  # brotli opsional; tanpa paket ini hanya gzip
+    brotli = None
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .routers import mark_recent_write
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+# Stream SSE harus terkirim per event; gzip menahan data di buffer kompresor
+UNCOMPRESSED_TYPES = ('text/event-stream',)
+
+
+class ReplicaStickinessMiddleware:
+    """Setelah request tulis yang berhasil, bacaan user tersebut kembali ke database utama sementara"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        # request.user sudah diisi DRF (autentikasi token) saat view berjalan
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None:
+                mark_recent_write(user)
+        return response
+
+
+def accepted_encodings(header):
+    """Header Accept-Encoding menjadi {encoding: q}"""
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        name, params = name.strip().lower(), params.strip()
+        if not name:
+            continue
+        try:
+            encodings[name] = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            encodings[name] = 0.0
+    return encodings
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Kompresi response JSON/teks (list, laporan, CSV) sesuai Accept-Encoding per request.
+    
+    Brotli dipilih jika klien menerimanya dan paket brotli terpasang, selain
+    itu gzip lewat GZipMiddleware bawaan (termasuk response streaming). PDF,
+    ZIP, stream SSE dan response di bawah `min_length` byte dikirim apa adanya.
+    """
+    min_length = 1024
+    brotli_quality = 5  # kualitas 10-11 terlalu lambat untuk response dinamis
+    
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.has_header('Content-Encoding')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+            or content_type.startswith(UNCOMPRESSED_TYPES)
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+        
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        br, gzip = encodings.get('br', 0), encodings.get('gzip', 0)
+        if brotli is not None and not response.streaming and br > 0 and br >= gzip:
+            return self.compress_brotli(response)
+        if gzip > 0:
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+    
+    def compress_brotli(self, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Sama seperti GZipMiddleware: ETag kuat menjadi lemah setelah isi dikompresi
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
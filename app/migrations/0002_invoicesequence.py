@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:25
+
+from datetime import datetime
+
+from django.db import migrations, models
+
+
+def seed_invoice_sequences(apps, schema_editor):
+    """Isi nomor terakhir per hari dari invoice yang sudah ada"""
+    Transaction = apps.get_model('app', 'Transaction')
+    InvoiceSequence = apps.get_model('app', 'InvoiceSequence')
+    
+    last_numbers = {}
+    for invoice_number in Transaction.objects.values_list('invoice_number', flat=True).iterator():
+        try:
+            _, date_str, num = invoice_number.split('-')
+            date = datetime.strptime(date_str, '%Y%m%d').date()
+            num = int(num)
+        except ValueError:
+            continue
+        last_numbers[date] = max(num, last_numbers.get(date, 0))
+    
+    InvoiceSequence.objects.bulk_create(
+        InvoiceSequence(date=date, last_number=num) for date, num in last_numbers.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Tanggal')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Nomor Terakhir')),
+            ],
+            options={
+                'verbose_name': 'Nomor Urut Invoice',
+                'verbose_name_plural': 'Nomor Urut Invoice',
+            },
+        ),
+        migrations.RunPython(seed_invoice_sequences, migrations.RunPython.noop),
+    ]
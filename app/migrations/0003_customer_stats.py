@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:28
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_customer_stats(apps, schema_editor):
+    Customer = apps.get_model('app', 'Customer')
+    Transaction = apps.get_model('app', 'Transaction')
+
+    stats = Transaction.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+    Customer.objects.update(
+        transaction_count=Coalesce(Subquery(stats.annotate(c=Count('pk')).values('c')), 0),
+        total_spent=Coalesce(Subquery(stats.annotate(s=Sum('final_amount')).values('s')), Value(Decimal('0.00'))),
+        last_transaction_at=Subquery(stats.annotate(m=Max('created_at')).values('m')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_invoicesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='last_transaction_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Transaksi Terakhir'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='total_spent',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Total Belanja'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='transaction_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Jumlah Transaksi'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['total_spent'], name='customer_total_spent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['last_transaction_at'], name='customer_last_trx_idx'),
+        ),
+        migrations.RunPython(backfill_customer_stats, migrations.RunPython.noop),
+    ]
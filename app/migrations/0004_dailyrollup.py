@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:29
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_daily_rollup(apps, schema_editor):
+    Transaction = apps.get_model('app', 'Transaction')
+    DailyRollup = apps.get_model('app', 'DailyRollup')
+
+    statuses = ['diterima', 'dicuci', 'disetrika', 'selesai', 'diambil']
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(date=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values('date', 'cashier_id')
+        .annotate(
+            transaction_count=Count('pk'),
+            revenue=Sum('final_amount'),
+            paid_amount=Sum('paid_amount'),
+            **{f'{status}_count': Count('pk', filter=Q(status=status)) for status in statuses}
+        )
+    )
+    DailyRollup.objects.bulk_create(DailyRollup(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_customer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tanggal')),
+                ('transaction_count', models.PositiveIntegerField(default=0, verbose_name='Jumlah Transaksi')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Omzet')),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Jumlah Bayar')),
+                ('diterima_count', models.PositiveIntegerField(default=0, verbose_name='Diterima')),
+                ('dicuci_count', models.PositiveIntegerField(default=0, verbose_name='Dicuci')),
+                ('disetrika_count', models.PositiveIntegerField(default=0, verbose_name='Disetrika')),
+                ('selesai_count', models.PositiveIntegerField(default=0, verbose_name='Selesai')),
+                ('diambil_count', models.PositiveIntegerField(default=0, verbose_name='Diambil')),
+                ('cashier', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Kasir')),
+            ],
+            options={
+                'verbose_name': 'Rekap Harian',
+                'verbose_name_plural': 'Rekap Harian',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'cashier'), name='daily_rollup_date_cashier_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:53
+
+from django.db import migrations, models
+
+from app.phone_utils import normalize_phone
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    Customer = apps.get_model('app', 'Customer')
+
+    customers = []
+    for customer in Customer.objects.only('id', 'phone').iterator(chunk_size=2000):
+        customer.phone_normalized = normalize_phone(customer.phone)
+        customers.append(customer)
+    Customer.objects.bulk_update(customers, ['phone_normalized'], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='Nomor HP (E.164)'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_normalized'], name='customer_phone_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['updated_at'], name='customer_updated_idx'),
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+    ]
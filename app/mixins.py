@@ -0,0 +1,110 @@
+import hashlib
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Subquery
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """GET bersyarat (ETag/Last-Modified) untuk list dan detail ViewSet.
+    
+    Validator dihitung dengan satu query agregat dari queryset yang sudah
+    difilter: COUNT(*) dan MAX dari setiap field di `conditional_fields`
+    (mode cursor: id dan field tersebut dari baris di halaman yang diminta).
+    Jika klien masih punya versi yang sama, response 304 dikirim tanpa
+    mengambil baris dan tanpa serialisasi.
+    
+    Field di `conditional_fields` harus ikut berubah setiap kali data yang
+    diserialisasi berubah. Untuk data relasi yang ikut ditampilkan, daftarkan
+    modelnya di `conditional_models`: updated_at terbaru seluruh tabel itu
+    ikut masuk validator sebagai subquery skalar di query yang sama (cukup
+    satu lookup index per model, tanpa JOIN per baris).
+    Last-Modified hanya untuk detail: penghapusan baris tidak menggeser
+    MAX(updated_at), sehingga list cukup memakai ETag (yang memuat COUNT).
+    """
+    conditional_fields = ['updated_at']
+    conditional_models = []
+    
+    def related_timestamps(self):
+        """updated_at terbaru setiap model di `conditional_models` sebagai subquery skalar"""
+        return {
+            f'related_{index}': Subquery(model.objects.order_by('-updated_at').values('updated_at')[:1])
+            for index, model in enumerate(self.conditional_models)
+        }
+    
+    def conditional_values(self, queryset):
+        """(identitas isi response, daftar timestamp); identitas None jika kosong"""
+        related = self.related_timestamps()
+        paginator = self.paginator
+        if getattr(paginator, 'cursor_query_param', None) in self.request.query_params:
+            # Mode cursor sengaja tanpa COUNT(*): cukup (id, field) baris di halaman ini
+            rows = paginator.paginate_queryset(
+                queryset.annotate(**related).values_list('pk', *self.conditional_fields, *related),
+                self.request, view=self,
+            )
+            if not rows:
+                return None, []
+            width = 1 + len(self.conditional_fields)
+            timestamps = [value for row in rows for value in row[1:width]] + list(rows[0][width:])
+            return [[row[:width] for row in rows], paginator.count], timestamps
+        
+        aggregates = {f'max_{index}': Max(field) for index, field in enumerate(self.conditional_fields)}
+        aggregates.update({name: Max(expression) for name, expression in related.items()})
+        values = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+        if not values['count']:
+            return None, []
+        return values['count'], [values[name] for name in aggregates]
+    
+    def conditional_validators(self, queryset):
+        identity, timestamps = self.conditional_values(queryset)
+        if identity is None:
+            return None, None
+        timestamps = [value for value in timestamps if value is not None]
+        params = sorted(self.request.query_params.lists())
+        payload = json.dumps([
+            queryset.model._meta.label, self.request.user.pk, params, identity, timestamps,
+        ], default=str)
+        etag = quote_etag(hashlib.sha256(payload.encode()).hexdigest()[:32])
+        # Last-Modified hanya sampai detik; perubahan di detik yang sama tertangkap ETag
+        return etag, int(max(timestamps).timestamp()) if timestamps else None
+    
+    def conditional_response(self, request, queryset, response_func, last_modified=True):
+        etag, modified = self.conditional_validators(queryset)
+        if etag is None:
+            return response_func()
+        if not last_modified:
+            modified = None
+        
+        # Klien sudah punya versi yang sama
+        conditional = get_conditional_response(request, etag=etag, last_modified=modified)
+        if conditional is not None:
+            return conditional
+        
+        response = response_func()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified)
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            last_modified=False,
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, DjangoValidationError):
+            # pk tidak valid (mis. 'abc'): 404 seperti get_object_or_404 DRF
+            raise Http404
+        return self.conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
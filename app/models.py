@@ -1,8 +1,13 @@
-from django.db import models
+from django.db import models, IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from decimal import Decimal
 
+from .events import event_bus
+from .phone_utils import normalize_phone
+
 
 # Custom User Model dengan multi-role
 class User(AbstractUser):
@@ -20,6 +25,10 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Validator GET bersyarat transaksi (nama kasir ikut ditampilkan)
+            models.Index(fields=['updated_at'], name='user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -29,8 +38,15 @@ class User(AbstractUser):
 class Customer(models.Model):
     name = models.CharField(max_length=200, verbose_name='Nama')
     phone = models.CharField(max_length=20, verbose_name='Nomor HP', unique=True)
+    phone_normalized = models.CharField(max_length=20, blank=True, editable=False, verbose_name='Nomor HP (E.164)')
     address = models.TextField(blank=True, null=True, verbose_name='Alamat')
     email = models.EmailField(blank=True, null=True, verbose_name='Email')
+    
+    # Statistik transaksi (diperbarui otomatis lewat signal, lihat signals.py)
+    transaction_count = models.PositiveIntegerField(default=0, verbose_name='Jumlah Transaksi')
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Belanja')
+    last_transaction_at = models.DateTimeField(blank=True, null=True, verbose_name='Transaksi Terakhir')
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -38,9 +54,56 @@ class Customer(models.Model):
         verbose_name = 'Pelanggan'
         verbose_name_plural = 'Pelanggan'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='customer_created_idx'),
+            models.Index(fields=['total_spent'], name='customer_total_spent_idx'),
+            models.Index(fields=['last_transaction_at'], name='customer_last_trx_idx'),
+            models.Index(fields=['phone_normalized'], name='customer_phone_norm_idx'),
+            models.Index(fields=['updated_at'], name='customer_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.phone}"
+    
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_normalized'}
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def add_transaction_stats(cls, customer_id, amount, created_at, count=1):
+        """Tambahkan transaksi ke statistik pelanggan (`count` transaksi dengan total `amount`, terbaru `created_at`)"""
+        cls.objects.filter(pk=customer_id).update(
+            transaction_count=F('transaction_count') + count,
+            total_spent=F('total_spent') + amount,
+            last_transaction_at=Greatest(Coalesce('last_transaction_at', Value(created_at)), Value(created_at)),
+            updated_at=timezone.now(),
+        )
+    
+    @classmethod
+    def remove_transaction_stats(cls, customer_id, amount):
+        """Kurangi satu transaksi dari statistik pelanggan"""
+        last_transaction = Transaction.objects.filter(customer=OuterRef('pk')).order_by('-created_at')
+        cls.objects.filter(pk=customer_id).update(
+            transaction_count=F('transaction_count') - 1,
+            total_spent=F('total_spent') - amount,
+            last_transaction_at=Subquery(last_transaction.values('created_at')[:1]),
+            updated_at=timezone.now(),
+        )
+    
+    @classmethod
+    def rebuild_stats(cls, queryset=None):
+        """Hitung ulang statistik dari tabel transaksi dengan satu UPDATE"""
+        stats = Transaction.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(
+            transaction_count=Coalesce(Subquery(stats.annotate(c=Count('pk')).values('c')), 0),
+            total_spent=Coalesce(Subquery(stats.annotate(s=Sum('final_amount')).values('s')), Value(Decimal('0.00'))),
+            last_transaction_at=Subquery(stats.annotate(m=Max('created_at')).values('m')),
+            updated_at=timezone.now(),
+        )
 
 
 # Model Layanan/Jenis Service
@@ -64,11 +127,55 @@ class Service(models.Model):
         verbose_name = 'Layanan'
         verbose_name_plural = 'Layanan'
         ordering = ['service_type', 'name']
+        indexes = [
+            # Validator GET bersyarat transaksi (nama layanan item ikut ditampilkan)
+            models.Index(fields=['updated_at'], name='service_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - Rp {self.price_per_unit}/{self.unit}"
 
 
+# Model Nomor Urut Invoice per hari
+class InvoiceSequence(models.Model):
+    date = models.DateField(unique=True, verbose_name='Tanggal')
+    last_number = models.PositiveIntegerField(default=0, verbose_name='Nomor Terakhir')
+    
+    class Meta:
+        verbose_name = 'Nomor Urut Invoice'
+        verbose_name_plural = 'Nomor Urut Invoice'
+    
+    def __str__(self):
+        return f"{self.date} - {self.last_number}"
+    
+    @classmethod
+    def reserve(cls, count=1, date=None):
+        """Reservasi `count` nomor urut berturut-turut untuk satu hari secara atomik"""
+        date = date or timezone.now().date()
+        with db_transaction.atomic():
+            # Satu UPDATE atomik; baris terkunci sampai transaksi selesai
+            updated = cls.objects.filter(date=date).update(last_number=F('last_number') + count)
+            if not updated:
+                try:
+                    with db_transaction.atomic():
+                        cls.objects.create(date=date, last_number=count)
+                except IntegrityError:
+                    # Baris hari ini baru saja dibuat oleh request lain
+                    cls.objects.filter(date=date).update(last_number=F('last_number') + count)
+            last_number = cls.objects.filter(date=date).values_list('last_number', flat=True).get()
+        return range(last_number - count + 1, last_number + 1)
+
+
+class TransactionQuerySet(models.QuerySet):
+    def with_details(self):
+        """Muat pelanggan, kasir dan item (beserta layanan) sekaligus untuk TransactionSerializer"""
+        items = TransactionItem.objects.select_related('service').only(
+            'id', 'transaction_id', 'service_id', 'quantity', 'unit_price', 'subtotal', 'notes',
+            'service__name', 'service__service_type', 'service__unit',
+        )
+        return self.select_related('customer', 'cashier').prefetch_related(Prefetch('items', queryset=items))
+
+
 # Model Transaksi
 class Transaction(models.Model):
     STATUS_CHOICES = [
@@ -80,8 +187,11 @@ class Transaction(models.Model):
     ]
     
     invoice_number = models.CharField(max_length=50, unique=True, verbose_name='Nomor Invoice')
-    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='transactions', verbose_name='Pelanggan')
-    cashier = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='transactions', verbose_name='Kasir')
+    # Kunci dari terminal kasir (header Idempotency-Key atau transactions/sync/): kirim ulang tidak membuat transaksi ganda
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False, verbose_name='Idempotency Key')
+    # Index tunggal FK diganti index komposit (customer/cashier, created_at) di Meta
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='transactions', db_index=False, verbose_name='Pelanggan')
+    cashier = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='transactions', db_index=False, verbose_name='Kasir')
     
     # Informasi transaksi
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Harga')
@@ -102,37 +212,200 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TransactionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Transaksi'
         verbose_name_plural = 'Transaksi'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='transaction_created_idx'),
+            models.Index(fields=['cashier', 'created_at'], name='transaction_cashier_idx'),
+            models.Index(fields=['status', 'created_at'], name='transaction_status_idx'),
+            models.Index(fields=['customer', 'created_at'], name='transaction_customer_idx'),
+            # Validator GET bersyarat: MAX(updated_at) + COUNT(*) (lihat app/mixins.py)
+            models.Index(fields=['updated_at'], name='transaction_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.invoice_number} - {self.customer.name}"
     
+    # Nilai field saat dimuat dari database, dipakai signal untuk menghitung selisih
+    TRACKED_FIELDS = ('customer_id', 'cashier_id', 'status', 'final_amount', 'paid_amount', 'created_at')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+    
+    def snapshot_tracked_fields(self):
+        loaded = self.__dict__
+        self._loaded_values = {field: loaded[field] for field in self.TRACKED_FIELDS if field in loaded}
+    
+    def tracked_values(self):
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+    
+    @staticmethod
+    def generate_invoice_numbers(count, date=None):
+        """Ambil blok nomor invoice baru (INV-YYYYMMDD-NNNN) dari InvoiceSequence"""
+        date = date or timezone.now().date()
+        date_str = date.strftime('%Y%m%d')
+        return [f'INV-{date_str}-{num:04d}' for num in InvoiceSequence.reserve(count, date)]
+    
     def save(self, *args, **kwargs):
         # Generate invoice number jika belum ada
         if not self.invoice_number:
-            date_str = timezone.now().strftime('%Y%m%d')
-            last_transaction = Transaction.objects.filter(
-                invoice_number__startswith=f'INV-{date_str}'
-            ).order_by('-invoice_number').first()
-            
-            if last_transaction:
-                try:
-                    last_num = int(last_transaction.invoice_number.split('-')[-1])
-                    new_num = last_num + 1
-                except:
-                    new_num = 1
-            else:
-                new_num = 1
-            
-            self.invoice_number = f'INV-{date_str}-{new_num:04d}'
+            self.invoice_number = Transaction.generate_invoice_numbers(1)[0]
         
         # Hitung final amount
         self.final_amount = self.total_amount - self.discount
         
-        super().save(*args, **kwargs)
+        # Signal post_save (statistik pelanggan, rekap harian) ikut dalam transaksi yang sama
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    @classmethod
+    def create_with_items(cls, items_data, **fields):
+        """Buat transaksi beserta item-nya: total dihitung di memori, item disimpan dengan satu bulk_create"""
+        items = [TransactionItem(**item_data) for item_data in items_data]
+        for item in items:
+            item.calculate_subtotal()
+        
+        with db_transaction.atomic():
+            transaction = cls(**fields)
+            transaction.total_amount = sum((item.subtotal for item in items), Decimal('0.00'))
+            transaction.save()
+            
+            for item in items:
+                item.transaction = transaction
+            TransactionItem.objects.bulk_create(items)
+        
+        return transaction
+    
+    @classmethod
+    def bulk_create_with_items(cls, entries, cashier):
+        """Simpan antrean transaksi offline sekaligus; hasil per idempotency_key sesuai urutan `entries`.
+        
+        `entries` berisi data tervalidasi TransactionSyncItemSerializer. Kunci
+        yang sudah tersimpan tidak dibuat ulang: hasilnya `existing`, atau
+        `conflict` jika milik kasir lain. Transaksi baru mendapat blok nomor
+        invoice, lalu transaksi dan item masing-masing disimpan dengan satu
+        bulk_create. bulk_create tidak memicu signal, jadi statistik pelanggan,
+        rekap harian dan event stream diperbarui di sini seperti post_save.
+        """
+        try:
+            with db_transaction.atomic():
+                return cls._bulk_create_with_items(entries, cashier)
+        except IntegrityError:
+            # Kiriman yang sama dari request lain lebih dulu commit: kuncinya sekarang `existing`
+            with db_transaction.atomic():
+                return cls._bulk_create_with_items(entries, cashier)
+    
+    @classmethod
+    def _bulk_create_with_items(cls, entries, cashier):
+        keys = [entry['idempotency_key'] for entry in entries]
+        existing = {
+            transaction.idempotency_key: transaction
+            for transaction in cls.objects.filter(idempotency_key__in=keys).only('idempotency_key', 'invoice_number', 'cashier_id')
+        }
+        
+        created = []
+        items = []
+        new_entries = [entry for entry in entries if entry['idempotency_key'] not in existing]
+        numbers = cls.generate_invoice_numbers(len(new_entries)) if new_entries else []
+        for entry, invoice_number in zip(new_entries, numbers):
+            fields = {field: value for field, value in entry.items() if field != 'items'}
+            transaction = cls(**fields, cashier=cashier, invoice_number=invoice_number)
+            transaction_items = [TransactionItem(transaction=transaction, **item_data) for item_data in entry['items']]
+            for item in transaction_items:
+                item.calculate_subtotal()
+            transaction.total_amount = sum((item.subtotal for item in transaction_items), Decimal('0.00'))
+            transaction.final_amount = transaction.total_amount - transaction.discount
+            created.append(transaction)
+            items.extend(transaction_items)
+        
+        if created:
+            cls.objects.bulk_create(created)
+            # transaction_id item diisi dari pk yang dikembalikan bulk_create
+            TransactionItem.objects.bulk_create(items)
+            
+            values = [transaction.tracked_values() for transaction in created]
+            per_customer = {}
+            for row in values:
+                count, amount, last = per_customer.get(row['customer_id'], (0, Decimal('0.00'), row['created_at']))
+                per_customer[row['customer_id']] = (count + 1, amount + row['final_amount'], max(last, row['created_at']))
+            for customer_id, (count, amount, last) in per_customer.items():
+                Customer.add_transaction_stats(customer_id, amount, last, count=count)
+            DailyRollup.record_many((None, row) for row in values)
+            event_bus.publish_transactions('transaction.created', [
+                (transaction.pk, {}, row) for transaction, row in zip(created, values)
+            ])
+            for transaction in created:
+                transaction.snapshot_tracked_fields()
+        
+        transactions = {**existing, **{transaction.idempotency_key: transaction for transaction in created}}
+        results = []
+        for key in keys:
+            transaction = transactions[key]
+            if key in existing and transaction.cashier_id != cashier.pk:
+                results.append({'idempotency_key': key, 'result': 'conflict', 'id': None, 'invoice_number': None})
+            else:
+                results.append({
+                    'idempotency_key': key,
+                    'result': 'existing' if key in existing else 'created',
+                    'id': transaction.pk,
+                    'invoice_number': transaction.invoice_number,
+                })
+        return results
+    
+    @classmethod
+    def is_allowed_transition(cls, old, new):
+        """Alur kerja hanya maju (diterima -> dicuci -> disetrika -> selesai -> diambil), boleh melompati tahap"""
+        flow = [status for status, _ in cls.STATUS_CHOICES]
+        return flow.index(new) > flow.index(old)
+    
+    @classmethod
+    def bulk_set_status(cls, queryset, ids, status):
+        """Ubah status banyak transaksi dengan satu UPDATE; hasil per id.
+        
+        Hasil: updated, unchanged, invalid_transition, atau not_found (tidak
+        ada di `queryset`, mis. transaksi kasir lain). completed_at/taken_at
+        diisi hanya jika masih kosong, sama seperti update_status. UPDATE tidak
+        memicu signal, jadi jumlah per status di rekap harian dan event stream
+        disesuaikan di sini; statistik pelanggan tidak bergantung pada status.
+        """
+        results = dict.fromkeys(ids, 'not_found')
+        now = timezone.now()
+        with db_transaction.atomic():
+            rows = queryset.prefetch_related(None).filter(pk__in=ids).values('pk', *cls.TRACKED_FIELDS)
+            changed = []
+            for row in rows:
+                if row['status'] == status:
+                    results[row['pk']] = 'unchanged'
+                elif cls.is_allowed_transition(row['status'], status):
+                    results[row['pk']] = 'updated'
+                    changed.append(row)
+                else:
+                    results[row['pk']] = 'invalid_transition'
+            
+            if changed:
+                updates = {'status': status, 'updated_at': now}
+                if status == 'selesai':
+                    updates['completed_at'] = Coalesce('completed_at', Value(now))
+                elif status == 'diambil':
+                    updates['taken_at'] = Coalesce('taken_at', Value(now))
+                cls.objects.filter(pk__in=[row['pk'] for row in changed]).update(**updates)
+                DailyRollup.record_many((row, {**row, 'status': status}) for row in changed)
+                event_bus.publish_transactions('transaction.status', [
+                    (row['pk'], row, {**row, 'status': status}) for row in changed
+                ])
+        return results
+    
+    def recalculate_total(self):
+        """Hitung ulang total dari item di database lalu simpan transaksi"""
+        self.total_amount = self.items.aggregate(total=Sum('subtotal'))['total'] or Decimal('0.00')
+        self.save()
 
 
 # Model Item Transaksi (Detail layanan dalam satu transaksi)
@@ -153,11 +426,164 @@ class TransactionItem(models.Model):
     def __str__(self):
         return f"{self.transaction.invoice_number} - {self.service.name}"
     
+    def calculate_subtotal(self):
+        self.subtotal = self.quantity * self.unit_price
+    
     def save(self, *args, **kwargs):
         # Hitung subtotal
-        self.subtotal = self.quantity * self.unit_price
+        self.calculate_subtotal()
         super().save(*args, **kwargs)
         
-        # Update total transaksi
-        self.transaction.total_amount = sum(item.subtotal for item in self.transaction.items.all())
-        self.transaction.save()
+        # Update total transaksi (dipakai saat edit item satu per satu, mis. inline admin)
+        self.transaction.recalculate_total()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.transaction.recalculate_total()
+        return result
+
+
+
+# Model Rekap Harian per kasir (diperbarui otomatis lewat signal, lihat signals.py)
+class DailyRollup(models.Model):
+    STATUS_FIELDS = {status: f'{status}_count' for status, _ in Transaction.STATUS_CHOICES}
+    
+    date = models.DateField(verbose_name='Tanggal')
+    cashier = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='daily_rollups', verbose_name='Kasir')
+    transaction_count = models.PositiveIntegerField(default=0, verbose_name='Jumlah Transaksi')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Omzet')
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Jumlah Bayar')
+    
+    # Jumlah transaksi per status
+    diterima_count = models.PositiveIntegerField(default=0, verbose_name='Diterima')
+    dicuci_count = models.PositiveIntegerField(default=0, verbose_name='Dicuci')
+    disetrika_count = models.PositiveIntegerField(default=0, verbose_name='Disetrika')
+    selesai_count = models.PositiveIntegerField(default=0, verbose_name='Selesai')
+    diambil_count = models.PositiveIntegerField(default=0, verbose_name='Diambil')
+    
+    class Meta:
+        verbose_name = 'Rekap Harian'
+        verbose_name_plural = 'Rekap Harian'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'cashier'], name='daily_rollup_date_cashier_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.cashier_id} ({self.transaction_count} transaksi)"
+    
+    @classmethod
+    def contribution(cls, values, sign=1):
+        """Kontribusi satu transaksi (dict TRACKED_FIELDS) ke baris rekap: (kunci, selisih per field)"""
+        key = (timezone.localdate(values['created_at']), values['cashier_id'])
+        deltas = {
+            'transaction_count': sign,
+            'revenue': sign * values['final_amount'],
+            'paid_amount': sign * values['paid_amount'],
+            cls.STATUS_FIELDS[values['status']]: sign,
+        }
+        return key, deltas
+    
+    @classmethod
+    def record(cls, old=None, new=None):
+        """Terapkan perubahan satu transaksi: `old` dikurangi, `new` ditambahkan"""
+        cls.record_many([(old, new)])
+    
+    @classmethod
+    def record_many(cls, transactions):
+        """Terapkan perubahan banyak transaksi [(old, new), ...]: satu UPDATE per baris rekap"""
+        changes = {}
+        for old, new in transactions:
+            for values, sign in ((old, -1), (new, 1)):
+                if not values:
+                    continue
+                key, deltas = cls.contribution(values, sign)
+                merged = changes.setdefault(key, {})
+                for field, delta in deltas.items():
+                    merged[field] = merged.get(field, 0) + delta
+        
+        for (date, cashier_id), deltas in changes.items():
+            deltas = {field: delta for field, delta in deltas.items() if delta}
+            if deltas:
+                cls.apply(date, cashier_id, deltas)
+    
+    @classmethod
+    def apply(cls, date, cashier_id, deltas):
+        row = cls.objects.filter(date=date, cashier_id=cashier_id).values('pk')[:1]
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        with db_transaction.atomic():
+            if cls.objects.filter(pk=Subquery(row)).update(**updates):
+                return
+            try:
+                with db_transaction.atomic():
+                    cls.objects.create(date=date, cashier_id=cashier_id, **deltas)
+            except IntegrityError:
+                cls.objects.filter(pk=Subquery(row)).update(**updates)
+    
+    @classmethod
+    def compute_from_transactions(cls):
+        """Hitung rekap langsung dari tabel transaksi (GROUP BY tanggal lokal dan kasir)"""
+        status_counts = {
+            field: Count('pk', filter=Q(status=status)) for status, field in cls.STATUS_FIELDS.items()
+        }
+        rows = (
+            Transaction.objects.order_by()
+            .annotate(date=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+            .values('date', 'cashier_id')
+            .annotate(
+                transaction_count=Count('pk'),
+                revenue=Sum('final_amount'),
+                paid_amount=Sum('paid_amount'),
+                **status_counts
+            )
+        )
+        return [cls(**row) for row in rows]
+    
+    @classmethod
+    def summarize(cls, queryset, today, month_start):
+        """Total dashboard (semua waktu, hari ini, bulan ini, order aktif) dalam satu query"""
+        return cls.summary_totals(queryset.aggregate(**cls.summary_expressions(today, month_start)))
+    
+    @classmethod
+    async def asummarize(cls, queryset, today, month_start):
+        """summarize() dengan async ORM"""
+        return cls.summary_totals(await queryset.aaggregate(**cls.summary_expressions(today, month_start)))
+    
+    @staticmethod
+    def summary_expressions(today, month_start):
+        zero = Value(Decimal('0.00'))
+        return dict(
+            total_transactions=Coalesce(Sum('transaction_count'), 0),
+            total_revenue=Coalesce(Sum('revenue'), zero),
+            today_transactions=Coalesce(Sum('transaction_count', filter=Q(date=today)), 0),
+            today_revenue=Coalesce(Sum('revenue', filter=Q(date=today)), zero),
+            monthly_transactions=Coalesce(Sum('transaction_count', filter=Q(date__gte=month_start)), 0),
+            monthly_revenue=Coalesce(Sum('revenue', filter=Q(date__gte=month_start)), zero),
+            taken_orders=Coalesce(Sum('diambil_count'), 0),
+            pending_orders=Coalesce(Sum(F('diterima_count') + F('dicuci_count') + F('disetrika_count')), 0),
+        )
+    
+    @staticmethod
+    def summary_totals(totals):
+        totals['active_orders'] = totals['total_transactions'] - totals.pop('taken_orders')
+        return totals
+    
+    @classmethod
+    def dashboard_delta(cls, transactions, today, month_start, cashier_id=None):
+        """Selisih total summarize() akibat perubahan transaksi [(old, new), ...]; hanya field yang berubah"""
+        pending = {'diterima', 'dicuci', 'disetrika'}
+        totals = {}
+        for old, new in transactions:
+            for values, sign in ((old, -1), (new, 1)):
+                if not values or (cashier_id is not None and values['cashier_id'] != cashier_id):
+                    continue
+                date = timezone.localdate(values['created_at'])
+                for prefix, applies in (('total', True), ('today', date == today), ('monthly', date >= month_start)):
+                    if applies:
+                        totals[f'{prefix}_transactions'] = totals.get(f'{prefix}_transactions', 0) + sign
+                        totals[f'{prefix}_revenue'] = totals.get(f'{prefix}_revenue', 0) + sign * values['final_amount']
+                if values['status'] != 'diambil':
+                    totals['active_orders'] = totals.get('active_orders', 0) + sign
+                if values['status'] in pending:
+                    totals['pending_orders'] = totals.get('pending_orders', 0) + sign
+        return {field: delta for field, delta in totals.items() if delta}
@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """Pagination nomor halaman bawaan, atau keyset (cursor) jika parameter `cursor` dikirim.
+    
+    Mode cursor mengurutkan berdasarkan (field ordering, id) dan mengambil
+    halaman berikutnya dengan WHERE pada nilai terakhir, bukan OFFSET,
+    sehingga halaman ke-10.000 secepat halaman pertama. Mulai dengan
+    `?cursor=` lalu ikuti link `next`/`previous`.
+    
+    Total baris tidak dihitung kecuali diminta lewat `count=exact` atau
+    `count=cached` (COUNT(*) disimpan di cache selama `count_cache_timeout`).
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cache_timeout = 60
+    use_cursor = False
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+        
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.field, self.descending = self.get_key_field(queryset)
+        self.count = self.get_count(queryset, request)
+        
+        sign = '-' if self.descending else ''
+        cursor = self.decode_cursor(request.query_params[self.cursor_query_param])
+        reverse = cursor is not None and cursor['reverse']
+        if reverse:
+            sign = '' if self.descending else '-'
+        queryset = queryset.order_by(f'{sign}{self.field}', f'{sign}pk')
+        if cursor is not None:
+            queryset = queryset.filter(self.position_filter(cursor['value'], cursor['pk'], sign == '-'))
+        
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page_results = results
+        return results
+    
+    def get_key_field(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering or ['-pk']
+        field = ordering[0]
+        if not isinstance(field, str):
+            raise ValidationError({'ordering': 'Ordering tidak didukung pagination cursor'})
+        descending = field.startswith('-')
+        field = field.lstrip('-')
+        if field != 'pk' and queryset.model._meta.get_field(field).null:
+            raise ValidationError({'ordering': f'Ordering {field} tidak didukung pagination cursor'})
+        return field, descending
+    
+    def position_filter(self, value, pk, descending):
+        """Baris setelah (value, pk) dalam urutan (field, pk); bentuk range agar index field terpakai"""
+        if descending:
+            return Q(**{f'{self.field}__lte': value}) & (Q(**{f'{self.field}__lt': value}) | Q(pk__lt=pk))
+        return Q(**{f'{self.field}__gte': value}) & (Q(**{f'{self.field}__gt': value}) | Q(pk__gt=pk))
+    
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'cached':
+            sql, params = queryset.query.sql_with_params()
+            key = 'keyset-count:' + hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+            count = cache.get(key)
+            if count is None:
+                count = queryset.count()
+                cache.set(key, count, self.count_cache_timeout)
+            return count
+        return None
+    
+    # Cursor: base64 dari [nilai field, pk, arah]
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # Baris queryset.values() (TransactionReadSerializer): cukup pk dan field kunci
+            fields = {'pk': obj['id']}
+            if self.field != 'pk':
+                fields[self.field] = obj[self.field]
+            obj = self.model(**fields)
+        value = getattr(obj, self.field)
+        if self.field != 'pk':
+            value = obj._meta.get_field(self.field).value_to_string(obj)
+        token = json.dumps([value, obj.pk, int(reverse)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            token += '=' * (-len(token) % 4)
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(token.encode()))
+            # Cursor datang dari klien: nilai dikonversi dengan field-nya sebelum masuk ke filter
+            opts = self.model._meta
+            key_field = opts.pk if self.field == 'pk' else opts.get_field(self.field)
+            value = key_field.to_python(value)
+            pk = opts.pk.to_python(pk)
+            if value is None or pk is None or reverse not in (0, 1):
+                raise ValueError
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound('Cursor tidak valid')
+        return {'value': value, 'pk': pk, 'reverse': bool(reverse)}
+    
+    def cursor_link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(obj, reverse))
+    
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self.cursor_link(self.page_results[-1], reverse=False)
+    
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.cursor_link(self.page_results[0], reverse=True)
+    
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -1,196 +1,345 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+
+from pypdf import PdfWriter
+
+from django.conf import settings
 from django.http import HttpResponse
-from .models import Transaction
-from datetime import datetime
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from .invoice_render import render_invoice_pdf
+from .receipt_utils import RECEIPT_TEMPLATES
 
+logger = logging.getLogger(__name__)
 
-def generate_invoice_pdf(transaction_id):
-    """Generate PDF struk untuk transaksi"""
-    try:
-        transaction = Transaction.objects.select_related('customer', 'cashier').prefetch_related('items__service').get(id=transaction_id)
-    except Transaction.DoesNotExist:
-        return None
-    
-    # Create HttpResponse dengan PDF header
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="Struk_{transaction.invoice_number}.pdf"'
-    
-    # Create PDF
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#2563eb'),
-        alignment=TA_CENTER,
-        spaceAfter=30,
-    )
-    
-    header_style = ParagraphStyle(
-        'Header',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.HexColor('#1e293b'),
-        alignment=TA_LEFT,
-    )
-    
-    # Header
-    y_position = height - 50
-    
-    # Judul
-    p.setFont("Helvetica-Bold", 20)
-    p.setFillColor(colors.HexColor('#2563eb'))
-    p.drawCentredString(width / 2, y_position, "LAUNDRY EXPRESS")
-    y_position -= 30
-    
-    p.setFont("Helvetica", 10)
-    p.setFillColor(colors.HexColor('#64748b'))
-    p.drawCentredString(width / 2, y_position, "Jl. Contoh No. 123, Jakarta")
-    y_position -= 15
-    p.drawCentredString(width / 2, y_position, "Telp: 021-12345678 | Email: info@laundry.com")
-    y_position -= 40
-    
-    # Garis pemisah
-    p.setStrokeColor(colors.HexColor('#e2e8f0'))
-    p.line(50, y_position, width - 50, y_position)
-    y_position -= 30
-    
-    # Informasi Invoice
-    p.setFont("Helvetica-Bold", 12)
-    p.setFillColor(colors.HexColor('#1e293b'))
-    p.drawString(50, y_position, f"INVOICE: {transaction.invoice_number}")
-    y_position -= 20
-    
-    p.setFont("Helvetica", 10)
-    p.setFillColor(colors.HexColor('#475569'))
-    p.drawString(50, y_position, f"Tanggal: {transaction.received_at.strftime('%d/%m/%Y %H:%M')}")
-    y_position -= 20
-    p.drawString(50, y_position, f"Kasir: {transaction.cashier.username if transaction.cashier else '-'}")
-    y_position -= 30
-    
-    # Informasi Pelanggan
-    p.setFont("Helvetica-Bold", 11)
-    p.setFillColor(colors.HexColor('#1e293b'))
-    p.drawString(50, y_position, "PELANGGAN:")
-    y_position -= 20
-    
-    p.setFont("Helvetica", 10)
-    p.setFillColor(colors.HexColor('#475569'))
-    p.drawString(50, y_position, f"Nama: {transaction.customer.name}")
-    y_position -= 15
-    p.drawString(50, y_position, f"Telp: {transaction.customer.phone}")
-    y_position -= 30
-    
-    # Tabel Items
-    p.setFont("Helvetica-Bold", 11)
-    p.setFillColor(colors.HexColor('#1e293b'))
-    p.drawString(50, y_position, "DETAIL LAYANAN:")
-    y_position -= 25
-    
-    # Header tabel
-    table_data = [['Layanan', 'Jumlah', 'Harga', 'Subtotal']]
-    
-    # Data items
-    for item in transaction.items.all():
-        table_data.append([
-            f"{item.service.name}",
-            f"{item.quantity} {item.service.unit}",
-            f"Rp {item.unit_price:,.0f}",
-            f"Rp {item.subtotal:,.0f}"
-        ])
-    
-    # Buat tabel
-    table = Table(table_data, colWidths=[150*mm, 50*mm, 60*mm, 60*mm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-        ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-    ]))
-    
-    # Render tabel
-    table_width, table_height = table.wrap(width - 100, height)
-    table.drawOn(p, 50, y_position - table_height)
-    y_position -= table_height + 30
-    
-    # Total
-    p.setFont("Helvetica", 10)
-    p.setFillColor(colors.HexColor('#475569'))
-    p.drawRightString(width - 50, y_position, f"Subtotal: Rp {transaction.total_amount:,.0f}")
-    y_position -= 20
-    
-    if transaction.discount > 0:
-        p.drawRightString(width - 50, y_position, f"Diskon: Rp {transaction.discount:,.0f}")
-        y_position -= 20
-    
-    p.setFont("Helvetica-Bold", 12)
-    p.setFillColor(colors.HexColor('#1e293b'))
-    p.drawRightString(width - 50, y_position, f"TOTAL: Rp {transaction.final_amount:,.0f}")
-    y_position -= 20
-    
-    p.setFont("Helvetica", 10)
-    p.setFillColor(colors.HexColor('#475569'))
-    p.drawRightString(width - 50, y_position, f"Bayar: Rp {transaction.paid_amount:,.0f}")
-    y_position -= 20
-    
-    kembalian = transaction.paid_amount - transaction.final_amount
-    if kembalian > 0:
-        p.drawRightString(width - 50, y_position, f"Kembalian: Rp {kembalian:,.0f}")
-        y_position -= 30
-    
-    # Status
-    y_position -= 20
-    p.setFont("Helvetica-Bold", 10)
-    p.setFillColor(colors.HexColor('#1e293b'))
-    p.drawString(50, y_position, f"Status: {transaction.get_status_display()}")
-    
-    if transaction.estimated_completion:
-        y_position -= 20
-        p.setFont("Helvetica", 9)
-        p.setFillColor(colors.HexColor('#64748b'))
-        p.drawString(50, y_position, f"Estimasi Selesai: {transaction.estimated_completion.strftime('%d/%m/%Y %H:%M')}")
-    
-    # Catatan
-    if transaction.notes:
-        y_position -= 30
-        p.setFont("Helvetica", 9)
-        p.setFillColor(colors.HexColor('#64748b'))
-        p.drawString(50, y_position, f"Catatan: {transaction.notes}")
-    
-    # Footer
-    y_position = 80
-    p.setStrokeColor(colors.HexColor('#e2e8f0'))
-    p.line(50, y_position, width - 50, y_position)
-    y_position -= 20
-    
-    p.setFont("Helvetica", 8)
-    p.setFillColor(colors.HexColor('#94a3b8'))
-    p.drawCentredString(width / 2, y_position, "Terima kasih atas kunjungan Anda!")
-    y_position -= 15
-    p.drawCentredString(width / 2, y_position, "Struk ini adalah bukti pembayaran yang sah")
-    
-    # Save PDF
-    p.showPage()
-    p.save()
+# Naikkan jika tata letak struk berubah agar cache lama tidak terpakai
+INVOICE_TEMPLATE_VERSION = 2
+
+# Format struk: kertas A4 (ReportLab) atau thermal 58/80 mm (receipt_utils)
+PAPER_CHOICES = ['a4', *RECEIPT_TEMPLATES]
+OUTPUT_CHOICES = {
+    'pdf': ('application/pdf', 'pdf'),
+    'escpos': ('application/octet-stream', 'bin'),
+}
+
+
+def get_invoice_data(transaction):
+    """Data struk sebagai dict biasa (tanpa objek model), dipakai untuk render dan kunci cache"""
+    return {
+        'invoice_number': transaction.invoice_number,
+        'received_at': timezone.localtime(transaction.received_at).strftime('%d/%m/%Y %H:%M'),
+        'cashier_name': transaction.cashier.username if transaction.cashier else '-',
+        'customer_name': transaction.customer.name,
+        'customer_phone': transaction.customer.phone,
+        'items': [
+            {
+                'service_name': item.service.name,
+                'quantity': item.quantity,
+                'unit': item.service.unit,
+                'unit_price': item.unit_price,
+                'subtotal': item.subtotal,
+            }
+            for item in transaction.items.all()
+        ],
+        'total_amount': transaction.total_amount,
+        'discount': transaction.discount,
+        'final_amount': transaction.final_amount,
+        'paid_amount': transaction.paid_amount,
+        'status_display': transaction.get_status_display(),
+        'estimated_completion': (
+            timezone.localtime(transaction.estimated_completion).strftime('%d/%m/%Y %H:%M')
+            if transaction.estimated_completion else None
+        ),
+        'notes': transaction.notes,
+    }
+
+
+def invoice_etag(data, variant='a4'):
+    """Hash isi struk: sama persis jika dan hanya jika hasil render sama"""
+    payload = json.dumps([INVOICE_TEMPLATE_VERSION, variant, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class InvoicePDFCache:
+    """Cache PDF struk di disk, dikunci dengan hash isi struk.
+    
+    Ukuran total dibatasi; file yang paling lama tidak dipakai (mtime)
+    dihapus lebih dulu. Setiap hit memperbarui mtime file. Total ukuran
+    dihitung berjalan per direktori, jadi direktori hanya dipindai saat
+    total melewati batas (atau pertama kali dipakai proses ini). File yang
+    ditulis proses lain baru terhitung pada pemindaian berikutnya.
+    """
+    
+    def __init__(self, directory=None, max_bytes=None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Perkiraan total ukuran file .pdf per direktori sejak pemindaian terakhir
+        self._totals = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.scans = 0
+    
+    @property
+    def directory(self):
+        directory = Path(self._directory or getattr(
+            settings, 'INVOICE_PDF_CACHE_DIR', Path(settings.BASE_DIR) / 'cache' / 'invoices'
+        ))
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+    
+    @property
+    def max_bytes(self):
+        return self._max_bytes or getattr(settings, 'INVOICE_PDF_CACHE_MAX_BYTES', 100 * 1024 * 1024)
+    
+    def path_for(self, key):
+        return self.directory / f'{key}.pdf'
+    
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+    
+    def set(self, key, content):
+        directory = self.directory
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        path = self.path_for(key)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            total = self._totals.get(directory)
+            if total is not None:
+                total = self._totals[directory] = total + len(content) - replaced
+        if total is None or total > self.max_bytes:
+            self.evict()
+    
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+    
+    def evict(self):
+        """Hapus file paling lama tidak dipakai sampai total ukuran di bawah batas"""
+        directory = self.directory
+        entries = []
+        total = 0
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._totals[directory] = total
+            self.scans += 1
+    
+    def clear(self):
+        directory = self.directory
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.pdf'):
+                os.remove(entry.path)
+        with self._lock:
+            self._totals[directory] = 0
+    
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified, 'scans': self.scans}
+
+
+invoice_cache = InvoicePDFCache()
+
+
+def generate_invoice_pdf(transaction, request=None, paper='a4', output='pdf'):
+    """Generate struk transaksi (dengan cache dan dukungan ETag/304).
+    
+    `transaction` sebaiknya dimuat dengan Transaction.objects.with_details().
+    paper: 'a4' (ReportLab, di-cache di disk) atau '58'/'80' (printer thermal);
+    output: 'pdf' atau 'escpos' (byte mentah ESC/POS, khusus thermal).
+    
+    Tanpa Last-Modified: isi struk juga bergantung pada layanan, kasir dan
+    INVOICE_TEMPLATE_VERSION, yang semuanya sudah tercakup ETag (hash isi).
+    """
+    data = get_invoice_data(transaction)
+    variant = paper if output == 'pdf' else f'{paper}-{output}'
+    etag = quote_etag(invoice_etag(data, variant))
+    
+    # Klien sudah punya versi yang sama
+    if request is not None:
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            invoice_cache.record_not_modified()
+            return conditional
     
+    if paper == 'a4':
+        key = etag.strip('"')
+        content = invoice_cache.get(key)
+        cache_status = 'HIT'
+        if content is None:
+            cache_status = 'MISS'
+            content = render_invoice_pdf(data)
+            invoice_cache.set(key, content)
+        logger.debug('Invoice PDF %s cache %s', data['invoice_number'], cache_status)
+    else:
+        # Struk thermal cukup cepat dirender ulang, tidak perlu cache disk
+        template = RECEIPT_TEMPLATES[paper]
+        content = template.render_escpos(data) if output == 'escpos' else template.render_pdf(data)
+        cache_status = None
+    
+    # Create HttpResponse dengan header sesuai format
+    content_type, extension = OUTPUT_CHOICES[output]
+    response = HttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="Struk_{transaction.invoice_number}.{extension}"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    if cache_status:
+        response['X-Cache'] = cache_status
     return response
+
+
+# Render banyak struk sekaligus (cetak ulang satu rentang tanggal)
+BATCH_INLINE_THRESHOLD = 8
+
+
+# Pool render struk massal: dibuat saat pertama dipakai, dipakai ulang per proses web
+_render_pool = None
+_render_pool_workers = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool(workers):
+    """ProcessPoolExecutor untuk render struk, dipakai ulang selama jumlah worker sama.
+    
+    Memakai konteks spawn: proses anak tidak mewarisi koneksi DB dan thread
+    proses web, dan hanya memuat app.invoice_render (tanpa django.setup())
+    karena yang dikirim hanya dict biasa.
+    """
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is not None and _render_pool_workers != workers:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _render_pool_workers = workers
+        return _render_pool
+
+
+def discard_render_pool(pool):
+    """Buang pool yang rusak (mis. proses anak mati) agar request berikutnya membuat pool baru"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_invoice_batch(invoices, workers=None):
+    """Render daftar dict get_invoice_data() dan hasilkan bytes PDF sesuai urutan.
+    
+    Struk yang sudah ada di cache tidak dirender ulang; sisanya dirender di
+    proses ini jika sedikit, selain itu dibagi ke pool proses bersama
+    (get_render_pool).
+    """
+    keys = [invoice_etag(data) for data in invoices]
+    cached = [invoice_cache.get(key) for key in keys]
+    missing = [data for data, content in zip(invoices, cached) if content is None]
+    
+    workers = workers or getattr(settings, 'INVOICE_RENDER_WORKERS', None) or os.cpu_count() or 1
+    pool = None
+    if workers <= 1 or len(missing) < BATCH_INLINE_THRESHOLD:
+        rendered = map(render_invoice_pdf, missing)
+    else:
+        pool = get_render_pool(workers)
+        chunksize = max(1, len(missing) // (workers * 4))
+        rendered = pool.map(render_invoice_pdf, missing, chunksize=chunksize)
+    
+    try:
+        for key, content in zip(keys, cached):
+            if content is None:
+                content = next(rendered)
+                invoice_cache.set(key, content)
+            yield content
+    except BrokenProcessPool:
+        discard_render_pool(pool)
+        raise
+    finally:
+        # Response berhenti di tengah jalan: sisa pekerjaan di pool dibatalkan
+        if pool is not None:
+            rendered.close()
+
+
+def merge_invoice_pdfs(pdfs):
+    """Gabungkan beberapa PDF struk menjadi satu PDF multi-halaman"""
+    writer = PdfWriter()
+    for content in pdfs:
+        writer.append(BytesIO(content))
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class _ZipStream:
+    """File tulis-saja untuk zipfile; isi yang sudah ditulis diambil lewat drain()"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_invoice_zip(invoices, pdfs):
+    """Generator ZIP berisi satu PDF per struk, dikirim bertahap selama render berjalan"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for data, content in zip(invoices, pdfs):
+            archive.writestr(f"Struk_{data['invoice_number']}.pdf", content)
+            yield stream.drain()
+    yield stream.drain()
@@ -0,0 +1,147 @@
+"""Normalisasi nomor HP ke E.164 dan indeks prefix untuk autocomplete di kasir.
+
+PhoneIndex menyimpan pasangan (nomor E.164, id pelanggan) dalam list terurut
+di memori proses; pencarian prefix cukup satu bisect lalu membaca N entri
+berikutnya. Perubahan di proses yang sama masuk lewat signal, perubahan dari
+proses lain diambil berkala berdasarkan updated_at.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+
+DEFAULT_COUNTRY_CODE = '62'
+
+
+def normalize_phone(phone, country_code=DEFAULT_COUNTRY_CODE):
+    """Nomor HP apa adanya (0812-..., +62 812 ..., 62812...) menjadi E.164 (+62812...)"""
+    phone = (phone or '').strip()
+    digits = re.sub(r'\D', '', phone)
+    if not digits:
+        return ''
+    if phone.startswith('+'):
+        return f'+{digits}'
+    if digits.startswith('00'):
+        return f'+{digits[2:]}'
+    if digits.startswith(country_code):
+        return f'+{digits}'
+    if digits.startswith('0'):
+        return f'+{country_code}{digits[1:]}'
+    return f'+{country_code}{digits}'
+
+
+def phone_prefix(query, country_code=DEFAULT_COUNTRY_CODE):
+    """Potongan nomor yang sedang diketik menjadi prefix E.164; '' jika belum ada angka"""
+    digits = re.sub(r'\D', '', query or '')
+    if digits and country_code.startswith(digits) and not query.strip().startswith('0'):
+        # Baru sebagian kode negara, mis. "6"
+        return f'+{digits}'
+    return normalize_phone(query, country_code)
+
+
+class PhoneIndex:
+    """Indeks prefix nomor HP pelanggan di memori proses"""
+    sync_interval = 5  # detik
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = None  # list terurut (phone_normalized, id)
+        self.customers = {}  # id -> data untuk response
+        self.watermark = None
+        self.synced_at = 0
+    
+    @staticmethod
+    def row(customer):
+        return {
+            'id': customer['id'],
+            'name': customer['name'],
+            'phone': customer['phone'],
+            'phone_normalized': customer['phone_normalized'],
+        }
+    
+    def queryset(self):
+        from .models import Customer
+        return Customer.objects.order_by().values('id', 'name', 'phone', 'phone_normalized', 'updated_at')
+    
+    def load(self):
+        """Bangun ulang indeks dari database"""
+        rows = list(self.queryset())
+        customers = {row['id']: self.row(row) for row in rows}
+        entries = sorted((row['phone_normalized'], row['id']) for row in rows if row['phone_normalized'])
+        with self.lock:
+            self.customers = customers
+            self.entries = entries
+            self.watermark = max((row['updated_at'] for row in rows), default=None)
+            self.synced_at = time.monotonic()
+    
+    def sync(self):
+        """Ambil perubahan dari proses lain sejak sinkronisasi terakhir"""
+        if self.entries is None:
+            return self.load()
+        if time.monotonic() - self.synced_at < self.sync_interval:
+            return
+        
+        rows = self.queryset()
+        if self.watermark is not None:
+            rows = rows.filter(updated_at__gte=self.watermark)
+        for row in rows:
+            self.update(row)
+            if self.watermark is None or row['updated_at'] > self.watermark:
+                self.watermark = row['updated_at']
+        
+        # Penghapusan tidak terlihat dari updated_at: jumlah berbeda berarti muat ulang
+        from .models import Customer
+        if Customer.objects.count() != len(self.customers):
+            return self.load()
+        self.synced_at = time.monotonic()
+    
+    def discard(self, customer_id):
+        customer = self.customers.pop(customer_id, None)
+        if customer and customer['phone_normalized']:
+            entry = (customer['phone_normalized'], customer_id)
+            position = bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+    
+    def update(self, customer):
+        """Tambah atau perbarui satu pelanggan (dict dengan field row())"""
+        if self.entries is None:
+            return
+        with self.lock:
+            self.discard(customer['id'])
+            self.customers[customer['id']] = self.row(customer)
+            if customer['phone_normalized']:
+                insort(self.entries, (customer['phone_normalized'], customer['id']))
+    
+    def remove(self, customer_id):
+        if self.entries is None:
+            return
+        with self.lock:
+            self.discard(customer_id)
+    
+    def search(self, query, limit=10):
+        """Maksimal `limit` pelanggan yang nomornya diawali `query`, urut nomor"""
+        prefix = phone_prefix(query)
+        if not prefix:
+            return []
+        self.sync()
+        with self.lock:
+            results = []
+            position = bisect_left(self.entries, (prefix,))
+            while len(results) < limit and position < len(self.entries):
+                phone, customer_id = self.entries[position]
+                if not phone.startswith(prefix):
+                    break
+                results.append(self.customers[customer_id])
+                position += 1
+            return results
+    
+    def clear(self):
+        with self.lock:
+            self.entries = None
+            self.customers = {}
+            self.watermark = None
+
+
+phone_index = PhoneIndex()
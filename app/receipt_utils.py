@@ -0,0 +1,165 @@
+"""Struk printer thermal (58/80 mm): PDF sempit dan byte stream ESC/POS.
+
+Template dikompilasi sekali per lebar kertas (teks statis, garis pemisah,
+format kolom, potongan byte PDF/ESC/POS). Saat render hanya baris dinamis
+yang disusun, sehingga satu struk selesai jauh di bawah satu milidetik.
+"""
+import textwrap
+
+from reportlab.lib.units import mm
+
+
+SHOP_NAME = 'LAUNDRY EXPRESS'
+SHOP_ADDRESS = 'Jl. Contoh No. 123, Jakarta'
+SHOP_PHONE = 'Telp: 021-12345678'
+FOOTER_LINES = ['Terima kasih atas kunjungan Anda!', 'Struk ini adalah bukti pembayaran yang sah']
+
+# Perintah ESC/POS
+ESC_INIT = b'\x1b@'
+ESC_BOLD_ON = b'\x1bE\x01'
+ESC_BOLD_OFF = b'\x1bE\x00'
+ESC_FEED_AND_CUT = b'\n\n\n\x1dVB\x00'
+
+# Tata letak PDF (font Courier bawaan PDF, tidak perlu embed)
+PDF_FONT_SIZE = 7
+PDF_LEADING = 9
+PDF_MARGIN = 4 * mm
+
+
+def rupiah(amount):
+    return f'Rp {amount:,.0f}'
+
+
+def pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class ThermalReceiptTemplate:
+    """Template struk untuk satu lebar kertas, dikompilasi sekali"""
+    
+    def __init__(self, paper_width_mm, chars_per_line):
+        self.width = chars_per_line
+        self.page_width = paper_width_mm * mm
+        self.separator = '-' * chars_per_line
+        self.wrapper = textwrap.TextWrapper(width=chars_per_line)
+        
+        self.header = [
+            (SHOP_NAME.center(chars_per_line), True),
+            (SHOP_ADDRESS.center(chars_per_line)[:chars_per_line], False),
+            (SHOP_PHONE.center(chars_per_line), False),
+            (self.separator, False),
+        ]
+        self.footer = [(self.separator, False)] + [
+            (line.center(chars_per_line)[:chars_per_line], False) for line in FOOTER_LINES
+        ]
+        self.escpos_header = self.encode_escpos(self.header)
+        self.escpos_footer = self.encode_escpos(self.footer)
+        self.pdf_header = self.encode_pdf_lines(self.header)
+        self.pdf_footer = self.encode_pdf_lines(self.footer)
+    
+    def pair(self, label, value):
+        """Label rata kiri, nilai rata kanan dalam satu baris"""
+        value = str(value)
+        return f'{label}{value.rjust(self.width - len(label))}'[:self.width]
+    
+    def field(self, label, value):
+        return f'{label:<9}: {value}'[:self.width]
+    
+    def body_lines(self, data):
+        """Baris dinamis struk sebagai daftar (teks, tebal)"""
+        lines = [
+            (data['invoice_number'], True),
+            (self.field('Tanggal', data['received_at']), False),
+            (self.field('Kasir', data['cashier_name']), False),
+            (self.field('Pelanggan', data['customer_name']), False),
+            (self.field('Telp', data['customer_phone']), False),
+            (self.separator, False),
+        ]
+        for item in data['items']:
+            lines.append((item['service_name'][:self.width], False))
+            quantity = f"  {item['quantity']} {item['unit']} x {item['unit_price']:,.0f}"
+            lines.append((self.pair(quantity, f"{item['subtotal']:,.0f}"), False))
+        lines.append((self.separator, False))
+        
+        lines.append((self.pair('Subtotal', rupiah(data['total_amount'])), False))
+        if data['discount'] > 0:
+            lines.append((self.pair('Diskon', rupiah(data['discount'])), False))
+        lines.append((self.pair('TOTAL', rupiah(data['final_amount'])), True))
+        lines.append((self.pair('Bayar', rupiah(data['paid_amount'])), False))
+        change = data['paid_amount'] - data['final_amount']
+        if change > 0:
+            lines.append((self.pair('Kembalian', rupiah(change)), False))
+        lines.append((self.separator, False))
+        
+        lines.append((f"Status: {data['status_display']}", True))
+        if data['estimated_completion']:
+            lines.append((f"Estimasi: {data['estimated_completion']}", False))
+        if data['notes']:
+            lines.extend((line, False) for line in self.wrapper.wrap(f"Catatan: {data['notes']}"))
+        return lines
+    
+    # ESC/POS
+    def encode_escpos(self, lines):
+        chunks = []
+        for text, bold in lines:
+            line = text.encode('cp437', 'replace') + b'\n'
+            chunks.append(ESC_BOLD_ON + line + ESC_BOLD_OFF if bold else line)
+        return b''.join(chunks)
+    
+    def render_escpos(self, data):
+        return b''.join([
+            ESC_INIT, self.escpos_header, self.encode_escpos(self.body_lines(data)),
+            self.escpos_footer, ESC_FEED_AND_CUT,
+        ])
+    
+    # PDF
+    def encode_pdf_lines(self, lines):
+        """Operator teks PDF: satu baris per T*, font tebal lewat /F2"""
+        return ''.join(
+            f"/{'F2' if bold else 'F1'} {PDF_FONT_SIZE} Tf ({pdf_escape(text)}) Tj T*\n"
+            for text, bold in lines
+        ).encode('cp1252', 'replace')
+    
+    def render_pdf(self, data):
+        body = self.body_lines(data)
+        line_count = len(self.header) + len(body) + len(self.footer)
+        page_height = line_count * PDF_LEADING + 2 * PDF_MARGIN
+        top = page_height - PDF_MARGIN - PDF_FONT_SIZE
+        
+        content = b''.join([
+            f'BT {PDF_LEADING} TL {PDF_MARGIN:.2f} {top:.2f} Td\n'.encode(),
+            self.pdf_header, self.encode_pdf_lines(body), self.pdf_footer,
+            b'ET',
+        ])
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            (
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_width:.2f} {page_height:.2f}] '
+                f'/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>'
+            ).encode(),
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>',
+            b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content),
+        ]
+        
+        output = [b'%PDF-1.4\n']
+        offsets = []
+        position = len(output[0])
+        for number, obj in enumerate(objects, start=1):
+            chunk = b'%d 0 obj\n%s\nendobj\n' % (number, obj)
+            offsets.append(position)
+            output.append(chunk)
+            position += len(chunk)
+        
+        xref = [b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)]
+        xref.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+        output.extend(xref)
+        output.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, position))
+        return b''.join(output)
+
+
+RECEIPT_TEMPLATES = {
+    '58': ThermalReceiptTemplate(58, 32),
+    '80': ThermalReceiptTemplate(80, 48),
+}
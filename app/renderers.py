@@ -0,0 +1,38 @@
+try:
+    import orjson
+except ImportError:  # orjson opsional; tanpa paket ini memakai encoder json bawaan DRF
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer dengan orjson; hasilnya byte-per-byte sama dengan JSONRenderer bawaan.
+    
+    Tipe yang tidak dikenal orjson (Decimal, datetime/date/time, lazy string,
+    dsb.) diteruskan ke JSONEncoder DRF sehingga formatnya tetap sama
+    (Decimal mentah -> float, datetime UTC -> akhiran 'Z'). Request dengan
+    indent dan konfigurasi non-compact/ASCII kembali ke renderer bawaan.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or self.encoder_class is not JSONEncoder
+            or not (self.compact and self.ensure_ascii is False and self.strict)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(data, default=_encoder.default, option=self.options)
+        # Sama seperti JSONRenderer: U+2028/U+2029 di-escape agar aman sebagai JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
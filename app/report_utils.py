@@ -0,0 +1,149 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DateField, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import TransactionItem
+
+
+INTERVALS = ['daily', 'weekly', 'monthly']
+GROUP_BY_CHOICES = ['service_type', 'cashier', 'status']
+
+
+def local_midnight(day):
+    """Awal hari (00:00) zona waktu lokal sebagai datetime tz-aware"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_date_bound(value, end=False):
+    """Ubah parameter date_from/date_to menjadi datetime tz-aware.
+    
+    Tanggal (YYYY-MM-DD) dibulatkan ke awal hari lokal; untuk batas akhir
+    dipakai awal hari berikutnya (eksklusif) agar seluruh hari ikut terhitung.
+    """
+    try:
+        day = parse_date(value)
+        if day is not None:
+            return local_midnight(day + timedelta(days=1) if end else day)
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError({'date_to' if end else 'date_from': f'Format tanggal tidak valid: {value}'})
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+def period_bounds(period, today=None):
+    """Rentang [awal, akhir) untuk periode daily, weekly atau monthly yang sedang berjalan"""
+    today = today or timezone.localdate()
+    if period == 'weekly':
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=7)
+    elif period == 'monthly':
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = today
+        end = today + timedelta(days=1)
+    return local_midnight(start), local_midnight(end)
+
+
+def bucket_start(day, interval):
+    if interval == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if interval == 'monthly':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == 'weekly':
+        return day + timedelta(days=7)
+    if interval == 'monthly':
+        return (day + timedelta(days=32)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def truncate(field, interval):
+    trunc = {'daily': TruncDate, 'weekly': TruncWeek, 'monthly': TruncMonth}[interval]
+    tzinfo = timezone.get_current_timezone()
+    if trunc is TruncDate:
+        return trunc(field, tzinfo=tzinfo)
+    return trunc(field, output_field=DateField(), tzinfo=tzinfo)
+
+
+def build_series(queryset, interval, group_by=None, start=None, end=None):
+    """Deret waktu omzet per bucket (GROUP BY di database).
+    
+    Tanpa group_by, bucket kosong di antara `start` dan `end` diisi nol
+    agar grafik mendapat deret yang utuh.
+    """
+    zero = Value(Decimal('0.00'))
+    queryset = queryset.order_by()
+    
+    if group_by == 'service_type':
+        # Omzet per jenis layanan dihitung dari subtotal item
+        rows = (
+            TransactionItem.objects.filter(transaction__in=queryset.values('pk'))
+            .annotate(period=truncate('transaction__created_at', interval))
+            .values('period', 'service__service_type')
+            .annotate(
+                transaction_count=Count('transaction', distinct=True),
+                quantity=Sum('quantity'),
+                revenue=Coalesce(Sum('subtotal'), zero),
+            )
+            .order_by('period', 'service__service_type')
+        )
+        return [
+            {
+                'period': row['period'],
+                'service_type': row['service__service_type'],
+                'transaction_count': row['transaction_count'],
+                'quantity': row['quantity'],
+                'revenue': row['revenue'],
+            }
+            for row in rows
+        ]
+    
+    group_fields = {'cashier': ['cashier', 'cashier__username'], 'status': ['status']}.get(group_by, [])
+    rows = (
+        queryset.annotate(period=truncate('created_at', interval))
+        .values('period', *group_fields)
+        .annotate(
+            transaction_count=Count('pk'),
+            revenue=Coalesce(Sum('final_amount'), zero),
+            paid_amount=Coalesce(Sum('paid_amount'), zero),
+        )
+        .order_by('period', *group_fields)
+    )
+    
+    if group_by == 'cashier':
+        return [
+            {
+                'period': row['period'],
+                'cashier': row['cashier'],
+                'cashier_name': row['cashier__username'],
+                'transaction_count': row['transaction_count'],
+                'revenue': row['revenue'],
+                'paid_amount': row['paid_amount'],
+            }
+            for row in rows
+        ]
+    if group_by or start is None or end is None:
+        return list(rows)
+    
+    # Isi bucket yang tidak punya transaksi
+    by_period = {row['period']: row for row in rows}
+    series = []
+    day = bucket_start(timezone.localtime(start).date(), interval)
+    last_day = timezone.localtime(end - timedelta(microseconds=1)).date()
+    while day <= last_day:
+        series.append(by_period.get(day) or {
+            'period': day, 'transaction_count': 0, 'revenue': Decimal('0.00'), 'paid_amount': Decimal('0.00'),
+        })
+        day = next_bucket(day, interval)
+    return series
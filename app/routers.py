@@ -0,0 +1,127 @@
+"""Routing baca ke replika untuk view laporan yang hanya membaca.
+
+View yang ditandai @use_replica membaca dari alias settings.READ_REPLICA,
+kecuali user tersebut baru saja menulis (read-your-writes): setelah request
+tulis yang berhasil, ReplicaStickinessMiddleware menandai user selama
+REPLICA_STICKY_SECONDS dan semua bacaannya kembali ke database utama.
+Semua tulisan selalu ke 'default'.
+
+Tanda sticky disimpan di cache REPLICA_STICKY_CACHE. Dengan beberapa worker,
+alias itu harus cache bersama (Redis/Memcached/DatabaseCache); dengan
+LocMemCache bawaan, request berikutnya yang masuk ke proses lain tidak
+melihat tanda tersebut dan bisa membaca data lama dari replika.
+
+Replika lokal adalah file SQLite kedua yang disalin dari database utama
+dengan backup API SQLite (refresh_sqlite_replica / manage.py refresh_replica).
+"""
+import functools
+import sqlite3
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.views import View
+
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def sticky_key(user_id):
+    return f'replica-sticky:{user_id}'
+
+
+def sticky_cache():
+    return caches[getattr(settings, 'REPLICA_STICKY_CACHE', 'default')]
+
+
+def mark_recent_write(user):
+    """Arahkan bacaan user ke database utama sampai replika sempat diperbarui (lihat docstring modul)"""
+    if getattr(settings, 'READ_REPLICA', None) and user.is_authenticated:
+        sticky_cache().set(sticky_key(user.pk), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 30))
+
+
+def replica_alias_for(request):
+    """Alias baca untuk request ini: replika, atau 'default' jika tidak dikonfigurasi/user sticky"""
+    alias = getattr(settings, 'READ_REPLICA', None)
+    if not alias or alias not in settings.DATABASES:
+        return DEFAULT_DB_ALIAS
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and sticky_cache().get(sticky_key(user.pk)):
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def current_read_alias():
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+def use_replica(view_func):
+    """Decorator view/action read-only: query di dalamnya dibaca dari replika.
+    
+    Pasang di bawah @api_view/@action agar request sudah terautentikasi.
+    Queryset yang dievaluasi setelah view selesai (StreamingHttpResponse)
+    perlu .using(current_read_alias()). View async juga didukung: alias
+    ikut ke task asyncio.gather dan thread sync_to_async karena keduanya
+    menyalin context saat dibuat.
+    """
+    if iscoroutinefunction(view_func):
+        @functools.wraps(view_func)
+        async def async_wrapper(*args, **kwargs):
+            request = args[1] if isinstance(args[0], View) else args[0]
+            token = _read_alias.set(replica_alias_for(request))
+            try:
+                return await view_func(*args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+        return async_wrapper
+    
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        request = args[1] if isinstance(args[0], View) else args[0]
+        token = _read_alias.set(replica_alias_for(request))
+        try:
+            return view_func(*args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """Bacaan di dalam @use_replica ke replika, selain itu dan semua tulisan ke 'default'"""
+    
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+    
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Skema replika ikut tersalin dari database utama
+        return db == DEFAULT_DB_ALIAS
+
+
+def refresh_sqlite_replica(source=DEFAULT_DB_ALIAS, target=None, pages=1024):
+    """Salin database utama ke file replika dengan backup API SQLite; kembalikan path replika.
+    
+    Penyalinan bertahap per `pages` halaman sehingga penulis di database
+    utama hanya tertahan sebentar di setiap langkah.
+    """
+    target = target or settings.READ_REPLICA
+    source_connection = connections[source]
+    target_connection = connections[target]
+    if source_connection.vendor != 'sqlite' or target_connection.vendor != 'sqlite':
+        raise ValueError('Refresh replika hanya untuk SQLite; gunakan replikasi bawaan database')
+    
+    # Lepas kunci baca koneksi replika di thread ini selama penyalinan
+    target_connection.close()
+    path = target_connection.settings_dict['NAME']
+    source_connection.ensure_connection()
+    with sqlite3.connect(path) as destination:
+        source_connection.connection.backup(destination, pages=pages)
+    destination.close()
+    return path
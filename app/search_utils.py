@@ -0,0 +1,173 @@
+"""Pencarian full-text pelanggan dan transaksi dengan SQLite FTS5.
+
+Tabel FTS5 diisi dan dijaga sinkron oleh trigger SQLite, sehingga
+bulk_create, queryset.update dan SQL langsung ikut terindeks. SQLite
+membuang trigger setiap kali migrasi membangun ulang tabel (mis. ALTER
+kolom), jadi tabel dan trigger dipastikan ada lagi setiap post_migrate dan
+indeks dibangun ulang bila ada trigger yang hilang.
+
+Di database tanpa FTS5, FullTextSearchFilter kembali ke pencarian LIKE
+bawaan SearchFilter.
+"""
+import re
+
+from django.db import DatabaseError, connections
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Customer, Transaction
+
+
+CUSTOMER_FTS = 'app_customer_fts'
+TRANSACTION_FTS = 'app_transaction_fts'
+FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+
+# Model -> (tabel FTS, bobot bm25 per kolom)
+SEARCH_INDEXES = {
+    Customer: (CUSTOMER_FTS, '10.0, 5.0, 1.0'),
+    Transaction: (TRANSACTION_FTS, '10.0, 5.0, 5.0'),
+}
+
+_ready = set()
+
+
+def search_index_tables():
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {CUSTOMER_FTS} USING fts5(name, phone, email, tokenize='{FTS_TOKENIZER}')",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSACTION_FTS} "
+        f"USING fts5(invoice_number, customer_name, customer_phone, tokenize='{FTS_TOKENIZER}')",
+    ]
+
+
+def search_index_triggers():
+    """Trigger sinkronisasi: {nama: SQL}. Data transaksi menyalin nama dan nomor HP pelanggan"""
+    customer = Customer._meta.db_table
+    transaction = Transaction._meta.db_table
+    index_transaction = (
+        f'INSERT INTO {TRANSACTION_FTS}(rowid, invoice_number, customer_name, customer_phone) '
+        f'SELECT new.id, new.invoice_number, name, phone FROM {customer} WHERE id = new.customer_id;'
+    )
+    return {
+        'customer_fts_insert': f'''
+            CREATE TRIGGER customer_fts_insert AFTER INSERT ON {customer} BEGIN
+                INSERT INTO {CUSTOMER_FTS}(rowid, name, phone, email) VALUES (new.id, new.name, new.phone, new.email);
+            END''',
+        'customer_fts_update': f'''
+            CREATE TRIGGER customer_fts_update AFTER UPDATE OF name, phone, email ON {customer}
+            WHEN old.name IS NOT new.name OR old.phone IS NOT new.phone OR old.email IS NOT new.email BEGIN
+                UPDATE {CUSTOMER_FTS} SET name = new.name, phone = new.phone, email = new.email WHERE rowid = new.id;
+                UPDATE {TRANSACTION_FTS} SET customer_name = new.name, customer_phone = new.phone
+                WHERE rowid IN (SELECT id FROM {transaction} WHERE customer_id = new.id);
+            END''',
+        'customer_fts_delete': f'''
+            CREATE TRIGGER customer_fts_delete AFTER DELETE ON {customer} BEGIN
+                DELETE FROM {CUSTOMER_FTS} WHERE rowid = old.id;
+            END''',
+        'transaction_fts_insert': f'''
+            CREATE TRIGGER transaction_fts_insert AFTER INSERT ON {transaction} BEGIN
+                {index_transaction}
+            END''',
+        'transaction_fts_update': f'''
+            CREATE TRIGGER transaction_fts_update AFTER UPDATE OF invoice_number, customer_id ON {transaction}
+            WHEN old.invoice_number IS NOT new.invoice_number OR old.customer_id IS NOT new.customer_id BEGIN
+                DELETE FROM {TRANSACTION_FTS} WHERE rowid = old.id;
+                {index_transaction}
+            END''',
+        'transaction_fts_delete': f'''
+            CREATE TRIGGER transaction_fts_delete AFTER DELETE ON {transaction} BEGIN
+                DELETE FROM {TRANSACTION_FTS} WHERE rowid = old.id;
+            END''',
+    }
+
+
+def rebuild_search_index(using='default'):
+    """Isi ulang tabel FTS dari tabel pelanggan dan transaksi"""
+    customer = Customer._meta.db_table
+    transaction = Transaction._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {CUSTOMER_FTS}')
+        cursor.execute(
+            f'INSERT INTO {CUSTOMER_FTS}(rowid, name, phone, email) SELECT id, name, phone, email FROM {customer}'
+        )
+        cursor.execute(f'DELETE FROM {TRANSACTION_FTS}')
+        cursor.execute(
+            f'INSERT INTO {TRANSACTION_FTS}(rowid, invoice_number, customer_name, customer_phone) '
+            f'SELECT t.id, t.invoice_number, c.name, c.phone FROM {transaction} t JOIN {customer} c ON c.id = t.customer_id'
+        )
+        for table in (CUSTOMER_FTS, TRANSACTION_FTS):
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+
+def ensure_search_index(using='default'):
+    """Buat tabel FTS dan trigger yang belum ada. False jika database tidak mendukung FTS5"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    
+    with connection.cursor() as cursor:
+        try:
+            for sql in search_index_tables():
+                cursor.execute(sql)
+        except DatabaseError:
+            return False
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {name for name, in cursor.fetchall()}
+        missing = {name: sql for name, sql in search_index_triggers().items() if name not in existing}
+        for sql in missing.values():
+            cursor.execute(sql)
+    
+    # Perubahan selama trigger tidak ada tidak terindeks
+    if missing:
+        rebuild_search_index(using)
+    return True
+
+
+def search_index_ready(connection):
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key in _ready:
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)", [CUSTOMER_FTS, TRANSACTION_FTS])
+        if cursor.fetchone()[0] < 2:
+            return False
+    _ready.add(key)
+    return True
+
+
+def fts_query(terms):
+    """Kata pencarian menjadi query FTS5: setiap token dicocokkan sebagai prefix (AND)"""
+    tokens = re.findall(r'\w+', ' '.join(terms).lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """SearchFilter dengan indeks FTS5: pencocokan token dan prefix, diurutkan relevansi (bm25).
+    
+    Letakkan setelah OrderingFilter. Tanpa parameter ordering dan di luar mode
+    cursor, hasil diurutkan relevansi lalu urutan bawaan view. search_fields
+    tetap dipakai untuk fallback LIKE.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        index = SEARCH_INDEXES.get(queryset.model)
+        query = fts_query(self.get_search_terms(request))
+        if index is None or not query or not search_index_ready(connections[queryset.db]):
+            return super().filter_queryset(request, queryset, view)
+        
+        table, weights = index
+        queryset = queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [query]))
+        
+        ordering_param = getattr(view, 'ordering_param', filters.OrderingFilter.ordering_param)
+        cursor_param = getattr(getattr(view, 'paginator', None), 'cursor_query_param', None)
+        if request.query_params.get(ordering_param) or cursor_param in request.query_params:
+            return queryset
+        
+        rank = RawSQL(
+            f'SELECT bm25({table}, {weights}) FROM {table} '
+            f'WHERE {table} MATCH %s AND rowid = {queryset.model._meta.db_table}.id',
+            [query],
+        )
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(search_rank=rank).order_by('search_rank', *ordering)
@@ -1,7 +1,12 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
 from django.contrib.auth.password_validation import validate_password
 from .models import User, Customer, Service, Transaction, TransactionItem
+from .catalog_utils import service_catalog
 from rest_framework.authtoken.models import Token
 
 
@@ -58,15 +63,14 @@ class LoginSerializer(serializers.Serializer):
 
 # Customer Serializers
 class CustomerSerializer(serializers.ModelSerializer):
-    transaction_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Customer
-        fields = ['id', 'name', 'phone', 'address', 'email', 'transaction_count', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    def get_transaction_count(self, obj):
-        return obj.transactions.count()
+        fields = [
+            'id', 'name', 'phone', 'phone_normalized', 'address', 'email',
+            'transaction_count', 'total_spent', 'last_transaction_at',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'transaction_count', 'total_spent', 'last_transaction_at', 'created_at', 'updated_at']
 
 
 # Service Serializers
@@ -77,8 +81,28 @@ class ServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class CatalogServiceField(serializers.PrimaryKeyRelatedField):
+    """Id layanan divalidasi dari cache katalog; query ke database hanya jika tidak ditemukan.
+    
+    Harga layanan dari katalog bisa basi di proses lain (LocMemCache, sampai
+    SERVICE_CATALOG_TTL); harga default item diambil dari database lewat
+    apply_current_prices().
+    """
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            try:
+                service = service_catalog.get_service(int(data))
+            except (TypeError, ValueError):
+                service = None
+            if service is not None:
+                return service
+        return super().to_internal_value(data)
+
+
 # Transaction Item Serializers
 class TransactionItemSerializer(serializers.ModelSerializer):
+    service = CatalogServiceField(queryset=Service.objects.all())
     service_name = serializers.CharField(source='service.name', read_only=True)
     service_type = serializers.CharField(source='service.service_type', read_only=True)
     
@@ -86,6 +110,22 @@ class TransactionItemSerializer(serializers.ModelSerializer):
         model = TransactionItem
         fields = ['id', 'service', 'service_name', 'service_type', 'quantity', 'unit_price', 'subtotal', 'notes']
         read_only_fields = ['id', 'subtotal']
+        extra_kwargs = {'unit_price': {'required': False}}
+
+
+def apply_current_prices(items):
+    """Item tanpa unit_price diberi harga layanan saat ini dari database, satu query untuk semua item.
+    
+    Harga ini tercetak di struk, jadi tidak diambil dari cache katalog.
+    """
+    missing = [item for item in items if item.get('unit_price') is None]
+    if not missing:
+        return
+    prices = dict(Service.objects.filter(pk__in={item['service'].pk for item in missing}).values_list('pk', 'price_per_unit'))
+    for item in missing:
+        if item['service'].pk not in prices:
+            raise serializers.ValidationError({'items': f'Layanan {item["service"].pk} tidak ditemukan'})
+        item['unit_price'] = prices[item['service'].pk]
 
 
 # Transaction Serializers
@@ -108,6 +148,105 @@ class TransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'invoice_number', 'total_amount', 'final_amount', 'created_at', 'updated_at']
 
 
+class TransactionReadSerializer:
+    """Jalur baca cepat TransactionSerializer(many=True) untuk list dan laporan.
+    
+    Menerima baris dari TransactionReadSerializer.values(queryset) dan
+    menghasilkan JSON yang sama persis tanpa instance model dan tanpa field
+    serializer per baris: item semua transaksi diambil dengan satu query lalu
+    dikelompokkan dalam satu putaran, label status dari dict yang dihitung
+    sekali. Perubahan TransactionSerializer harus diikuti di sini (dijaga
+    test paritas).
+    """
+    fields = [
+        'id', 'invoice_number', 'customer_id', 'cashier_id', 'total_amount', 'discount', 'final_amount',
+        'paid_amount', 'status', 'received_at', 'estimated_completion', 'completed_at', 'taken_at', 'notes',
+        'created_at', 'updated_at',
+    ]
+    item_fields = [
+        'transaction_id', 'id', 'service_id', 'service__name', 'service__service_type',
+        'quantity', 'unit_price', 'subtotal', 'notes',
+    ]
+    status_labels = {value: str(label) for value, label in Transaction.STATUS_CHOICES}
+    
+    def __init__(self, rows, many=True):
+        self.rows = rows
+    
+    @classmethod
+    def values(cls, queryset):
+        # Data pelanggan/kasir lewat subquery, bukan JOIN: COUNT(*) pagination tetap tanpa JOIN
+        customers = Customer.objects.filter(pk=OuterRef('customer_id')).order_by()
+        cashiers = User.objects.filter(pk=OuterRef('cashier_id')).order_by()
+        return queryset.select_related(None).prefetch_related(None).values(
+            *cls.fields,
+            customer_name=Subquery(customers.values('name')),
+            customer_phone=Subquery(customers.values('phone')),
+            cashier_name=Subquery(cashiers.values('username')),
+        )
+    
+    @property
+    def data(self):
+        rows = list(self.rows)
+        tz = timezone.get_current_timezone()
+        cents = Decimal('0.01')
+        
+        # Sama dengan DecimalField/DateTimeField DRF (COERCE_DECIMAL_TO_STRING, ISO 8601)
+        def decimal(value):
+            return None if value is None else format(value.quantize(cents), 'f')
+        
+        def timestamp(value):
+            if not value:
+                return None
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        
+        items = {row['id']: [] for row in rows}
+        if items:
+            queryset = TransactionItem.objects.filter(transaction_id__in=list(items)).values_list(*self.item_fields)
+            for transaction_id, pk, service_id, name, service_type, quantity, unit_price, subtotal, notes in queryset:
+                items[transaction_id].append({
+                    'id': pk,
+                    'service': service_id,
+                    'service_name': name,
+                    'service_type': service_type,
+                    'quantity': decimal(quantity),
+                    'unit_price': decimal(unit_price),
+                    'subtotal': decimal(subtotal),
+                    'notes': notes,
+                })
+        
+        data = []
+        for row in rows:
+            transaction = {
+                'id': row['id'],
+                'invoice_number': row['invoice_number'],
+                'customer': row['customer_id'],
+                'customer_name': row['customer_name'],
+                'customer_phone': row['customer_phone'],
+                'cashier': row['cashier_id'],
+                'cashier_name': row['cashier_name'],
+                'items': items[row['id']],
+                'total_amount': decimal(row['total_amount']),
+                'discount': decimal(row['discount']),
+                'final_amount': decimal(row['final_amount']),
+                'paid_amount': decimal(row['paid_amount']),
+                'status': row['status'],
+                'status_display': self.status_labels.get(row['status'], row['status']),
+                'received_at': timestamp(row['received_at']),
+                'estimated_completion': timestamp(row['estimated_completion']),
+                'completed_at': timestamp(row['completed_at']),
+                'taken_at': timestamp(row['taken_at']),
+                'notes': row['notes'],
+                'created_at': timestamp(row['created_at']),
+                'updated_at': timestamp(row['updated_at']),
+            }
+            if row['cashier_id'] is None:
+                # TransactionSerializer melewati cashier_name (SkipField) jika kasir sudah dihapus
+                del transaction['cashier_name']
+            data.append(transaction)
+        return data
+
+
 class TransactionCreateSerializer(serializers.ModelSerializer):
     items = TransactionItemSerializer(many=True)
     
@@ -118,14 +257,70 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
             'estimated_completion', 'notes', 'items'
         ]
     
+    def validate(self, attrs):
+        apply_current_prices(attrs['items'])
+        return attrs
+    
     def create(self, validated_data):
         items_data = validated_data.pop('items')
-        transaction = Transaction.objects.create(**validated_data)
-        
-        for item_data in items_data:
-            TransactionItem.objects.create(transaction=transaction, **item_data)
-        
-        return transaction
+        return Transaction.create_with_items(items_data, **validated_data)
+
+
+class BatchCustomerField(serializers.PrimaryKeyRelatedField):
+    """Pelanggan dicari di context['customers'] (dimuat sekali untuk seluruh batch sync); query ke database hanya jika tidak ditemukan"""
+    
+    def to_internal_value(self, data):
+        customers = self.context.get('customers') or {}
+        if not isinstance(data, bool):
+            try:
+                customer = customers.get(int(data))
+            except (TypeError, ValueError):
+                customer = None
+            if customer is not None:
+                return customer
+        return super().to_internal_value(data)
+
+
+class TransactionSyncItemSerializer(TransactionCreateSerializer):
+    # Dideklarasikan ulang tanpa UniqueValidator: kunci yang sudah tersimpan dijawab `existing`, bukan error
+    idempotency_key = serializers.CharField(max_length=64)
+    customer = BatchCustomerField(queryset=Customer.objects.all())
+    
+    class Meta(TransactionCreateSerializer.Meta):
+        fields = ['idempotency_key', *TransactionCreateSerializer.Meta.fields]
+    
+    def validate(self, attrs):
+        # Harga default diisi sekali untuk seluruh batch di TransactionSyncSerializer.validate_transactions
+        return attrs
+
+
+class TransactionSyncSerializer(serializers.Serializer):
+    """Antrean transaksi offline dari terminal kasir: {"transactions": [{"idempotency_key": ..., ...}]}"""
+    transactions = TransactionSyncItemSerializer(many=True, allow_empty=False, max_length=500)
+    
+    def to_internal_value(self, data):
+        # Semua pelanggan di batch divalidasi dengan satu query, bukan satu query per transaksi
+        entries = data.get('transactions') if isinstance(data, dict) else None
+        if isinstance(entries, list):
+            ids = set()
+            for entry in entries:
+                customer_id = entry.get('customer') if isinstance(entry, dict) else None
+                if isinstance(customer_id, (int, str)) and not isinstance(customer_id, bool) and str(customer_id).isdigit():
+                    ids.add(int(customer_id))
+            self.context['customers'] = Customer.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+    
+    def validate_transactions(self, value):
+        keys = [entry['idempotency_key'] for entry in value]
+        if len(set(keys)) != len(keys):
+            raise serializers.ValidationError('Idempotency key ganda dalam satu batch')
+        apply_current_prices([item for entry in value for item in entry['items']])
+        return value
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=Transaction.STATUS_CHOICES)
 
 
 # Dashboard Statistics Serializer
@@ -0,0 +1,118 @@
+from django.db import router, transaction as db_transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .catalog_utils import service_catalog
+from .events import event_bus
+from .models import User, Customer, Service, Transaction, DailyRollup
+from .phone_utils import phone_index
+from .search_utils import ensure_search_index
+
+
+@receiver(pre_save, sender=Transaction)
+def load_tracked_fields(sender, instance, raw=False, **kwargs):
+    # Instance yang tidak dimuat lewat queryset: ambil nilai lama dari database
+    if raw or instance._state.adding:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if all(field in loaded for field in Transaction.TRACKED_FIELDS):
+        return
+    instance._loaded_values = Transaction.objects.filter(pk=instance.pk).values(*Transaction.TRACKED_FIELDS).first() or {}
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    
+    old = getattr(instance, '_loaded_values', {}) if not created else {}
+    new = instance.tracked_values()
+    update_customer_stats(old, new)
+    DailyRollup.record(old=old, new=new)
+    event_bus.publish_transactions(transaction_event_type(old, new), [(instance.pk, old, new)])
+    
+    instance.snapshot_tracked_fields()
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    Customer.remove_transaction_stats(instance.customer_id, instance.final_amount)
+    DailyRollup.record(old=instance.tracked_values())
+    event_bus.publish_transactions('transaction.deleted', [(instance.pk, instance.tracked_values(), None)])
+
+
+# Jenis event stream real-time (lihat events.py)
+def transaction_event_type(old, new):
+    if not old:
+        return 'transaction.created'
+    if old['status'] != new['status']:
+        return 'transaction.status'
+    if old['paid_amount'] != new['paid_amount']:
+        return 'transaction.payment'
+    return 'transaction.updated'
+
+
+# Statistik pelanggan (transaction_count, total_spent, last_transaction_at)
+def update_customer_stats(old, new):
+    if not old:
+        Customer.add_transaction_stats(new['customer_id'], new['final_amount'], new['created_at'])
+    elif old['customer_id'] != new['customer_id']:
+        # Transaksi dipindah ke pelanggan lain
+        Customer.remove_transaction_stats(old['customer_id'], old['final_amount'])
+        Customer.add_transaction_stats(new['customer_id'], new['final_amount'], new['created_at'])
+    elif old['final_amount'] != new['final_amount']:
+        Customer.objects.filter(pk=new['customer_id']).update(
+            total_spent=F('total_spent') + (new['final_amount'] - old['final_amount']),
+            updated_at=timezone.now(),
+        )
+
+
+# Cache autentikasi token: logout, perubahan password/role/is_active
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    # Diulang setelah commit: request lain bisa mengisi cache dari data lama sebelum commit
+    key = instance.key
+    token_cache.invalidate_token(key)
+    db_transaction.on_commit(lambda: token_cache.invalidate_token(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_id = instance.pk
+    token_cache.invalidate_user(user_id)
+    db_transaction.on_commit(lambda: token_cache.invalidate_user(user_id))
+
+
+def create_search_index(sender, using='default', **kwargs):
+    # Dihubungkan ke post_migrate di AppAppConfig.ready(); replika tidak dimigrasi
+    if router.allow_migrate_model(using, Customer):
+        ensure_search_index(using)
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    row = {'id': instance.pk, 'name': instance.name, 'phone': instance.phone, 'phone_normalized': instance.phone_normalized}
+    db_transaction.on_commit(lambda: phone_index.update(row))
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    customer_id = instance.pk
+    db_transaction.on_commit(lambda: phone_index.remove(customer_id))
+
+
+# Katalog layanan: versi baru setiap layanan ditambah, diubah atau dihapus
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_changed(sender, **kwargs):
+    # Diulang setelah commit: request lain bisa memuat katalog lama sebelum commit
+    service_catalog.bump()
+    db_transaction.on_commit(service_catalog.bump)
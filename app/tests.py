@@ -1,3 +1,1853 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from io import BytesIO
+from unittest import mock, skipUnless
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction as db_transaction
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy
+from pypdf import PdfReader
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import views
+from .handlers import AsyncViewASGIHandler
+from .models import User, Customer, InvoiceSequence, Service, Transaction, TransactionItem, DailyRollup
+from .authentication import issue_stream_ticket, token_cache
+from .catalog_utils import service_catalog
+from .events import RESET_MESSAGE, LocalBackend, event_bus
+from .pagination import KeysetPagination
+from .middleware import brotli
+from .renderers import FastJSONRenderer
+from .phone_utils import normalize_phone, phone_index
+from .pdf_utils import invoice_cache, get_invoice_data, get_render_pool, render_invoice_batch
+from .routers import current_read_alias, refresh_sqlite_replica, sticky_key
+from .receipt_utils import RECEIPT_TEMPLATES, ESC_INIT, ESC_FEED_AND_CUT
+from .serializers import TransactionCreateSerializer, TransactionReadSerializer, TransactionSerializer
+
+
+class QueryBudgetMixin:
+    """Assertion untuk memastikan jumlah query endpoint tidak tumbuh seiring jumlah baris"""
+    
+    def assertQueryBudget(self, url, add_rows, batches=(1, 10), max_queries=None):
+        counts = []
+        for batch in batches:
+            add_rows(batch)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(queries))
+        
+        self.assertEqual(len(set(counts)), 1, f'Jumlah query bertambah seiring jumlah baris: {counts}')
+        if max_queries is not None:
+            self.assertLessEqual(counts[0], max_queries)
+
+
+class QueryPlanMixin:
+    """Assertion EXPLAIN QUERY PLAN: query endpoint tidak boleh memindai tabel tanpa index"""
+    
+    def full_scans(self, queries, allow=()):
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                for *_, detail in cursor.fetchall():
+                    table = detail.split()[1] if detail.startswith('SCAN ') else None
+                    if table and 'USING' not in detail and table not in allow:
+                        scans.append(f"{detail}: {query['sql']}")
+        return scans
+    
+    def assertIndexedPlans(self, url, allow=()):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        scans = self.full_scans(queries.captured_queries, allow)
+        self.assertEqual(scans, [], f'{url} memindai seluruh tabel')
+
+
+class APITestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.customer = Customer.objects.create(name='Budi', phone='081200000001')
+        self.service = Service.objects.create(
+            name='Cuci Kiloan Reguler', service_type='kiloan', price_per_unit=Decimal('5000'), unit='kg'
+        )
+    
+    def add_transactions(self, count, items=2, **fields):
+        fields.setdefault('customer', self.customer)
+        fields.setdefault('cashier', self.user)
+        return [
+            Transaction.create_with_items(
+                [{'service': self.service, 'quantity': Decimal('2'), 'unit_price': Decimal('5000')}] * items,
+                **fields
+            )
+            for _ in range(count)
+        ]
+    
+    def verify_rollup(self):
+        """Rekap harian harus sama dengan hasil hitung ulang dari tabel transaksi"""
+        stdout = io.StringIO()
+        call_command('rebuild_daily_rollup', verify=True, stdout=stdout)
+        self.assertIn('baris rekap harian cocok', stdout.getvalue())
+
+
+class InvoiceSequenceTest(TestCase):
+    def test_reserve_returns_consecutive_block(self):
+        day = date(2026, 1, 31)
+        self.assertEqual(list(InvoiceSequence.reserve(3, day)), [1, 2, 3])
+        self.assertEqual(list(InvoiceSequence.reserve(2, day)), [4, 5])
+        self.assertEqual(list(InvoiceSequence.reserve(1, date(2026, 2, 1))), [1])
+    
+    def test_invoice_number_format(self):
+        customer = Customer.objects.create(name='Budi', phone='081200000001')
+        transaction = Transaction.objects.create(customer=customer)
+        day = transaction.invoice_number.split('-')[1]
+        self.assertEqual(transaction.invoice_number, f'INV-{day}-0001')
+        
+        numbers = Transaction.generate_invoice_numbers(2, date(2026, 1, 31))
+        self.assertEqual(numbers, ['INV-20260131-0001', 'INV-20260131-0002'])
+
+
+class SQLiteProfileTest(TransactionTestCase):
+    """PRAGMA di init_command benar-benar terpasang: salah ketik di sana diabaikan SQLite tanpa error"""
+    
+    def test_new_connection_has_pragmas(self):
+        expected = {
+            'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'mmap_size': settings.SQLITE_PRAGMAS['mmap_size'],
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+            'temp_store': 2,  # MEMORY
+        }
+        self.assertEqual(set(expected), set(settings.SQLITE_PRAGMAS))
+        connection.close()
+        with connection.cursor() as cursor:
+            for name, value in expected.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(cursor.fetchone()[0], value)
+    
+    def test_atomic_begins_immediate(self):
+        with CaptureQueriesContext(connection) as queries:
+            with db_transaction.atomic():
+                Customer.objects.exists()
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+class InvoiceSequenceConcurrencyTest(TransactionTestCase):
+    THREADS = 8
+    PER_THREAD = 10
+    
+    def test_concurrent_creates_get_unique_invoice_numbers(self):
+        customer = Customer.objects.create(name='Budi', phone='081200000001')
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+        
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.PER_THREAD):
+                    Transaction.objects.create(customer=customer)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        total = self.THREADS * self.PER_THREAD
+        self.assertEqual(errors, [])
+        invoice_numbers = list(Transaction.objects.values_list('invoice_number', flat=True))
+        self.assertEqual(len(invoice_numbers), total)
+        self.assertEqual(len(set(invoice_numbers)), total)
+        # Tanpa retry: tidak ada nomor yang terbuang
+        self.assertEqual(InvoiceSequence.objects.get().last_number, total)
+
+
+class TransactionCreateTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Budi', phone='081200000001')
+        self.service = Service.objects.create(
+            name='Cuci Kiloan Reguler', service_type='kiloan', price_per_unit=Decimal('5000'), unit='kg'
+        )
+    
+    def build_serializer(self, item_count):
+        serializer = TransactionCreateSerializer(data={
+            'customer': self.customer.id,
+            'discount': '1000',
+            'paid_amount': '0',
+            'items': [
+                {'service': self.service.id, 'quantity': '2', 'unit_price': '5000'}
+                for _ in range(item_count)
+            ],
+        })
+        serializer.is_valid(raise_exception=True)
+        return serializer
+    
+    def create_transaction(self, item_count):
+        return self.build_serializer(item_count).save()
+    
+    def test_totals_computed_in_memory(self):
+        transaction = self.create_transaction(3)
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.items.count(), 3)
+        self.assertEqual(transaction.total_amount, Decimal('30000'))
+        self.assertEqual(transaction.final_amount, Decimal('29000'))
+        self.assertEqual(
+            sorted(transaction.items.values_list('subtotal', flat=True)), [Decimal('10000')] * 3
+        )
+    
+    def test_query_count_independent_of_item_count(self):
+        self.create_transaction(1)  # baris InvoiceSequence hari ini sudah ada
+        one_item_serializer = self.build_serializer(1)
+        ten_items_serializer = self.build_serializer(10)
+        with CaptureQueriesContext(connection) as one_item:
+            one_item_serializer.save()
+        with CaptureQueriesContext(connection) as ten_items:
+            ten_items_serializer.save()
+        self.assertEqual(len(one_item), len(ten_items))
+        inserts = [q['sql'] for q in ten_items if q['sql'].startswith('INSERT INTO "app_transactionitem"')]
+        self.assertEqual(len(inserts), 1)
+    
+    def test_single_item_edits_keep_totals_in_sync(self):
+        transaction = self.create_transaction(2)
+        item = transaction.items.first()
+        item.quantity = Decimal('4')
+        item.save()
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.total_amount, Decimal('30000'))
+        
+        item.delete()
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.total_amount, Decimal('10000'))
+        self.assertEqual(transaction.final_amount, Decimal('9000'))
+
+
+class TransactionQueryBudgetTest(QueryBudgetMixin, APITestMixin, TestCase):
+    def test_transaction_list(self):
+        self.assertQueryBudget('/api/transactions/', self.add_transactions, max_queries=5)
+    
+    def test_transaction_reports(self):
+        self.assertQueryBudget('/api/transactions/reports/', self.add_transactions)
+    
+    def test_customer_transactions(self):
+        url = f'/api/customers/{self.customer.id}/transactions/'
+        self.assertQueryBudget(url, self.add_transactions)
+
+
+class CustomerStatsTest(APITestMixin, TestCase):
+    def assertStats(self, customer, count, spent):
+        customer.refresh_from_db()
+        self.assertEqual(customer.transaction_count, count)
+        self.assertEqual(customer.total_spent, Decimal(spent))
+    
+    def test_counters_follow_create_update_delete(self):
+        first, second = self.add_transactions(2)
+        self.assertStats(self.customer, 2, '40000')
+        self.assertEqual(self.customer.last_transaction_at, second.created_at)
+        
+        second.discount = Decimal('5000')
+        second.save()
+        self.assertStats(self.customer, 2, '35000')
+        
+        second.delete()
+        self.assertStats(self.customer, 1, '20000')
+        self.assertEqual(self.customer.last_transaction_at, first.created_at)
+    
+    def test_counters_follow_reassignment(self):
+        other = Customer.objects.create(name='Siti', phone='081200000002')
+        transaction, = self.add_transactions(1)
+        
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.customer = other
+        transaction.save()
+        self.assertStats(self.customer, 0, '0')
+        self.assertIsNone(self.customer.last_transaction_at)
+        self.assertStats(other, 1, '20000')
+    
+    def test_rebuild_command(self):
+        self.add_transactions(3)
+        Customer.objects.update(transaction_count=0, total_spent=0, last_transaction_at=None)
+        stdout = io.StringIO()
+        call_command('rebuild_customer_stats', stdout=stdout)
+        self.assertIn('Statistik 1 pelanggan diperbarui', stdout.getvalue())
+        self.assertStats(self.customer, 3, '60000')
+        self.assertIsNotNone(self.customer.last_transaction_at)
+    
+    def test_list_ordering_by_spend(self):
+        other = Customer.objects.create(name='Siti', phone='081200000002')
+        self.add_transactions(1, customer=other)
+        self.add_transactions(2)
+        response = self.client.get('/api/customers/?ordering=-total_spent')
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, [self.customer.id, other.id])
+        self.assertEqual(response.data['results'][0]['transaction_count'], 2)
+
+
+class DailyRollupTest(APITestMixin, TestCase):
+    def test_rollup_follows_save_status_change_and_delete(self):
+        first, second = self.add_transactions(2, paid_amount=Decimal('20000'))
+        rollup = DailyRollup.objects.get()
+        self.assertEqual(rollup.transaction_count, 2)
+        self.assertEqual(rollup.revenue, Decimal('40000'))
+        self.assertEqual(rollup.paid_amount, Decimal('40000'))
+        self.assertEqual(rollup.diterima_count, 2)
+        
+        first.status = 'selesai'
+        first.save()
+        second.delete()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.transaction_count, 1)
+        self.assertEqual(rollup.diterima_count, 0)
+        self.assertEqual(rollup.selesai_count, 1)
+        self.assertEqual(rollup.revenue, Decimal('20000'))
+        self.verify_rollup()
+    
+    def test_rollup_follows_cashier_change(self):
+        kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        transaction, = self.add_transactions(1)
+        transaction.cashier = kasir
+        transaction.save()
+        self.assertEqual(DailyRollup.objects.get(cashier=kasir).transaction_count, 1)
+        self.assertEqual(DailyRollup.objects.get(cashier=self.user).transaction_count, 0)
+        self.verify_rollup()
+    
+    def test_verify_detects_drift_and_rebuild_fixes_it(self):
+        self.add_transactions(2)
+        DailyRollup.objects.update(revenue=0)
+        with self.assertRaises(CommandError):
+            self.verify_rollup()
+        stdout = io.StringIO()
+        call_command('rebuild_daily_rollup', stdout=stdout)
+        self.assertIn('1 baris rekap harian dibuat ulang', stdout.getvalue())
+        self.verify_rollup()
+    
+    def test_dashboard_stats_from_rollup(self):
+        first, _ = self.add_transactions(2)
+        first.status = 'diambil'
+        first.save()
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['total_transactions'], 2)
+        self.assertEqual(response.data['today_revenue'], '40000.00')
+        self.assertEqual(response.data['monthly_transactions'], 2)
+        self.assertEqual(response.data['active_orders'], 1)
+        self.assertEqual(response.data['pending_orders'], 1)
+
+
+class ReportSeriesTest(QueryBudgetMixin, APITestMixin, TestCase):
+    def add_transactions_on(self, day, count=1, **fields):
+        transactions = self.add_transactions(count, **fields)
+        created_at = timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=10)
+        Transaction.objects.filter(pk__in=[t.pk for t in transactions]).update(created_at=created_at)
+        return transactions
+    
+    def get_report(self, **params):
+        response = self.client.get('/api/transactions/reports/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+    
+    def test_daily_series_is_zero_filled_and_date_to_inclusive(self):
+        self.add_transactions_on(date(2026, 3, 1), 2)
+        self.add_transactions_on(date(2026, 3, 3), 1, status='selesai')
+        
+        data = self.get_report(series='daily', date_from='2026-03-01', date_to='2026-03-03')
+        self.assertEqual(data['total_transactions'], 3)
+        self.assertNotIn('transactions', data)
+        self.assertEqual(
+            [(row['period'], row['transaction_count'], row['revenue']) for row in data['series']],
+            [
+                (date(2026, 3, 1), 2, Decimal('40000')),
+                (date(2026, 3, 2), 0, Decimal('0')),
+                (date(2026, 3, 3), 1, Decimal('20000')),
+            ],
+        )
+    
+    def test_monthly_series_grouped(self):
+        kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.add_transactions_on(date(2026, 1, 15), 2)
+        self.add_transactions_on(date(2026, 2, 10), 1, status='selesai', cashier=kasir)
+        params = {'series': 'monthly', 'date_from': '2026-01-01', 'date_to': '2026-12-31'}
+        
+        data = self.get_report(group_by='status', **params)
+        self.assertEqual(
+            [(row['period'], row['status'], row['transaction_count']) for row in data['series']],
+            [(date(2026, 1, 1), 'diterima', 2), (date(2026, 2, 1), 'selesai', 1)],
+        )
+        
+        data = self.get_report(group_by='cashier', **params)
+        self.assertEqual(
+            [(row['period'], row['cashier_name']) for row in data['series']],
+            [(date(2026, 1, 1), 'admin'), (date(2026, 2, 1), 'kasir1')],
+        )
+        
+        data = self.get_report(group_by='service_type', **params)
+        self.assertEqual(data['series'][0]['service_type'], 'kiloan')
+        self.assertEqual(data['series'][0]['transaction_count'], 2)
+        self.assertEqual(data['series'][0]['quantity'], Decimal('8'))
+        self.assertEqual(data['series'][0]['revenue'], Decimal('40000'))
+    
+    def test_series_query_count_independent_of_rows(self):
+        url = '/api/transactions/reports/?series=daily&date_from=2026-01-01&date_to=2026-12-31'
+        self.assertQueryBudget(url, lambda n: self.add_transactions_on(date(2026, 5, n), n))
+    
+    def test_invalid_parameters(self):
+        response = self.client.get('/api/transactions/reports/', {'series': 'hourly'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/transactions/reports/', {'date_from': 'kemarin', 'date_to': '2026-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionExportTest(APITestMixin, TestCase):
+    def read_export(self, **params):
+        response = self.client.get('/api/transactions/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(content.splitlines()))
+    
+    def test_one_row_per_item(self):
+        first, second = self.add_transactions(2, items=3)
+        rows = self.read_export()
+        self.assertEqual(rows[0][0], 'Nomor Invoice')
+        self.assertEqual(len(rows), 1 + 6)
+        self.assertEqual({row[0] for row in rows[1:]}, {first.invoice_number, second.invoice_number})
+        self.assertEqual(rows[1][6:11], ['Cuci Kiloan Reguler', 'kiloan', '2.00', '5000.00', '10000.00'])
+    
+    def test_uses_list_filters(self):
+        self.add_transactions(1)
+        selesai, = self.add_transactions(1, items=1, status='selesai')
+        rows = self.read_export(status='selesai')
+        self.assertEqual([row[0] for row in rows[1:]], [selesai.invoice_number])
+    
+    def test_kasir_only_exports_own_transactions(self):
+        kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.add_transactions(2)
+        own, = self.add_transactions(1, items=1, cashier=kasir)
+        self.client.force_authenticate(kasir)
+        rows = self.read_export()
+        self.assertEqual([row[0] for row in rows[1:]], [own.invoice_number])
+
+
+class InvoicePDFCacheTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        overrides = override_settings(INVOICE_PDF_CACHE_DIR=self.cache_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.transaction, = self.add_transactions(1)
+        self.url = f'/api/transactions/{self.transaction.id}/download_invoice/'
+    
+    def test_second_download_is_served_from_cache(self):
+        before = invoice_cache.stats()
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        self.assertTrue(first.content.startswith(b'%PDF'))
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertNotIn('Last-Modified', first)
+        after = invoice_cache.stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+    
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+    
+    def test_related_changes_invalidate_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.service.unit = 'kilogram'
+        self.service.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        etag = response['ETag']
+        self.user.username = 'kasir-baru'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_download_loads_transaction_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        selects = [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "app_transaction" ' in q['sql']]
+        self.assertEqual(len(selects), 1)
+    
+    def test_changed_transaction_gets_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.transaction.status = 'selesai'
+        self.transaction.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_eviction_keeps_cache_under_size_limit(self):
+        others = self.add_transactions(3)
+        size = len(self.client.get(self.url).content)
+        with override_settings(INVOICE_PDF_CACHE_MAX_BYTES=size * 2):
+            for transaction in others:
+                self.client.get(f'/api/transactions/{transaction.id}/download_invoice/')
+        files = os.listdir(self.cache_dir)
+        self.assertLessEqual(len(files), 2)
+        self.assertTrue(all(name.endswith('.pdf') for name in files))
+    
+    def test_directory_scanned_only_when_over_limit(self):
+        others = self.add_transactions(5)
+        self.client.get(self.url)
+        before = invoice_cache.stats()['scans']
+        for transaction in others:
+            self.client.get(f'/api/transactions/{transaction.id}/download_invoice/')
+        self.assertEqual(invoice_cache.stats()['scans'], before)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 6)
+
+
+@override_settings(INVOICE_PDF_CACHE_DIR=tempfile.gettempdir() + '/laundry-test-invoices')
+class BatchInvoiceTest(APITestMixin, TestCase):
+    url = '/api/transactions/batch_invoices/'
+    
+    def setUp(self):
+        super().setUp()
+        invoice_cache.clear()
+        self.addCleanup(invoice_cache.clear)
+        today = timezone.localdate().isoformat()
+        self.today = {'date_from': today, 'date_to': today}
+    
+    def test_merged_pdf_has_one_page_per_invoice(self):
+        self.add_transactions(3)
+        self.add_transactions(2, status='selesai')
+        response = self.client.get(self.url, {**self.today, 'status': 'selesai'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(len(PdfReader(BytesIO(response.content)).pages), 2)
+    
+    def test_zip_output_streams_one_pdf_per_invoice(self):
+        transactions = self.add_transactions(3)
+        response = self.client.get(self.url, {**self.today, 'output': 'zip'})
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(
+            sorted(archive.namelist()), sorted(f'Struk_{t.invoice_number}.pdf' for t in transactions)
+        )
+        self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in archive.namelist()))
+    
+    def test_process_pool_matches_inline_order(self):
+        self.add_transactions(10)
+        invoices = [get_invoice_data(t) for t in Transaction.objects.with_details().order_by('pk')]
+        pooled = list(render_invoice_batch(invoices, workers=2))
+        self.assertEqual(len(pooled), 10)
+        for data, content in zip(invoices, pooled):
+            self.assertIn(data['invoice_number'].encode(), PdfReader(BytesIO(content)).pages[0].extract_text().encode())
+    
+    def test_process_pool_is_reused(self):
+        self.add_transactions(20)
+        invoices = [get_invoice_data(t) for t in Transaction.objects.with_details().order_by('pk')]
+        invoice_cache.clear()
+        list(render_invoice_batch(invoices[:10], workers=2))
+        pool = get_render_pool(2)
+        list(render_invoice_batch(invoices[10:], workers=2))
+        self.assertIs(get_render_pool(2), pool)
+        self.assertEqual(pool._mp_context.get_start_method(), 'spawn')
+    
+    def test_no_matching_transactions(self):
+        response = self.client.get(self.url, {**self.today, 'status': 'diambil'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_requires_date_range_and_limit(self):
+        self.add_transactions(3)
+        for params in [{}, {'date_from': self.today['date_from']}, {'status': 'diterima'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+        with override_settings(INVOICE_BATCH_MAX=2):
+            response = self.client.get(self.url, self.today)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Maksimal 2 struk', response.data['error'])
+    
+    def test_management_command(self):
+        self.add_transactions(2)
+        output = os.path.join(tempfile.mkdtemp(), 'struk.pdf')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        stdout = io.StringIO()
+        call_command('render_invoices', output, workers=1, stdout=stdout)
+        self.assertIn(f'2 struk ditulis ke {output}', stdout.getvalue())
+        self.assertEqual(len(PdfReader(output).pages), 2)
+
+
+@override_settings(INVOICE_PDF_CACHE_DIR=tempfile.gettempdir() + '/laundry-test-invoices')
+class ThermalReceiptTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transaction, = self.add_transactions(1, discount=Decimal('1000'), paid_amount=Decimal('20000'), notes='Jangan dilipat (kemeja)')
+        self.url = f'/api/transactions/{self.transaction.id}/download_invoice/'
+        self.data = get_invoice_data(Transaction.objects.with_details().get(pk=self.transaction.pk))
+    
+    def test_lines_fit_paper_width(self):
+        for paper, template in RECEIPT_TEMPLATES.items():
+            lines = template.header + template.body_lines(self.data) + template.footer
+            self.assertTrue(all(len(text) <= template.width for text, _ in lines), paper)
+    
+    def test_narrow_pdf(self):
+        response = self.client.get(self.url, {'paper': '58'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        page = PdfReader(BytesIO(response.content)).pages[0]
+        self.assertAlmostEqual(float(page.mediabox.width), 58 * 72 / 25.4, places=1)
+        text = page.extract_text()
+        self.assertIn(self.transaction.invoice_number, text)
+        self.assertIn('Kembalian', text)
+        self.assertIn('(kemeja)', text)
+    
+    def test_escpos_stream(self):
+        response = self.client.get(self.url, {'paper': '80', 'output': 'escpos'})
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertTrue(response.content.startswith(ESC_INIT))
+        self.assertTrue(response.content.endswith(ESC_FEED_AND_CUT))
+        self.assertIn(self.transaction.invoice_number.encode(), response.content)
+    
+    def test_etag_differs_per_format(self):
+        a4 = self.client.get(self.url)['ETag']
+        thermal = self.client.get(self.url, {'paper': '58'})['ETag']
+        self.assertNotEqual(a4, thermal)
+        self.assertEqual(self.client.get(self.url, {'paper': '58'}, HTTP_IF_NONE_MATCH=thermal).status_code, 304)
+    
+    def test_invalid_format(self):
+        self.assertEqual(self.client.get(self.url, {'paper': 'a5'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'output': 'escpos'}).status_code, 400)
+
+
+@mock.patch.object(KeysetPagination, 'page_size', 3)
+class KeysetPaginationTest(APITestMixin, TestCase):
+    def walk(self, url, params):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+    
+    def test_forward_and_backward_walk(self):
+        transactions = self.add_transactions(8, items=1)
+        expected = [t.id for t in sorted(transactions, key=lambda t: (t.created_at, t.id), reverse=True)]
+        
+        pages = self.walk('/api/transactions/', {'cursor': ''})
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 2])
+        self.assertEqual([row['id'] for page in pages for row in page['results']], expected)
+        self.assertIsNone(pages[0]['previous'])
+        self.assertIsNone(pages[0]['count'])
+        
+        previous = self.client.get(pages[2]['previous']).data
+        self.assertEqual([row['id'] for row in previous['results']], expected[3:6])
+        first = self.client.get(previous['previous']).data
+        self.assertEqual([row['id'] for row in first['results']], expected[:3])
+        self.assertIsNone(first['previous'])
+    
+    def test_honors_ordering_and_filters(self):
+        for discount in ['0', '5000', '1000', '3000', '2000']:
+            self.add_transactions(1, items=1, discount=Decimal(discount))
+        self.add_transactions(2, status='selesai')
+        pages = self.walk('/api/transactions/', {'cursor': '', 'ordering': 'total_amount', 'status': 'diterima'})
+        amounts = [Decimal(row['total_amount']) for page in pages for row in page['results']]
+        self.assertEqual(amounts, [Decimal('10000')] * 5)
+        
+        pages = self.walk('/api/customers/', {'cursor': '', 'ordering': 'name'})
+        self.assertEqual(len(pages), 1)
+    
+    def test_no_offset_and_optional_count(self):
+        self.add_transactions(5, items=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/transactions/', {'cursor': ''})
+            self.client.get(response.data['next'])
+        sql = ' '.join(q['sql'] for q in queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(', sql)
+        
+        self.assertEqual(self.client.get('/api/transactions/', {'cursor': '', 'count': 'exact'}).data['count'], 5)
+        self.assertEqual(self.client.get('/api/transactions/', {'cursor': '', 'count': 'cached'}).data['count'], 5)
+    
+    def test_page_number_remains_default(self):
+        self.add_transactions(4, items=1)
+        response = self.client.get('/api/transactions/', {'page': 2})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(response.data['results']), 1)
+    
+    def test_invalid_cursor_and_nullable_ordering(self):
+        self.assertEqual(self.client.get('/api/transactions/', {'cursor': '%%%'}).status_code, 404)
+        # Cursor yang diubah klien: tipe nilai salah untuk field kunci atau pk
+        for token in (['x', 1, 0], ['2026-01-01T00:00:00+07:00', 'x', 0], ['2026-01-01T00:00:00+07:00', [1], 0],
+                      [None, 1, 0], {'a': 1, 'b': 2, 'c': 3}):
+            cursor = base64.urlsafe_b64encode(json.dumps(token).encode()).decode().rstrip('=')
+            with self.subTest(token=token):
+                self.assertEqual(self.client.get('/api/transactions/', {'cursor': cursor}).status_code, 404)
+        cursor = base64.urlsafe_b64encode(json.dumps(['abc', 1, 0]).encode()).decode().rstrip('=')
+        response = self.client.get('/api/transactions/', {'cursor': cursor, 'ordering': 'total_amount'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/customers/', {'cursor': '', 'ordering': '-last_transaction_at'})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryPlanTest(QueryPlanMixin, APITestMixin, TestCase):
+    urls = [
+        '/api/transactions/',
+        '/api/transactions/?status=dicuci',
+        '/api/transactions/?date_from=2026-01-01&date_to=2026-01-31',
+        '/api/transactions/?cursor=&status=selesai',
+        '/api/transactions/reports/',
+        '/api/transactions/reports/?period=monthly&series=daily',
+        '/api/transactions/reports/?series=weekly&group_by=service_type',
+        '/api/transactions/reports/?series=daily&group_by=cashier',
+    ]
+    
+    def setUp(self):
+        super().setUp()
+        self.kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.add_transactions(3)
+        self.add_transactions(2, cashier=self.kasir, status='dicuci')
+    
+    def test_transaction_endpoints_use_indexes(self):
+        urls = self.urls + [f'/api/transactions/?customer={self.customer.id}', f'/api/customers/{self.customer.id}/transactions/']
+        for user in (self.user, self.kasir):
+            self.client.force_authenticate(user)
+            for url in urls:
+                with self.subTest(role=user.role, url=url):
+                    self.assertIndexedPlans(url)
+    
+    def test_dashboard_uses_indexes(self):
+        self.client.force_authenticate(self.kasir)
+        self.assertIndexedPlans('/api/dashboard/stats/')
+        
+        # Admin menjumlah seluruh rekap harian (satu baris per hari per kasir)
+        self.client.force_authenticate(self.user)
+        self.assertIndexedPlans('/api/dashboard/stats/', allow=['app_dailyrollup'])
+    
+    def test_detects_full_scan(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Transaction.objects.filter(paid_amount__gt=0).order_by())
+        self.assertEqual(len(self.full_scans(queries.captured_queries)), 1)
+
+
+class FullTextSearchTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.siti = Customer.objects.create(name='Siti Aminah', phone='085700000002', email='siti@contoh.id')
+        self.other = Customer.objects.create(name='Andi', phone='081300000003', email='andi.budiman@contoh.id')
+    
+    def search(self, resource, term, **params):
+        response = self.client.get(f'/api/{resource}/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['results']
+    
+    def test_customer_prefix_and_token_match(self):
+        self.assertEqual([row['name'] for row in self.search('customers', 'sit')], ['Siti Aminah'])
+        self.assertEqual([row['name'] for row in self.search('customers', 'amin siti')], ['Siti Aminah'])
+        self.assertEqual([row['name'] for row in self.search('customers', '08570')], ['Siti Aminah'])
+        self.assertEqual(self.search('customers', 'siti andi'), [])
+    
+    def test_customer_ranked_by_relevance(self):
+        # "budi" cocok dengan nama Budi dan email andi.budiman; nama lebih relevan
+        names = [row['name'] for row in self.search('customers', 'budi')]
+        self.assertEqual(names, ['Budi', 'Andi'])
+        names = [row['name'] for row in self.search('customers', 'budi', ordering='-created_at')]
+        self.assertEqual(names, ['Andi', 'Budi'])
+    
+    def test_transaction_search_follows_customer_changes(self):
+        transaction, = self.add_transactions(1)
+        self.add_transactions(1, customer=self.siti)
+        
+        invoice = transaction.invoice_number
+        self.assertEqual([row['id'] for row in self.search('transactions', invoice)], [transaction.id])
+        self.assertEqual([row['id'] for row in self.search('transactions', invoice.split('-')[-1] + ' budi')], [transaction.id])
+        
+        Customer.objects.filter(pk=self.customer.pk).update(name='Bambang')
+        self.assertEqual(self.search('transactions', 'budi'), [])
+        self.assertEqual([row['id'] for row in self.search('transactions', 'bambang')], [transaction.id])
+        
+        transaction.customer = self.siti
+        transaction.save()
+        self.assertEqual(len(self.search('transactions', 'siti')), 2)
+        
+        transaction.delete()
+        self.assertEqual(len(self.search('transactions', 'siti')), 1)
+    
+    def test_rebuild_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER customer_fts_insert')
+        Customer.objects.create(name='Joko', phone='081900000004')
+        self.assertEqual(self.search('customers', 'joko'), [])
+        
+        call_command('migrate', verbosity=0)
+        self.assertEqual([row['name'] for row in self.search('customers', 'joko')], ['Joko'])
+    
+    def test_like_fallback_without_index(self):
+        with mock.patch('app.search_utils.search_index_ready', return_value=False):
+            # LIKE juga mencocokkan potongan di tengah kata
+            self.assertEqual([row['name'] for row in self.search('customers', 'minah')], ['Siti Aminah'])
+        self.assertEqual(self.search('customers', 'minah'), [])
+
+
+class PhoneAutocompleteTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        phone_index.clear()
+        self.addCleanup(phone_index.clear)
+        Customer.objects.create(name='Siti', phone='+62 812-0000-0002')
+        Customer.objects.create(name='Andi', phone='6281300000003')
+        Customer.objects.create(name='John', phone='+1 415 555 0100')
+    
+    def autocomplete(self, q, **params):
+        response = self.client.get('/api/customers/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['name'] for row in response.data]
+    
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone('0812-0000-0001'), '+6281200000001')
+        self.assertEqual(normalize_phone('+62 812 0000 0001'), '+6281200000001')
+        self.assertEqual(normalize_phone('6281200000001'), '+6281200000001')
+        self.assertEqual(normalize_phone('81200000001'), '+6281200000001')
+        self.assertEqual(normalize_phone('0062812 0000 0001'), '+6281200000001')
+        self.assertEqual(normalize_phone(''), '')
+        self.assertEqual(Customer.objects.get(name='Budi').phone_normalized, '+6281200000001')
+    
+    def test_prefix_in_any_format(self):
+        for q in ['0812', '812', '+62812', '62 812']:
+            self.assertEqual(self.autocomplete(q), ['Budi', 'Siti'], q)
+        self.assertEqual(self.autocomplete('08'), ['Budi', 'Siti', 'Andi'])
+        self.assertEqual(self.autocomplete('08', limit=1), ['Budi'])
+        self.assertEqual(self.autocomplete('+1415'), ['John'])
+        self.assertEqual(self.autocomplete('0899'), [])
+        self.assertEqual(self.autocomplete('budi'), [])
+    
+    def test_index_follows_changes_without_reload(self):
+        self.assertEqual(self.autocomplete('0812'), ['Budi', 'Siti'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            joko = Customer.objects.create(name='Joko', phone='0812 0000 0000')
+        with self.captureOnCommitCallbacks(execute=True):
+            siti = Customer.objects.get(name='Siti')
+            siti.phone = '0857 0000 0002'
+            siti.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.filter(name='Budi').delete()
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(phone_index.search('0812'), [{
+                'id': joko.id, 'name': 'Joko', 'phone': '0812 0000 0000', 'phone_normalized': '+6281200000000',
+            }])
+        self.assertEqual(self.autocomplete('0857'), ['Siti'])
+    
+    def test_sync_picks_up_changes_from_other_processes(self):
+        self.assertEqual(self.autocomplete('0877'), [])
+        
+        # Tanpa signal, seperti perubahan dari worker lain
+        Customer.objects.bulk_create([Customer(name='Rina', phone='0877', phone_normalized='+62877')])
+        self.assertEqual(self.autocomplete('0877'), [])
+        
+        phone_index.synced_at = 0
+        self.assertEqual(self.autocomplete('0877'), ['Rina'])
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
+    def me(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get('/api/auth/me/')
+    
+    def test_cache_hit_skips_token_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.me().status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.me().data['username'], 'kasir1')
+        stats = token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+    
+    def test_logout_invalidates_token(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(self.me().status_code, 401)
+    
+    def test_user_changes_invalidate_snapshot(self):
+        self.assertEqual(self.me().data['role'], 'kasir')
+        
+        user = User.objects.get(pk=self.user.pk)
+        user.role = 'admin'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.me().data['role'], 'admin')
+        
+        user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.me().status_code, 401)
+    
+    def test_ttl_and_lru_bound(self):
+        cache = token_cache.__class__(max_size=2, ttl=30)
+        for key in 'abc':
+            cache.set(key, self.user, self.token, cache.generation)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        
+        with mock.patch('app.authentication.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['expired'], 1)
+    
+    def test_stale_fill_after_invalidation_is_dropped(self):
+        generation = token_cache.generation
+        token_cache.invalidate_user(self.user.pk)
+        token_cache.set(self.token.key, self.user, self.token, generation)
+        self.assertIsNone(token_cache.get(self.token.key))
+    
+    def test_cache_stats_endpoint(self):
+        self.assertEqual(self.client.get('/api/auth/cache-stats/').status_code, 403)
+        admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/auth/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hits', response.data['token_auth'])
+
+
+@override_settings(READ_REPLICA='replica')
+class ReadReplicaRoutingTest(APITestMixin, TransactionTestCase):
+    databases = {'default', 'replica'}
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.add_transactions(2)
+        refresh_sqlite_replica()
+        # Belum tersalin ke replika
+        self.add_transactions(1)
+    
+    def dashboard_total(self):
+        return self.client.get('/api/dashboard/stats/').data['total_transactions']
+    
+    def test_marked_views_read_from_replica(self):
+        self.assertEqual(self.dashboard_total(), 2)
+        self.assertEqual(self.client.get('/api/transactions/reports/?period=monthly').data['total_transactions'], 2)
+        rows = list(csv.reader(b''.join(self.client.get('/api/transactions/export/').streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 1 + 2 * 2)
+        # View lain tetap membaca database utama
+        self.assertEqual(self.client.get('/api/transactions/').data['count'], 3)
+        
+        refresh_sqlite_replica()
+        self.assertEqual(self.dashboard_total(), 3)
+    
+    def test_read_your_writes_after_write(self):
+        response = self.client.post('/api/customers/', {'name': 'Siti', 'phone': '081200000002'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Customer.objects.using('default').filter(name='Siti').count(), 1)
+        self.assertEqual(self.dashboard_total(), 3)
+        
+        # User lain tidak ikut sticky
+        other = User.objects.create_user(username='owner', password='owner123', role='owner')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.dashboard_total(), 2)
+    
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+        },
+        REPLICA_STICKY_CACHE='shared',
+    )
+    def test_sticky_flag_uses_configured_cache(self):
+        response = self.client.post('/api/customers/', {'name': 'Siti', 'phone': '081200000002'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(caches['shared'].get(sticky_key(self.user.pk)))
+        self.assertIsNone(caches['default'].get(sticky_key(self.user.pk)))
+        self.assertEqual(self.dashboard_total(), 3)
+        
+        caches['shared'].clear()
+        self.assertEqual(self.dashboard_total(), 2)
+    
+    def test_without_replica_setting_reads_primary(self):
+        with override_settings(READ_REPLICA=None):
+            self.assertEqual(self.dashboard_total(), 3)
+
+
+class ServiceCatalogCacheTest(APITestMixin, TestCase):
+    url = '/api/services/'
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        service_catalog.clear()
+        self.addCleanup(service_catalog.clear)
+        Service.objects.create(name='Kemeja', service_type='satuan', price_per_unit=Decimal('8000'), unit='pcs')
+        Service.objects.create(
+            name='Selimut', service_type='satuan', price_per_unit=Decimal('20000'), unit='pcs', is_active=False
+        )
+    
+    def names(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        return [service['name'] for service in response.data['results']]
+    
+    def test_list_served_from_cache_with_same_shape(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(self.names(first), ['Cuci Kiloan Reguler', 'Kemeja', 'Selimut'])
+        self.assertEqual(first.data['count'], 3)
+        self.assertEqual(first.data['results'][0]['price_per_unit'], '5000.00')
+        
+        # Sama dengan hasil query biasa (lewat jalur pencarian)
+        uncached = self.client.get(self.url, {'search': 'e'})
+        self.assertNotEqual(uncached['ETag'], first['ETag'])
+        self.assertEqual(uncached.data['results'], [s for s in first.data['results'] if 'e' in s['name'].lower()])
+    
+    def test_filters_applied_in_memory(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            active = self.client.get(self.url, {'is_active': 'true'})
+            satuan = self.client.get(self.url, {'service_type': 'satuan', 'is_active': 'false'})
+        self.assertEqual(self.names(active), ['Cuci Kiloan Reguler', 'Kemeja'])
+        self.assertEqual(self.names(satuan), ['Selimut'])
+        self.assertNotEqual(active['ETag'], satuan['ETag'])
+    
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url, {'is_active': 'true'})['ETag']
+        response = self.client.get(self.url, {'is_active': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(service_catalog.stats()['not_modified'], 1)
+        # ETag per filter: filter lain tidak ikut 304
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_save_and_delete_bump_version(self):
+        etag = self.client.get(self.url)['ETag']
+        self.service.price_per_unit = Decimal('6000')
+        self.service.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['price_per_unit'], '6000.00')
+        
+        etag = response['ETag']
+        Service.objects.get(name='Selimut').delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(response), ['Cuci Kiloan Reguler', 'Kemeja'])
+    
+    def test_transaction_items_use_catalog_price(self):
+        kemeja = Service.objects.get(name='Kemeja')
+        payload = {
+            'customer': self.customer.id,
+            'items': [
+                {'service': self.service.id, 'quantity': '2'},
+                {'service': kemeja.id, 'quantity': '3', 'unit_price': '7500'},
+            ],
+        }
+        service_catalog.snapshot()
+        serializer = TransactionCreateSerializer(data=payload)
+        # Layanan divalidasi dari katalog; hanya harga default yang dibaca dari database, satu query
+        with CaptureQueriesContext(connection) as queries:
+            serializer.is_valid(raise_exception=True)
+        service_queries = [q['sql'] for q in queries if 'app_service' in q['sql']]
+        self.assertEqual(len(service_queries), 1)
+        self.assertIn('"price_per_unit"', service_queries[0])
+        
+        transaction = serializer.save()
+        prices = dict(transaction.items.values_list('service__name', 'unit_price'))
+        self.assertEqual(prices, {'Cuci Kiloan Reguler': Decimal('5000'), 'Kemeja': Decimal('7500')})
+        self.assertEqual(transaction.total_amount, Decimal('32500'))
+    
+    def test_default_price_not_taken_from_stale_catalog(self):
+        # Harga diubah di proses lain: versi katalog di proses ini belum berubah
+        service_catalog.snapshot()
+        Service.objects.filter(pk=self.service.pk).update(price_per_unit=Decimal('6500'))
+        self.assertEqual(service_catalog.get_service(self.service.pk).price_per_unit, Decimal('5000'))
+        
+        response = self.client.post('/api/transactions/', {
+            'customer': self.customer.id, 'items': [{'service': self.service.id, 'quantity': '2'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['items'][0]['unit_price'], '6500.00')
+        
+        response = self.client.post('/api/transactions/sync/', {'transactions': [
+            {'idempotency_key': f'K{n}', 'customer': self.customer.id, 'items': [{'service': self.service.id, 'quantity': '1'}]}
+            for n in range(3)
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            set(TransactionItem.objects.filter(transaction__idempotency_key__isnull=False).values_list('unit_price', flat=True)),
+            {Decimal('6500')},
+        )
+    
+    def test_unknown_service_rejected(self):
+        serializer = TransactionCreateSerializer(data={
+            'customer': self.customer.id, 'items': [{'service': 9999, 'quantity': '1'}],
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('service', serializer.errors['items'][0])
+
+
+
+class ConditionalGetTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transaction, = self.add_transactions(1)
+    
+    def revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+    
+    def test_list_returns_304_without_serializing(self):
+        for url in ['/api/customers/', '/api/transactions/', '/api/transactions/?cursor=', '/api/services/?search=cuci']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], 'private, no-cache')
+                with CaptureQueriesContext(connection) as queries:
+                    not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b'')
+                # Hanya query validator (maks. 3 kolom), tanpa SELECT baris lengkap
+                self.assertFalse([q for q in queries if q['sql'].split(' FROM ')[0].count(',') > 2])
+    
+    def test_etag_depends_on_filters_and_page(self):
+        url = '/api/transactions/'
+        etags = {self.client.get(url, params)['ETag'] for params in [{}, {'status': 'diterima'}, {'page_size': 5}]}
+        self.assertEqual(len(etags), 3)
+    
+    def test_list_etag_changes_on_create_update_delete(self):
+        url = '/api/transactions/'
+        response = self.client.get(url)
+        
+        other, = self.add_transactions(1)
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        
+        other.status = 'selesai'
+        other.save()
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        
+        # Penghapusan tidak menggeser MAX(updated_at) tetapi mengubah COUNT
+        other.delete()
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+    
+    def test_related_customer_change_invalidates_transactions(self):
+        url = f'/api/transactions/{self.transaction.id}/'
+        response = self.client.get(url)
+        Customer.objects.filter(pk=self.customer.pk).update(name='Budi Santoso', updated_at=timezone.now())
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['customer_name'], 'Budi Santoso')
+    
+    def test_related_service_change_invalidates_transactions(self):
+        for url in ['/api/transactions/', f'/api/transactions/{self.transaction.id}/']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.service.name = f'Cuci Kiloan {url}'
+                self.service.save()
+                response = self.revalidate(url, response)
+                self.assertEqual(response.status_code, 200)
+                items = response.data['results'][0]['items'] if 'results' in response.data else response.data['items']
+                self.assertEqual(items[0]['service_name'], f'Cuci Kiloan {url}')
+    
+    def test_related_cashier_change_invalidates_transactions(self):
+        for url in ['/api/transactions/', f'/api/transactions/{self.transaction.id}/']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.user.username = f'admin-{len(url)}'
+                self.user.save()
+                response = self.revalidate(url, response)
+                self.assertEqual(response.status_code, 200)
+                row = response.data['results'][0] if 'results' in response.data else response.data
+                self.assertEqual(row['cashier_name'], f'admin-{len(url)}')
+    
+    def test_customer_stats_change_invalidates_customer(self):
+        url = f'/api/customers/{self.customer.id}/'
+        response = self.client.get(url)
+        self.add_transactions(1)
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['transaction_count'], 2)
+    
+    def test_detail_if_modified_since(self):
+        url = f'/api/transactions/{self.transaction.id}/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+        # List tanpa Last-Modified: penghapusan tidak terlihat dari tanggal
+        self.assertNotIn('Last-Modified', self.client.get('/api/transactions/'))
+    
+    def test_invalid_pk_returns_404(self):
+        for url in ['/api/customers/abc/', '/api/transactions/abc/', '/api/services/abc/']:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+    
+    def test_other_cashier_gets_404_not_304(self):
+        url = f'/api/transactions/{self.transaction.id}/'
+        etag = self.client.get(url)['ETag']
+        kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.client.force_authenticate(kasir)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+class FastJSONRendererTest(APITestMixin, TestCase):
+    def assertSameJSON(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_matches_default_renderer(self):
+        jakarta = timezone.get_fixed_timezone(7 * 60)
+        moment = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.get_fixed_timezone(0))
+        self.assertSameJSON({
+            'decimal': Decimal('12345.50'),
+            'zero': Decimal('0.00'),
+            'utc': moment,
+            'utc_whole_second': moment.replace(microsecond=0),
+            'jakarta': moment.astimezone(jakarta),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'date': date(2026, 1, 2),
+            'time': moment.time(),
+            'lazy': gettext_lazy('Aktif'),
+            'unicode': 'Cuci \u2028 kering \u00e9',
+            1: [None, True, 1.5, {'nested': Decimal('1')}],
+        })
+    
+    def test_report_payload_matches(self):
+        self.add_transactions(3)
+        response = self.client.get('/api/transactions/reports/')
+        self.assertEqual(response.status_code, 200)
+        self.assertSameJSON(response.data)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        
+        series = self.client.get('/api/transactions/reports/', {'series': 'daily', 'group_by': 'status'})
+        self.assertSameJSON(series.data)
+    
+    def test_indent_falls_back_to_default_renderer(self):
+        data = {'total': Decimal('1.50')}
+        context = {'indent': 2}
+        self.assertEqual(FastJSONRenderer().render(data, renderer_context=context), JSONRenderer().render(data, renderer_context=context))
+
+
+@override_settings(INVOICE_PDF_CACHE_DIR=tempfile.gettempdir() + '/laundry-test-invoices')
+class ResponseCompressionTest(APITestMixin, TestCase):
+    url = '/api/transactions/reports/'
+    
+    def setUp(self):
+        super().setUp()
+        self.add_transactions(20)
+    
+    def test_gzip_for_large_json(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+    
+    def test_not_compressed_when_refused_small_or_binary(self):
+        self.assertFalse(self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity').has_header('Content-Encoding'))
+        self.assertFalse(self.client.get('/api/auth/me/', HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+        transaction = Transaction.objects.first()
+        pdf = self.client.get(f'/api/transactions/{transaction.id}/download_invoice/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(pdf.has_header('Content-Encoding'))
+    
+    def test_conditional_get_with_weak_etag(self):
+        url = '/api/transactions/'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    @skipUnless(brotli, 'paket brotli tidak terpasang')
+    def test_brotli_preferred_when_available(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+
+class TransactionReadSerializerTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        kemeja = Service.objects.create(name='Kemeja', service_type='satuan', price_per_unit=Decimal('8000'), unit='pcs')
+        kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.add_transactions(2, discount=Decimal('1500.5'), notes='Pisahkan warna \u2028 putih')
+        done, = self.add_transactions(1, items=0, cashier=kasir, status='selesai', paid_amount=Decimal('20000'))
+        done.estimated_completion = done.completed_at = timezone.now()
+        done.save()
+        Transaction.create_with_items(
+            [{'service': kemeja, 'quantity': Decimal('3'), 'unit_price': Decimal('7500'), 'notes': 'Kancing lepas'}],
+            customer=self.customer, cashier=kasir, status='diambil', taken_at=timezone.now(),
+        )
+        kasir.delete()  # cashier_id NULL
+    
+    def assertParity(self, queryset):
+        expected = JSONRenderer().render(TransactionSerializer(queryset.with_details(), many=True).data)
+        actual = JSONRenderer().render(TransactionReadSerializer(TransactionReadSerializer.values(queryset)).data)
+        self.assertEqual(actual, expected)
+    
+    def test_output_identical_to_model_serializer(self):
+        self.assertParity(Transaction.objects.all())
+        self.assertParity(Transaction.objects.filter(cashier__isnull=True))
+        self.assertParity(Transaction.objects.none())
+    
+    def test_endpoints_identical_to_model_serializer(self):
+        expected = TransactionSerializer(Transaction.objects.with_details(), many=True).data
+        for url, params, key in [
+            ('/api/transactions/', {}, 'results'),
+            ('/api/transactions/', {'cursor': ''}, 'results'),
+            ('/api/transactions/', {'search': 'budi'}, 'results'),
+            ('/api/transactions/reports/', {'period': 'monthly'}, 'transactions'),
+            (f'/api/customers/{self.customer.id}/transactions/', {}, None),
+        ]:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200, response.content)
+                data = response.data[key] if key else response.data
+                self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+    
+    @mock.patch.object(KeysetPagination, 'page_size', 2)
+    def test_cursor_links_from_value_rows(self):
+        pages = []
+        url, params = '/api/transactions/', {'cursor': '', 'ordering': 'total_amount'}
+        while url:
+            response = self.client.get(url, params)
+            pages.append([row['id'] for row in response.data['results']])
+            url, params = response.data['next'], None
+        ordered = Transaction.objects.order_by('total_amount', 'pk').values_list('pk', flat=True)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual([pk for page in pages for pk in page], list(ordered))
+    
+    def test_items_loaded_in_one_query(self):
+        with self.assertNumQueries(2):
+            TransactionReadSerializer(TransactionReadSerializer.values(Transaction.objects.all())).data
+
+
+
+class BulkStatusTest(APITestMixin, TestCase):
+    url = '/api/transactions/bulk_status/'
+    
+    def setUp(self):
+        super().setUp()
+        self.kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.washing = self.add_transactions(3, status='dicuci')
+        self.done, = self.add_transactions(1, status='selesai', completed_at=timezone.now() - timedelta(days=1))
+        self.other, = self.add_transactions(1, cashier=self.kasir, status='dicuci')
+    
+    def bulk_status(self, ids, new_status):
+        response = self.client.post(self.url, {'ids': ids, 'status': new_status}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+    
+    def test_moves_many_orders_with_set_based_update(self):
+        ids = [t.id for t in self.washing]
+        with CaptureQueriesContext(connection) as queries:
+            data = self.bulk_status(ids + [self.done.id, 999999], 'selesai')
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual(data['results'], {**dict.fromkeys(ids, 'updated'), self.done.id: 'unchanged', 999999: 'not_found'})
+        updates = [q for q in queries if q['sql'].startswith('UPDATE "app_transaction"')]
+        self.assertEqual(len(updates), 1)
+        
+        for transaction in Transaction.objects.filter(pk__in=ids):
+            self.assertEqual(transaction.status, 'selesai')
+            self.assertIsNotNone(transaction.completed_at)
+        # completed_at yang sudah ada tidak ditimpa
+        self.assertEqual(Transaction.objects.get(pk=self.done.pk).completed_at, self.done.completed_at)
+        self.verify_rollup()
+    
+    def test_taken_at_set_when_picked_up(self):
+        data = self.bulk_status([self.done.id], 'diambil')
+        self.assertEqual(data['results'], {self.done.id: 'updated'})
+        done = Transaction.objects.get(pk=self.done.pk)
+        self.assertIsNotNone(done.taken_at)
+        self.assertGreater(done.updated_at, self.done.updated_at)
+    
+    def test_rejects_backward_transitions(self):
+        data = self.bulk_status([self.done.id, self.washing[0].id], 'disetrika')
+        self.assertEqual(data['results'], {self.done.id: 'invalid_transition', self.washing[0].id: 'updated'})
+        self.assertEqual(Transaction.objects.get(pk=self.done.pk).status, 'selesai')
+        self.verify_rollup()
+    
+    def test_single_update_status_still_corrects_mistakes(self):
+        # Aturan hanya-maju khusus bulk_status; update_status tetap bisa mengoreksi status yang salah
+        response = self.client.patch(f'/api/transactions/{self.done.id}/update_status/', {'status': 'disetrika'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Transaction.objects.get(pk=self.done.pk).status, 'disetrika')
+        self.verify_rollup()
+    
+    def test_kasir_only_updates_own_transactions(self):
+        self.client.force_authenticate(self.kasir)
+        data = self.bulk_status([self.other.id, self.washing[0].id], 'disetrika')
+        self.assertEqual(data['results'], {self.other.id: 'updated', self.washing[0].id: 'not_found'})
+        self.assertEqual(Transaction.objects.get(pk=self.washing[0].pk).status, 'dicuci')
+    
+    def test_invalid_payload(self):
+        for payload in [{}, {'ids': [], 'status': 'selesai'}, {'ids': [1], 'status': 'hilang'}, {'ids': ['x'], 'status': 'selesai'}]:
+            with self.subTest(payload=payload):
+                self.assertEqual(self.client.post(self.url, payload, format='json').status_code, 400)
+
+
+class OfflineSyncTest(APITestMixin, TestCase):
+    url = '/api/transactions/sync/'
+    
+    def setUp(self):
+        super().setUp()
+        self.kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.other_customer = Customer.objects.create(name='Siti', phone='081200000002')
+    
+    def entry(self, key, customer=None, quantity='2', **fields):
+        return {
+            'idempotency_key': key,
+            'customer': (customer or self.customer).id,
+            'items': [{'service': self.service.id, 'quantity': quantity}],
+            **fields,
+        }
+    
+    def sync(self, entries, expected_status=200):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'transactions': entries}, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return response.data
+    
+    def test_bulk_inserts_batch_and_maps_keys(self):
+        entries = [self.entry(f'T1-{n}', customer=self.other_customer if n % 2 else None, discount='1000') for n in range(50)]
+        with CaptureQueriesContext(connection) as queries:
+            data = self.sync(entries)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "app_transaction')]
+        self.assertEqual(len(inserts), 2)
+        # Jumlah query tetap untuk berapa pun ukuran batch (tanpa SAVEPOINT)
+        statements = [q for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertLessEqual(len(statements), 15)
+        
+        self.assertEqual((data['created'], data['existing']), (50, 0))
+        self.assertEqual([result['idempotency_key'] for result in data['results']], [entry['idempotency_key'] for entry in entries])
+        transactions = Transaction.objects.in_bulk([result['id'] for result in data['results']])
+        for result in data['results']:
+            transaction = transactions[result['id']]
+            self.assertEqual(result['result'], 'created')
+            self.assertEqual(transaction.idempotency_key, result['idempotency_key'])
+            self.assertEqual(transaction.invoice_number, result['invoice_number'])
+            self.assertEqual(transaction.cashier, self.user)
+            self.assertEqual(transaction.final_amount, Decimal('9000'))
+            self.assertEqual(transaction.items.get().subtotal, Decimal('10000'))
+        self.assertEqual(len({result['invoice_number'] for result in data['results']}), 50)
+        
+        customer = Customer.objects.get(pk=self.customer.pk)
+        self.assertEqual((customer.transaction_count, customer.total_spent), (25, Decimal('225000')))
+        self.assertIsNotNone(customer.last_transaction_at)
+        self.verify_rollup()
+    
+    def test_resending_batch_does_not_duplicate(self):
+        first = self.sync([self.entry('A'), self.entry('B')])
+        second = self.sync([self.entry('B'), self.entry('C'), self.entry('A')])
+        self.assertEqual((second['created'], second['existing']), (1, 2))
+        by_key = {result['idempotency_key']: result for result in first['results'] + second['results']}
+        self.assertEqual([result['result'] for result in second['results']], ['existing', 'created', 'existing'])
+        self.assertEqual(second['results'][0], {**by_key['B'], 'result': 'existing'})
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertEqual(Customer.objects.get(pk=self.customer.pk).transaction_count, 3)
+        self.verify_rollup()
+    
+    def test_key_of_other_cashier_is_conflict(self):
+        self.sync([self.entry('A')])
+        self.client.force_authenticate(self.kasir)
+        data = self.sync([self.entry('A'), self.entry('K')])
+        self.assertEqual(data['results'][0], {'idempotency_key': 'A', 'result': 'conflict', 'id': None, 'invoice_number': None})
+        self.assertEqual(data['results'][1]['result'], 'created')
+        self.assertEqual(Transaction.objects.get(idempotency_key='K').cashier, self.kasir)
+    
+    def test_publishes_single_event(self):
+        backend = LocalBackend()
+        with mock.patch.object(event_bus, '_backend', backend), mock.patch.object(backend, 'has_subscribers', return_value=True):
+            self.sync([self.entry('A'), self.entry('B')])
+        self.assertEqual(backend.stats()['published'], 1)
+        event = backend._history[-1]
+        payload = json.loads(event.payloads[None])
+        self.assertEqual(payload['type'], 'transaction.created')
+        self.assertEqual(len(payload['transactions']), 2)
+        self.assertEqual(payload['dashboard']['today_transactions'], 2)
+    
+    def test_invalid_batch_creates_nothing(self):
+        payloads = [
+            {},
+            {'transactions': []},
+            {'transactions': [self.entry('A'), self.entry('A')]},
+            {'transactions': [self.entry('A'), self.entry('B', quantity='x')]},
+            {'transactions': [self.entry('A'), {**self.entry('B'), 'customer': 999999}]},
+            {'transactions': [{**self.entry('A'), 'idempotency_key': 'x' * 65}]},
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                self.assertEqual(self.client.post(self.url, payload, format='json').status_code, 400)
+        self.assertFalse(Transaction.objects.exists())
+    
+    def test_idempotency_key_header_on_create(self):
+        payload = {'customer': self.customer.id, 'items': [{'service': self.service.id, 'quantity': '2'}]}
+        first = self.client.post('/api/transactions/', payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        retry = self.client.post('/api/transactions/', payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Transaction.objects.filter(idempotency_key='retry-1').count(), 1)
+        self.assertEqual(Customer.objects.get(pk=self.customer.pk).transaction_count, 1)
+        
+        self.client.post('/api/transactions/', payload, format='json')
+        self.client.post('/api/transactions/', payload, format='json')
+        self.assertEqual(Transaction.objects.count(), 3)
+        
+        self.client.force_authenticate(self.kasir)
+        response = self.client.post('/api/transactions/', payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post('/api/transactions/', payload, format='json', HTTP_IDEMPOTENCY_KEY='x' * 65)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_concurrent_create_with_same_key(self):
+        # Request lain menyimpan kunci yang sama di antara pengecekan dan INSERT
+        payload = {'customer': self.customer.id, 'items': [{'service': self.service.id, 'quantity': '2'}]}
+        original = Transaction.objects.filter
+        
+        def filter_after_race(*args, **kwargs):
+            if kwargs.get('idempotency_key') == 'race' and not Transaction.objects.all().filter(idempotency_key='race').exists():
+                Transaction.create_with_items([{'service': self.service, 'quantity': Decimal('1'), 'unit_price': Decimal('5000')}],
+                                              customer=self.customer, cashier=self.user, idempotency_key='race')
+                return original(pk=None)
+            return original(*args, **kwargs)
+        
+        with mock.patch.object(Transaction.objects, 'filter', side_effect=filter_after_race):
+            response = self.client.post('/api/transactions/', payload, format='json', HTTP_IDEMPOTENCY_KEY='race')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transaction.objects.filter(idempotency_key='race').count(), 1)
+        self.verify_rollup()
+
+
+def parse_sse(message):
+    """(event, data) dari satu pesan SSE"""
+    fields = dict(line.split(': ', 1) for line in message.decode().strip().split('\n'))
+    return fields.get('event'), json.loads(fields['data'])
+
+
+class EventStreamTest(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = LocalBackend(history=4, queue_size=3)
+        patcher = mock.patch.object(event_bus, '_backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.token = Token.objects.create(user=self.user)
+    
+    def commit(self, func, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return func(*args, **kwargs)
+    
+    async def next_event(self, subscription):
+        message = await subscription.get(1)
+        self.assertIsNotNone(message, 'event tidak terkirim')
+        return parse_sse(message)
+    
+    async def test_deltas_follow_dashboard_stats(self):
+        dashboard = sync_to_async(lambda: self.client.get('/api/dashboard/stats/').data)
+        subscription = self.backend.subscribe()
+        before = await dashboard()
+        transaction, = await sync_to_async(self.commit)(self.add_transactions, 1)
+        
+        name, data = await self.next_event(subscription)
+        self.assertEqual(name, 'transaction.created')
+        row, = data['transactions']
+        self.assertEqual((row['id'], row['invoice_number'], len(row['items'])), (transaction.id, transaction.invoice_number, 2))
+        after = await dashboard()
+        for field, delta in data['dashboard'].items():
+            self.assertEqual(Decimal(str(before[field])) + Decimal(str(delta)), Decimal(str(after[field])), field)
+        self.assertEqual(data['dashboard']['today_revenue'], '20000.00')
+        
+        url = f'/api/transactions/{transaction.id}/update_status/'
+        await sync_to_async(self.commit)(self.client.patch, url, {'status': 'diambil'}, format='json')
+        name, data = await self.next_event(subscription)
+        self.assertEqual(name, 'transaction.status')
+        self.assertEqual(data['transactions'][0]['status'], 'diambil')
+        self.assertEqual(data['dashboard'], {'active_orders': -1, 'pending_orders': -1})
+        
+        transaction = await Transaction.objects.aget(pk=transaction.pk)
+        transaction.paid_amount = Decimal('20000')
+        await sync_to_async(self.commit)(transaction.save)
+        name, data = await self.next_event(subscription)
+        self.assertEqual((name, data['transactions'][0]['paid_amount'], data['dashboard']), ('transaction.payment', '20000.00', {}))
+        
+        pk = transaction.pk
+        await sync_to_async(self.commit)(transaction.delete)
+        name, data = await self.next_event(subscription)
+        self.assertEqual((name, data['transactions']), ('transaction.deleted', [{'id': pk}]))
+        self.assertEqual(data['dashboard']['total_transactions'], -1)
+        self.backend.unsubscribe(subscription)
+    
+    async def test_kasir_only_receives_own_transactions(self):
+        everyone = self.backend.subscribe()
+        kasir = self.backend.subscribe(cashier_id=self.kasir.pk)
+        own, = await sync_to_async(self.commit)(self.add_transactions, 1, cashier=self.kasir)
+        other, = await sync_to_async(self.commit)(self.add_transactions, 1)
+        
+        ids = [(await self.next_event(everyone))[1]['transactions'][0]['id'] for _ in range(2)]
+        self.assertEqual(ids, [own.id, other.id])
+        name, data = await self.next_event(kasir)
+        self.assertEqual((data['transactions'][0]['id'], data['dashboard']['total_transactions']), (own.id, 1))
+        self.assertIsNone(await kasir.get(0.05))
+    
+    async def test_bulk_status_publishes_one_event(self):
+        subscription = self.backend.subscribe()
+        transactions = await sync_to_async(self.add_transactions)(3)
+        ids = [transaction.id for transaction in transactions]
+        await sync_to_async(self.commit)(
+            self.client.post, '/api/transactions/bulk_status/', {'ids': ids, 'status': 'selesai'}, format='json'
+        )
+        name, data = await self.next_event(subscription)
+        self.assertEqual(name, 'transaction.status')
+        self.assertEqual(sorted(row['id'] for row in data['transactions']), ids)
+        self.assertEqual({row['status'] for row in data['transactions']}, {'selesai'})
+        self.assertEqual(data['dashboard'], {'pending_orders': -3})
+        self.assertIsNone(await subscription.get(0.05))
+    
+    async def test_resume_from_last_event_id(self):
+        first = self.backend.subscribe()
+        await sync_to_async(self.commit)(self.add_transactions, 2)
+        messages = [await first.get(1) for _ in range(2)]
+        last_id = messages[0].split(b'\n')[0][4:].decode()
+        self.backend.unsubscribe(first)
+        
+        # Event kedua diantrikan ulang; event tanpa koneksi membuat Last-Event-ID lama tidak bisa dilanjutkan
+        resumed = self.backend.subscribe(last_event_id=last_id)
+        self.assertEqual(await resumed.get(1), messages[1])
+        self.backend.unsubscribe(resumed)
+        await sync_to_async(self.commit)(self.add_transactions, 1)
+        self.assertIs(await self.backend.subscribe(last_event_id=last_id).get(1), RESET_MESSAGE)
+        self.assertIs(await self.backend.subscribe(last_event_id='lain-1').get(1), RESET_MESSAGE)
+    
+    async def test_slow_client_receives_reset(self):
+        subscription = self.backend.subscribe()
+        await sync_to_async(self.commit)(self.add_transactions, 4)
+        await asyncio.sleep(0)
+        self.assertIs(await subscription.get(1), RESET_MESSAGE)
+        self.assertIsNone(await subscription.get(0.05))
+    
+    def test_no_query_without_subscribers(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.commit(self.add_transactions, 1)
+        self.assertFalse([q for q in queries if 'customer_name' in q['sql']])
+        self.assertEqual(self.backend.stats()['published'], 0)
+    
+    async def test_stream_endpoint(self):
+        response = await self.async_client.get('/api/events/')
+        self.assertEqual(response.status_code, 401)
+        
+        response = await self.async_client.get('/api/events/', headers={'Authorization': f'Token {self.token.key}', 'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(self.backend.stats()['subscribers'], 1)
+        
+        transaction, = await sync_to_async(self.commit)(self.add_transactions, 1)
+        name, data = parse_sse(await asyncio.wait_for(anext(stream), 1))
+        self.assertEqual((name, data['transactions'][0]['id']), ('transaction.created', transaction.id))
+        
+        # Koneksi ditutup: handler ASGI membatalkan task yang sedang menunggu event
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(self.backend.stats()['subscribers'], 0)
+    
+    async def test_stream_ticket(self):
+        # EventSource tidak bisa mengirim header: tiket berumur pendek lewat URL, token login tidak
+        response = await self.async_client.post('/api/events/ticket/', headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['expires_in'], settings.EVENT_STREAM_TICKET_MAX_AGE)
+        response = await self.async_client.get('/api/events/', {'ticket': response.json()['ticket']})
+        self.assertEqual(response.status_code, 200)
+        
+        response = await self.async_client.get('/api/events/', {'token': self.token.key})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/events/', {'ticket': 'palsu'})
+        self.assertEqual(response.status_code, 401)
+        
+        with mock.patch('time.time', return_value=time.time() - settings.EVENT_STREAM_TICKET_MAX_AGE - 1):
+            expired = issue_stream_ticket(self.user)
+        response = await self.async_client.get('/api/events/', {'ticket': expired})
+        self.assertEqual(response.status_code, 401)
+        
+        ticket = issue_stream_ticket(self.kasir)
+        await User.objects.filter(pk=self.kasir.pk).aupdate(is_active=False)
+        response = await self.async_client.get('/api/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_stream_requires_asgi(self):
+        response = self.client.get('/api/events/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 501)
+        # Tiket juga ditolak agar dashboard tidak membuka EventSource yang pasti gagal
+        response = self.client.post('/api/events/ticket/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 501)
+
+
+class AsyncViewTest(APITestMixin, TransactionTestCase):
+    databases = {'default', 'replica'}
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.kasir = User.objects.create_user(username='kasir1', password='kasir123', role='kasir')
+        self.token = Token.objects.create(user=self.user)
+        self.add_transactions(3)
+        self.add_transactions(2, cashier=self.kasir, status='selesai', paid_amount=Decimal('20000'))
+        self.application = AsyncViewASGIHandler()
+    
+    def asgi_get(self, path, params=None, token=None):
+        """GET lewat handler ASGI lengkap (middleware, resolve, view): (status, headers, body)"""
+        token = self.token if token is None else token
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': urlencode(params or {}).encode(),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Token {token.key}'.encode())] if token else [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        }
+        messages = []
+        body_sent = asyncio.Event()
+        
+        async def receive():
+            if not body_sent.is_set():
+                body_sent.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()
+        
+        async def send(message):
+            messages.append(message)
+        
+        async_to_sync(self.application)(scope, receive, send)
+        start = messages[0]
+        return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in messages[1:])
+    
+    def test_same_response_as_sync_views(self):
+        today = timezone.localdate()
+        cases = [
+            ('/api/dashboard/stats/', {}),
+            ('/api/transactions/reports/', {'period': 'monthly'}),
+            ('/api/transactions/reports/', {'date_from': (today - timedelta(days=7)).isoformat(), 'date_to': today.isoformat(), 'series': 'daily'}),
+            ('/api/transactions/reports/', {'period': 'weekly', 'series': 'daily', 'group_by': 'cashier'}),
+            ('/api/transactions/reports/', {'period': 'monthly', 'status': 'selesai'}),
+        ]
+        for user in [self.user, self.kasir]:
+            token = Token.objects.get_or_create(user=user)[0]
+            self.client.force_authenticate(user)
+            for path, params in cases:
+                with self.subTest(user=user.username, path=path, params=params):
+                    expected = self.client.get(path, params, HTTP_ACCEPT='application/json')
+                    status_code, headers, body = self.asgi_get(path, params, token)
+                    self.assertEqual(status_code, 200, body)
+                    self.assertEqual(headers[b'Content-Type'], b'application/json')
+                    self.assertEqual(body, expected.content)
+        
+        self.client.force_authenticate(self.kasir)
+        self.assertEqual(json.loads(self.asgi_get('/api/transactions/reports/', {'period': 'monthly'}, token)[2])['total_transactions'], 2)
+    
+    def test_parallel_read_closes_thread_connection(self):
+        def read():
+            self.assertTrue(Customer.objects.exists())
+            return connections['default']
+        
+        thread_connection = async_to_sync(views.parallel_read)(read)
+        self.assertIsNone(thread_connection.connection)
+    
+    def test_no_persistent_connections_under_asgi(self):
+        env = {key: value for key, value in os.environ.items() if key != 'DB_CONN_MAX_AGE'}
+        code = "import core.asgi; from django.conf import settings; print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '0')
+    
+    def test_async_views_only_under_asgi(self):
+        request = AsyncRequestFactory().get('/api/transactions/reports/')
+        self.assertIs(self.application.resolve_request(request).func, views.areports)
+        request = AsyncRequestFactory().get('/api/dashboard/stats/')
+        self.assertIs(self.application.resolve_request(request).func, views.adashboard_stats)
+        self.assertIs(resolve('/api/dashboard/stats/').func, views.dashboard_stats)
+    
+    def test_errors_match_sync_views(self):
+        for params in [{'series': 'hourly'}, {'group_by': 'kota'}, {'date_from': 'kemarin', 'date_to': '2026-01-01'}]:
+            with self.subTest(params=params):
+                expected = self.client.get('/api/transactions/reports/', params, HTTP_ACCEPT='application/json')
+                status_code, headers, body = self.asgi_get('/api/transactions/reports/', params)
+                self.assertEqual((status_code, body), (400, expected.content))
+        
+        status_code, headers, body = self.asgi_get('/api/dashboard/stats/', token=False)
+        self.assertEqual(status_code, 401)
+        self.assertEqual(headers[b'WWW-Authenticate'], b'Token')
+        
+        # Token/tiket di query string hanya untuk stream event, bukan view async lain
+        for params in [{'token': self.token.key}, {'ticket': issue_stream_ticket(self.user)}]:
+            with self.subTest(params=list(params)):
+                self.assertEqual(self.asgi_get('/api/dashboard/stats/', params, token=False)[0], 401)
+    
+    @override_settings(READ_REPLICA='replica')
+    def test_replica_alias_reaches_gathered_queries(self):
+        refresh_sqlite_replica()
+        self.add_transactions(1)  # belum tersalin ke replika
+        aliases = []
+        real_detail = views.report_detail
+        
+        def report_detail(queryset, options):
+            aliases.append((current_read_alias(), threading.get_ident()))
+            return real_detail(queryset, options)
+        
+        with mock.patch.object(views, 'report_detail', report_detail):
+            data = json.loads(self.asgi_get('/api/transactions/reports/', {'period': 'monthly'})[2])
+        self.assertEqual(data['total_transactions'], 5)
+        self.assertEqual(len(data['transactions']), 5)
+        self.assertEqual(aliases[0][0], 'replica')
+        self.assertNotEqual(aliases[0][1], threading.get_ident())
+        self.assertEqual(json.loads(self.asgi_get('/api/dashboard/stats/')[2])['total_transactions'], 5)
@@ -13,10 +13,21 @@ urlpatterns = [
     path('auth/login/', views.login, name='login'),
     path('auth/logout/', views.logout, name='logout'),
     path('auth/me/', views.current_user, name='current_user'),
+    path('auth/cache-stats/', views.cache_stats, name='cache_stats'),
     
     # Dashboard
     path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
     
+    # Stream event real-time (SSE, ASGI)
+    path('events/', views.event_stream, name='event_stream'),
+    path('events/ticket/', views.event_stream_ticket, name='event_stream_ticket'),
+    
     # API Routes
     path('', include(router.urls)),
 ]
+
+# Versi async view untuk deployment ASGI (lihat app/handlers.py); WSGI tetap memakai view di atas
+async_views = {
+    'dashboard_stats': views.adashboard_stats,
+    'transaction-reports': views.areports,
+}
@@ -1,22 +1,45 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, connections
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.views.decorators.csrf import csrf_exempt
-from datetime import datetime, timedelta
+from django.views.decorators.http import require_GET
 from decimal import Decimal
 
-from .models import User, Customer, Service, Transaction, TransactionItem
+from .models import User, Customer, Service, Transaction, TransactionItem, DailyRollup
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, LoginSerializer,
     CustomerSerializer, ServiceSerializer, TransactionSerializer,
-    TransactionCreateSerializer, DashboardStatsSerializer
+    TransactionReadSerializer, TransactionCreateSerializer, TransactionSyncSerializer, BulkStatusSerializer,
+    DashboardStatsSerializer
+)
+from .pagination import KeysetPagination
+from .mixins import ConditionalGetMixin
+from .renderers import FastJSONRenderer
+from .search_utils import FullTextSearchFilter
+from .phone_utils import phone_index
+from .authentication import token_cache, async_login_required, issue_stream_ticket
+from .events import event_bus
+from .catalog_utils import service_catalog
+from .routers import current_read_alias, use_replica
+from .pdf_utils import (
+    PAPER_CHOICES, OUTPUT_CHOICES, invoice_cache, generate_invoice_pdf, get_invoice_data, render_invoice_batch, merge_invoice_pdfs, stream_invoice_zip
 )
-from .pdf_utils import generate_invoice_pdf
+from .export_utils import export_transactions_csv
+from .report_utils import INTERVALS, GROUP_BY_CHOICES, parse_date_bound, period_bounds, build_series
 
 
 # Authentication Views
@@ -82,7 +105,7 @@ def login(request):
             'details': error_details,
             'message': error_messages[0] if error_messages else 'Terjadi kesalahan saat login'
         }, status=status.HTTP_400_BAD_REQUEST)
-        
+    
     except Exception as e:
         print(f"Login exception: {str(e)}")
         import traceback
@@ -110,26 +133,96 @@ def current_user(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """Statistik cache di proses ini (autentikasi token, PDF struk, katalog layanan)"""
+    if request.user.role == 'kasir':
+        return Response({'error': 'Tidak punya akses'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'token_auth': token_cache.stats(),
+        'invoice_pdf': invoice_cache.stats(),
+        'service_catalog': service_catalog.stats(),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def event_stream_ticket(request):
+    """Tiket berumur pendek untuk membuka events/?ticket= dari EventSource (tanpa header)"""
+    if not isinstance(request._request, ASGIRequest):
+        # Klien tidak perlu membuka EventSource yang pasti ditolak 501
+        return Response({'error': 'Stream event hanya tersedia di deployment ASGI'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    return Response({
+        'ticket': issue_stream_ticket(request.user),
+        'expires_in': settings.EVENT_STREAM_TICKET_MAX_AGE,
+    })
+
+
+# Transaksi yang boleh dilihat user (dipakai TransactionViewSet dan view async)
+def filter_transactions(user, params):
+    """Queryset transaksi sesuai role user dan parameter filter list/laporan"""
+    queryset = Transaction.objects.with_details()
+    
+    # Filter berdasarkan role
+    if user.role == 'kasir':
+        queryset = queryset.filter(cashier=user)
+    
+    # Filter berdasarkan status
+    status_filter = params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    
+    # Filter berdasarkan tanggal
+    date_from = params.get('date_from', None)
+    date_to = params.get('date_to', None)
+    if date_from:
+        queryset = queryset.filter(created_at__gte=parse_date_bound(date_from))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=parse_date_bound(date_to, end=True))
+    
+    # Filter berdasarkan customer
+    customer_id = params.get('customer', None)
+    if customer_id:
+        queryset = queryset.filter(customer_id=customer_id)
+    
+    # Filter berdasarkan kasir
+    cashier_id = params.get('cashier', None)
+    if cashier_id:
+        queryset = queryset.filter(cashier_id=cashier_id)
+    
+    return queryset
+
+
 # Customer ViewSet
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['name', 'phone', 'email']
-    ordering_fields = ['created_at', 'name']
+    ordering_fields = ['created_at', 'name', 'transaction_count', 'total_spent', 'last_transaction_at']
     ordering = ['-created_at']
     
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Pencarian pelanggan berdasarkan awalan nomor HP (0812..., 812..., +62812...)"""
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return Response({'error': 'Limit tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(phone_index.search(request.query_params.get('q', ''), limit=max(limit, 1)))
+    
     @action(detail=True, methods=['get'])
     def transactions(self, request, pk=None):
         customer = self.get_object()
-        transactions = customer.transactions.all().order_by('-created_at')
-        serializer = TransactionSerializer(transactions, many=True)
-        return Response(serializer.data)
+        transactions = TransactionReadSerializer.values(customer.transactions.order_by('-created_at'))
+        return Response(TransactionReadSerializer(transactions).data)
 
 
 # Service ViewSet
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [IsAuthenticated]
@@ -149,51 +242,107 @@ class ServiceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(service_type=service_type)
         
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # Pencarian dan pengurutan khusus tetap lewat query biasa
+        params = request.query_params
+        if params.get(filters.SearchFilter.search_param) or params.get(filters.OrderingFilter.ordering_param):
+            return super().list(request, *args, **kwargs)
+        
+        is_active = params.get('is_active', None)
+        is_active = is_active.lower() == 'true' if is_active is not None else None
+        service_type = params.get('service_type', None)
+        version, data = service_catalog.list(is_active=is_active, service_type=service_type)
+        
+        etag = service_catalog.etag(version, {
+            'is_active': is_active,
+            'service_type': service_type,
+            'page': params.get(self.paginator.page_query_param),
+            'page_size': params.get(self.paginator.page_size_query_param) if self.paginator.page_size_query_param else None,
+        })
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            service_catalog.record_not_modified()
+            return conditional
+        
+        page = self.paginate_queryset(data)
+        response = self.get_paginated_response(page) if page is not None else Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 # Transaction ViewSet
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['invoice_number', 'customer__name', 'customer__phone']
     ordering_fields = ['created_at', 'total_amount', 'status']
     ordering = ['-created_at']
+    # Ikut ditampilkan: nama dan nomor HP pelanggan, nama/jenis layanan item, nama kasir
+    conditional_models = [Customer, Service, User]
     
     def get_serializer_class(self):
         if self.action == 'create':
             return TransactionCreateSerializer
         return TransactionSerializer
     
+    # List memakai jalur baca cepat: baris values() tanpa instance model
+    def paginate_queryset(self, queryset):
+        if self.action == 'list':
+            queryset = TransactionReadSerializer.values(queryset)
+        return super().paginate_queryset(queryset)
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'list' and kwargs.get('many'):
+            return TransactionReadSerializer(*args)
+        return super().get_serializer(*args, **kwargs)
+    
     def get_queryset(self):
-        queryset = Transaction.objects.all()
-        
-        # Filter berdasarkan role
-        if self.request.user.role == 'kasir':
-            queryset = queryset.filter(cashier=self.request.user)
-        
-        # Filter berdasarkan status
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Filter berdasarkan tanggal
-        date_from = self.request.query_params.get('date_from', None)
-        date_to = self.request.query_params.get('date_to', None)
-        if date_from:
-            queryset = queryset.filter(created_at__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(created_at__lte=date_to)
+        return filter_transactions(self.request.user, self.request.query_params)
+    
+    def create(self, request, *args, **kwargs):
+        """Dengan header Idempotency-Key, kirim ulang (mis. koneksi putus) mengembalikan transaksi yang sama"""
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > 64:
+            return Response({'error': 'Idempotency-Key tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Filter berdasarkan customer
-        customer_id = self.request.query_params.get('customer', None)
-        if customer_id:
-            queryset = queryset.filter(customer_id=customer_id)
+        existing = Transaction.objects.filter(idempotency_key=key).first()
+        if existing is None:
+            try:
+                return super().create(request, *args, **kwargs)
+            except IntegrityError:
+                # Kiriman yang sama dari request lain lebih dulu commit
+                existing = Transaction.objects.filter(idempotency_key=key).first()
+                if existing is None:
+                    raise
         
-        return queryset
+        if existing.cashier_id != request.user.pk:
+            return Response({'error': 'Idempotency-Key sudah dipakai transaksi lain'}, status=status.HTTP_409_CONFLICT)
+        response = Response(TransactionCreateSerializer(existing).data, status=status.HTTP_201_CREATED)
+        response['Idempotent-Replayed'] = 'true'
+        return response
     
     def perform_create(self, serializer):
-        serializer.save(cashier=self.request.user)
+        serializer.save(cashier=self.request.user, idempotency_key=self.request.headers.get('Idempotency-Key'))
+    
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        """Kirim antrean transaksi offline sekaligus: id dan nomor invoice per idempotency_key"""
+        serializer = TransactionSyncSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = Transaction.bulk_create_with_items(serializer.validated_data['transactions'], cashier=request.user)
+        return Response({
+            'created': sum(result['result'] == 'created' for result in results),
+            'existing': sum(result['result'] == 'existing' for result in results),
+            'results': results,
+        })
     
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
@@ -216,98 +365,234 @@ class TransactionViewSet(viewsets.ModelViewSet):
         serializer = TransactionSerializer(transaction)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Ubah status banyak transaksi sekaligus: {"ids": [...], "status": "disetrika"}"""
+        serializer = BulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        new_status = serializer.validated_data['status']
+        results = Transaction.bulk_set_status(self.get_queryset(), serializer.validated_data['ids'], new_status)
+        return Response({
+            'status': new_status,
+            'updated': sum(result == 'updated' for result in results.values()),
+            'results': results,
+        })
+    
     @action(detail=True, methods=['get'])
     def download_invoice(self, request, pk=None):
-        """Download PDF struk transaksi"""
-        transaction = self.get_object()
-        pdf_response = generate_invoice_pdf(transaction.id)
-        if pdf_response:
-            return pdf_response
-        return Response({'error': 'Gagal membuat PDF'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        """Download struk transaksi (paper=a4|58|80, output=pdf|escpos)"""
+        paper = request.query_params.get('paper', 'a4')
+        output = request.query_params.get('output', 'pdf')
+        if paper not in PAPER_CHOICES or output not in OUTPUT_CHOICES or (paper == 'a4' and output != 'pdf'):
+            return Response({'error': 'Format struk tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # get_queryset() sudah memuat pelanggan, kasir dan item (with_details)
+        return generate_invoice_pdf(self.get_object(), request, paper=paper, output=output)
     
     @action(detail=False, methods=['get'])
-    def reports(self, request):
-        """Laporan transaksi harian, mingguan, bulanan"""
-        period = request.query_params.get('period', 'daily')  # daily, weekly, monthly
-        date_from = request.query_params.get('date_from', None)
-        date_to = request.query_params.get('date_to', None)
+    def batch_invoices(self, request):
+        """Cetak ulang struk satu rentang tanggal (date_from, date_to wajib) sesuai filter: PDF gabungan atau ZIP"""
+        output = request.query_params.get('output', 'pdf')
+        if output not in ('pdf', 'zip'):
+            return Response({'error': 'Output tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
         
-        queryset = self.get_queryset()
+        # Rentang tanggal wajib: tanpa filter satu request akan merender seluruh riwayat transaksi
+        if not (request.query_params.get('date_from') and request.query_params.get('date_to')):
+            return Response({'error': 'date_from dan date_to wajib diisi'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if date_from and date_to:
-            queryset = queryset.filter(created_at__range=[date_from, date_to])
-        else:
-            now = timezone.now()
-            if period == 'daily':
-                queryset = queryset.filter(created_at__date=now.date())
-            elif period == 'weekly':
-                week_start = now - timedelta(days=now.weekday())
-                queryset = queryset.filter(created_at__gte=week_start)
-            elif period == 'monthly':
-                queryset = queryset.filter(created_at__year=now.year, created_at__month=now.month)
+        limit = getattr(settings, 'INVOICE_BATCH_MAX', 2000)
+        transactions = list(self.filter_queryset(self.get_queryset())[:limit + 1])
+        if len(transactions) > limit:
+            return Response(
+                {'error': f'Maksimal {limit} struk per permintaan, persempit rentang tanggal'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invoices = [get_invoice_data(transaction) for transaction in transactions]
+        if not invoices:
+            return Response({'error': 'Tidak ada transaksi'}, status=status.HTTP_404_NOT_FOUND)
         
-        total_transactions = queryset.count()
-        total_revenue = queryset.aggregate(Sum('final_amount'))['final_amount__sum'] or Decimal('0.00')
-        total_paid = queryset.aggregate(Sum('paid_amount'))['paid_amount__sum'] or Decimal('0.00')
+        filename = f'Struk_{timezone.localdate():%Y%m%d}'
+        pdfs = render_invoice_batch(invoices)
+        if output == 'zip':
+            response = StreamingHttpResponse(stream_invoice_zip(invoices, pdfs), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+            return response
         
-        transactions = queryset[:100]  # Limit untuk response
-        serializer = TransactionSerializer(transactions, many=True)
+        response = HttpResponse(merge_invoice_pdfs(pdfs), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    @use_replica
+    def export(self, request):
+        """Export transaksi ke CSV (satu baris per item), di-stream bertahap"""
+        # Dievaluasi saat response di-stream, setelah view selesai
+        queryset = self.filter_queryset(self.get_queryset()).using(current_read_alias())
+        response = StreamingHttpResponse(export_transactions_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="Transaksi_{timezone.localdate():%Y%m%d}.csv"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    @use_replica
+    def reports(self, request):
+        """Laporan transaksi harian, mingguan, bulanan"""
+        options, error = report_options(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'period': period,
-            'total_transactions': total_transactions,
-            'total_revenue': total_revenue,
-            'total_paid': total_paid,
-            'transactions': serializer.data
+        queryset = self.get_queryset().filter(created_at__gte=options['start'], created_at__lt=options['end'])
+        totals = queryset.order_by().aggregate(**REPORT_TOTALS)
+        return Response(report_data(options, totals, report_detail(queryset, options)))
+
+
+# Laporan transaksi (dipakai action reports dan versi async-nya)
+REPORT_TOTALS = {
+    'total_transactions': Count('pk'),
+    'total_revenue': Sum('final_amount'),
+    'total_paid': Sum('paid_amount'),
+}
+
+
+def report_options(params):
+    """Parameter laporan yang sudah divalidasi: (opsi, pesan error)"""
+    period = params.get('period', 'daily')  # daily, weekly, monthly
+    date_from = params.get('date_from', None)
+    date_to = params.get('date_to', None)
+    interval = params.get('series', None)  # daily, weekly, monthly
+    group_by = params.get('group_by', None)  # service_type, cashier, status
+    
+    if interval and interval not in INTERVALS:
+        return None, 'Series tidak valid'
+    if group_by and group_by not in GROUP_BY_CHOICES:
+        return None, 'Group by tidak valid'
+    
+    # Rentang waktu sebagai batas tz-aware agar index created_at terpakai
+    if date_from and date_to:
+        start, end = parse_date_bound(date_from), parse_date_bound(date_to, end=True)
+    else:
+        start, end = period_bounds(period)
+    return {'period': period, 'interval': interval, 'group_by': group_by, 'start': start, 'end': end}, None
+
+
+def report_detail(queryset, options):
+    """Deret waktu jika `series` diminta, selain itu transaksi terbaru"""
+    if options['interval']:
+        return build_series(queryset, options['interval'], options['group_by'], options['start'], options['end'])
+    transactions = TransactionReadSerializer.values(queryset)[:100]  # Limit untuk response
+    return TransactionReadSerializer(transactions).data
+
+
+def report_data(options, totals, detail):
+    data = {
+        'period': options['period'],
+        'total_transactions': totals['total_transactions'],
+        'total_revenue': totals['total_revenue'] or Decimal('0.00'),
+        'total_paid': totals['total_paid'] or Decimal('0.00'),
+    }
+    if options['interval']:
+        data.update({
+            'series_interval': options['interval'],
+            'group_by': options['group_by'],
+            'date_from': options['start'],
+            'date_to': options['end'],
+            'series': detail,
         })
+    else:
+        data['transactions'] = detail
+    return data
 
 
 # Dashboard View
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_replica
 def dashboard_stats(request):
     """Statistik dashboard"""
-    now = timezone.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # Base queryset
-    base_queryset = Transaction.objects.all()
+    today = timezone.localdate()
+    data = DailyRollup.summarize(dashboard_rollups(request.user), today, today.replace(day=1))
+    serializer = DashboardStatsSerializer(data)
+    return Response(serializer.data)
+
+
+def dashboard_rollups(user):
+    # Total diambil dari rekap harian, bukan dari tabel transaksi
+    rollups = DailyRollup.objects.all()
     
     # Filter berdasarkan role
-    if request.user.role == 'kasir':
-        base_queryset = base_queryset.filter(cashier=request.user)
-    
-    # Total semua waktu
-    total_transactions = base_queryset.count()
-    total_revenue = base_queryset.aggregate(Sum('final_amount'))['final_amount__sum'] or Decimal('0.00')
-    
-    # Hari ini
-    today_transactions = base_queryset.filter(created_at__gte=today_start).count()
-    today_revenue = base_queryset.filter(created_at__gte=today_start).aggregate(
-        Sum('final_amount')
-    )['final_amount__sum'] or Decimal('0.00')
-    
-    # Bulan ini
-    monthly_transactions = base_queryset.filter(created_at__gte=month_start).count()
-    monthly_revenue = base_queryset.filter(created_at__gte=month_start).aggregate(
-        Sum('final_amount')
-    )['final_amount__sum'] or Decimal('0.00')
+    if user.role == 'kasir':
+        rollups = rollups.filter(cashier=user)
+    return rollups
+
+
+# View async untuk deployment ASGI (dipetakan lewat app.urls.async_views, lihat app/handlers.py)
+def json_response(data, status=200):
+    """Response JSON tanpa DRF, dirender sama seperti Response DRF"""
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def parallel_read(func, *args):
+    """Jalankan fungsi baca sinkron di thread pool dengan koneksi database milik thread itu.
     
-    # Order aktif (belum diambil)
-    active_orders = base_queryset.exclude(status='diambil').count()
-    pending_orders = base_queryset.filter(status__in=['diterima', 'dicuci', 'disetrika']).count()
+    Query async ORM (aaggregate, acount, ...) dalam satu request berjalan
+    berurutan di thread request yang sama; fungsi di sini berjalan
+    bersamaan dengannya. Koneksi thread pool ditutup setelah fungsi selesai:
+    sinyal request_finished tidak menjangkau thread ini, dan thread yang
+    menganggur akan menahan koneksinya tanpa batas.
+    """
+    def run():
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+    return await sync_to_async(run, thread_sensitive=False)()
+
+
+@require_GET
+@async_login_required
+@use_replica
+async def adashboard_stats(request):
+    """Versi async dashboard_stats: satu aaggregate atas rekap harian"""
+    today = timezone.localdate()
+    data = await DailyRollup.asummarize(dashboard_rollups(request.user), today, today.replace(day=1))
+    return json_response(DashboardStatsSerializer(data).data)
+
+
+@require_GET
+@async_login_required
+@use_replica
+async def areports(request):
+    """Versi async TransactionViewSet.reports: total (aaggregate) dan detail laporan dihitung bersamaan"""
+    try:
+        options, error = report_options(request.GET)
+        if error:
+            return json_response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = filter_transactions(request.user, request.GET)
+    except ValidationError as exc:
+        return json_response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
     
-    data = {
-        'total_transactions': total_transactions,
-        'total_revenue': total_revenue,
-        'today_transactions': today_transactions,
-        'today_revenue': today_revenue,
-        'monthly_transactions': monthly_transactions,
-        'monthly_revenue': monthly_revenue,
-        'active_orders': active_orders,
-        'pending_orders': pending_orders,
-    }
+    queryset = queryset.filter(created_at__gte=options['start'], created_at__lt=options['end'])
+    totals, detail = await asyncio.gather(
+        queryset.order_by().aaggregate(**REPORT_TOTALS),
+        parallel_read(report_detail, queryset, options),
+    )
+    return json_response(report_data(options, totals, detail))
+
+
+# Stream event real-time (hanya ASGI)
+@require_GET
+@async_login_required(stream_ticket=True)
+async def event_stream(request):
+    """Server-Sent Events: transaksi baru, perubahan status/pembayaran dan selisih angka dashboard"""
+    if not isinstance(request, ASGIRequest):
+        # Di WSGI setiap koneksi menahan satu thread worker; klien tetap memakai endpoint REST
+        return JsonResponse({'error': 'Stream event hanya tersedia di deployment ASGI'}, status=501)
     
-    serializer = DashboardStatsSerializer(data)
-    return Response(serializer.data)
+    # Kasir hanya menerima transaksi miliknya sendiri
+    cashier_id = request.user.pk if request.user.role == 'kasir' else None
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(event_bus.stream(cashier_id, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: jangan tahan stream di buffer proxy
+    return response
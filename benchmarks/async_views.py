@@ -0,0 +1,137 @@
+"""Benchmark dashboard dan laporan di bawah beban bersamaan: WSGI (thread) vs ASGI (view sinkron) vs ASGI (view async).
+
+Tiga mode dengan data dan request yang sama:
+- wsgi       : view DRF sinkron, satu thread per klien (seperti gunicorn --threads)
+- asgi-sync  : django.core.handlers.asgi.ASGIHandler bawaan (view sinkron lewat sync_to_async)
+- asgi-async : core.asgi.application (AsyncViewASGIHandler, view async + asyncio.gather)
+
+    python -m benchmarks.async_views --transactions 20000 --clients 1,8,32 --requests 160
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+ENDPOINTS = [
+    ('dashboard', '/api/dashboard/stats/', ''),
+    ('laporan', '/api/transactions/reports/', 'period=monthly'),
+    ('deret', '/api/transactions/reports/', 'period=monthly&series=daily'),
+]
+
+
+def summarize(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return (f'{label:<11}: median {statistics.median(latencies):7.2f} ms, p95 {p95:7.2f} ms, '
+            f'{len(latencies) / elapsed:7.1f} request/s')
+
+
+def run_wsgi(path, query, token, clients, requests):
+    from django.test import Client
+
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def worker(count):
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        client.get(f'{path}?{query}')
+        barrier.wait()
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(f'{path}?{query}')
+            elapsed = (time.perf_counter() - start) * 1000
+            assert response.status_code == 200, response.content
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(requests // clients,)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def run_asgi(application, path, query, token, clients, requests):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query.encode(),
+        'headers': [(b'host', b'testserver'), (b'authorization', f'Token {token}'.encode())],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+    async def request():
+        sent = False
+        status = None
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        await application(dict(scope), receive, send)
+        assert status == 200, status
+
+    async def worker(count, latencies):
+        for _ in range(count):
+            start = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def run():
+        await request()
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(requests // clients, latencies) for _ in range(clients)))
+        return latencies, time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=20000, help='Jumlah transaksi (tersebar 60 hari)')
+    parser.add_argument('--clients', default='1,8,32', help='Jumlah klien bersamaan, dipisah koma')
+    parser.add_argument('--requests', type=int, default=160, help='Jumlah request per kasus')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    from core.asgi import application
+
+    user, customer, service = create_fixtures()
+    generate_transactions(args.transactions, 2, customer, service, user, days=60)
+    call_command('rebuild_daily_rollup', stdout=open('/dev/null', 'w'))
+    token = Token.objects.create(user=user).key
+    print(f'{args.transactions:,} transaksi dalam 60 hari, {args.requests} request per kasus')
+
+    modes = [
+        ('wsgi', lambda *a: run_wsgi(*a)),
+        ('asgi-sync', lambda *a: run_asgi(ASGIHandler(), *a)),
+        ('asgi-async', lambda *a: run_asgi(application, *a)),
+    ]
+    for name, path, query in ENDPOINTS:
+        for clients in [int(value) for value in args.clients.split(',')]:
+            print(f'\n{name} ({path}?{query}), {clients} klien bersamaan')
+            for label, run in modes:
+                latencies, elapsed = run(path, query, token, clients, args.requests)
+                print(summarize(label, latencies, elapsed))
+
+
+if __name__ == '__main__':
+    main()
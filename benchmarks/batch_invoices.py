@@ -0,0 +1,48 @@
+"""Benchmark render struk massal (render_invoice_batch) dengan jumlah worker berbeda.
+
+    python -m benchmarks.batch_invoices --invoices 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--invoices', type=int, default=2000, help='Jumlah struk')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='Jumlah worker terbesar')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from app.models import Transaction
+    from app.pdf_utils import BATCH_INLINE_THRESHOLD, get_invoice_data, render_invoice_batch, invoice_cache
+
+    settings.INVOICE_PDF_CACHE_DIR = tempfile.mkdtemp(prefix='laundry-bench-invoices-')
+    user, customer, service = create_fixtures()
+    generate_transactions(args.invoices, 3, customer, service, user)
+
+    start = time.perf_counter()
+    invoices = [get_invoice_data(t) for t in Transaction.objects.with_details()]
+    print(f'Ambil data {len(invoices):,} struk: {time.perf_counter() - start:.2f} s')
+
+    workers = 1
+    baseline = None
+    while workers <= args.max_workers:
+        # Pool proses dipakai ulang antar request: waktu start proses spawn tidak ikut diukur
+        list(render_invoice_batch(invoices[:BATCH_INLINE_THRESHOLD * workers], workers=workers))
+        invoice_cache.clear()
+        start = time.perf_counter()
+        for _ in render_invoice_batch(invoices, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{workers:>2} worker: {elapsed:6.2f} s  {len(invoices) / elapsed:7.0f} struk/s  speedup {baseline / elapsed:.2f}x')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Setup bersama untuk skrip benchmark.
+
+Setiap benchmark memakai database SQLite sementara sehingga db.sqlite3 tidak
+tersentuh. Jalankan dari root project, misalnya:
+
+    python -m benchmarks.export_csv --rows 1000000
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None):
+    """Konfigurasi Django dengan database sementara lalu jalankan migrate"""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    from django.conf import settings
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp(prefix='laundry-bench-')) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def peak_rss_mb():
+    """Puncak resident set size proses ini (MB)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+@contextmanager
+def timer(label, results):
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+def create_fixtures():
+    """User admin, satu pelanggan dan satu layanan untuk data benchmark"""
+    from decimal import Decimal
+    from app.models import User, Customer, Service
+
+    user = User.objects.create_user(username='bench', password='bench12345', role='admin')
+    customer = Customer.objects.create(name='Pelanggan Benchmark', phone='080000000000')
+    service = Service.objects.create(
+        name='Cuci Kiloan Reguler', service_type='kiloan', price_per_unit=Decimal('5000'), unit='kg'
+    )
+    return user, customer, service
+
+
+def generate_transactions(count, items_per_transaction, customer, service, cashier, days=365):
+    """Isi tabel transaksi dan item langsung dengan SQL (tanpa objek Python per baris)"""
+    from django.db import connection
+    from app.models import Transaction, TransactionItem
+
+    transaction_table = Transaction._meta.db_table
+    item_table = TransactionItem._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'''
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            INSERT INTO {transaction_table} (
+                invoice_number, customer_id, cashier_id, total_amount, discount, final_amount,
+                paid_amount, status, received_at, created_at, updated_at
+            )
+            SELECT
+                printf('BENCH-%%08d', n), %s, %s, %s, 0, %s, %s,
+                CASE n %% 5 WHEN 0 THEN 'diterima' WHEN 1 THEN 'dicuci' WHEN 2 THEN 'disetrika'
+                            WHEN 3 THEN 'selesai' ELSE 'diambil' END,
+                datetime('now', printf('-%%d minutes', n %% (%s * 1440))),
+                datetime('now', printf('-%%d minutes', n %% (%s * 1440))),
+                datetime('now')
+            FROM seq
+        ''', [
+            count, customer.id, cashier.id,
+            10000 * items_per_transaction, 10000 * items_per_transaction, 10000 * items_per_transaction,
+            days, days,
+        ])
+        cursor.execute(f'''
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            INSERT INTO {item_table} (transaction_id, service_id, quantity, unit_price, subtotal, created_at)
+            SELECT t.id, %s, 2, 5000, 10000, t.created_at
+            FROM {transaction_table} t CROSS JOIN seq
+        ''', [items_per_transaction, service.id])
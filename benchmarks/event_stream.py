@@ -0,0 +1,98 @@
+"""Benchmark stream event (SSE) lewat aplikasi ASGI: banyak koneksi idle dalam satu worker.
+
+Membuka N koneksi ke /api/events/ langsung ke core.asgi.application (tanpa
+server HTTP), lalu menyimpan transaksi dari thread lain seperti view sinkron
+dan mengukur waktu sampai event diterima semua koneksi.
+
+    python -m benchmarks.event_stream --connections 500 --events 20
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from benchmarks.common import setup_django, create_fixtures, peak_rss_mb
+
+
+class Connection:
+    """Satu klien SSE tiruan: channel receive/send ASGI"""
+
+    def __init__(self, application, scope):
+        self.disconnected = asyncio.Event()
+        self.events = asyncio.Queue()
+        self.status = None
+        self.task = asyncio.ensure_future(application(scope, self.receive, self.send))
+        self._request_sent = False
+
+    async def receive(self):
+        if not self._request_sent:
+            self._request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message.get('body', b'').startswith(b'id: '):
+            self.events.put_nowait(time.perf_counter())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=500, help='Jumlah koneksi stream bersamaan')
+    parser.add_argument('--events', type=int, default=20, help='Jumlah transaksi yang disimpan')
+    args = parser.parse_args()
+
+    setup_django()
+    from decimal import Decimal
+    from app.authentication import issue_stream_ticket
+    from app.events import event_bus
+    from app.models import Transaction
+    from core.asgi import application
+
+    user, customer, service = create_fixtures()
+    items = [{'service': service, 'quantity': Decimal('2'), 'unit_price': Decimal('5000')}]
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/api/events/', 'raw_path': b'/api/events/', 'root_path': '', 'query_string': f'ticket={issue_stream_ticket(user)}'.encode(),
+        'headers': [(b'host', b'testserver')], 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+    def save_transaction():
+        # Seperti POST /transactions/ di thread worker sinkron
+        started = time.perf_counter()
+        Transaction.create_with_items(items, customer=customer, cashier=user)
+        return started
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        connections = [Connection(application, scope) for _ in range(args.connections)]
+        while event_bus.backend.stats()['subscribers'] < args.connections:
+            await asyncio.sleep(0.01)
+        print(f'{args.connections} koneksi terbuka dalam {time.perf_counter() - start:.2f} s, '
+              f'{threading.active_count()} thread, puncak RSS {rss_before:.0f} -> {peak_rss_mb():.0f} MB')
+        assert {connection.status for connection in connections} == {200}
+
+        latencies = []
+        for _ in range(args.events):
+            started = await loop.run_in_executor(None, save_transaction)
+            received = [await connection.events.get() for connection in connections]
+            latencies.append((max(received) - started) * 1000)
+        print(f'Simpan transaksi -> event diterima semua koneksi: median {statistics.median(latencies):.1f} ms, '
+              f'maks {max(latencies):.1f} ms ({args.events} event)')
+        print(f'Backend: {event_bus.backend.stats()}')
+
+        for connection in connections:
+            connection.disconnected.set()
+        await asyncio.gather(*(connection.task for connection in connections), return_exceptions=True)
+        print(f"Setelah koneksi ditutup: {event_bus.backend.stats()['subscribers']} subscriber")
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark export CSV transaksi (transactions/export/).
+
+Membuat N baris item transaksi lalu men-stream seluruh export, melaporkan
+waktu ke byte pertama, total waktu, ukuran output dan puncak RSS.
+
+    python -m benchmarks.export_csv --rows 1000000
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, peak_rss_mb, create_fixtures, generate_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Jumlah baris item transaksi')
+    parser.add_argument('--items', type=int, default=4, help='Item per transaksi')
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from app.views import TransactionViewSet
+
+    user, customer, service = create_fixtures()
+    start = time.perf_counter()
+    generate_transactions(args.rows // args.items, args.items, customer, service, user)
+    print(f'Data dibuat: {args.rows:,} baris item dalam {time.perf_counter() - start:.1f} s')
+    rss_before = peak_rss_mb()
+
+    request = APIRequestFactory().get('/api/transactions/export/')
+    force_authenticate(request, user=user)
+    view = TransactionViewSet.as_view({'get': 'export'})
+
+    start = time.perf_counter()
+    response = view(request)
+    first_byte = None
+    total_bytes = 0
+    lines = 0
+    for chunk in response.streaming_content:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        total_bytes += len(chunk)
+        lines += chunk.count(b'\n')
+    elapsed = time.perf_counter() - start
+
+    print(f'Baris CSV         : {lines - 1:,}')
+    print(f'Ukuran output     : {total_bytes / 1024 / 1024:.1f} MB')
+    print(f'Byte pertama      : {first_byte * 1000:.2f} ms')
+    print(f'Total waktu       : {elapsed:.2f} s ({(lines - 1) / elapsed:,.0f} baris/s)')
+    print(f'Puncak RSS        : {rss_before:.1f} MB sebelum export, {peak_rss_mb():.1f} MB sesudah')
+
+
+if __name__ == '__main__':
+    main()
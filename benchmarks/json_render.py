@@ -0,0 +1,67 @@
+"""Benchmark render JSON laporan 100 transaksi: JSONRenderer bawaan vs FastJSONRenderer (orjson), plus ukuran gzip/brotli.
+
+    python -m benchmarks.json_render --iterations 500
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+def per_call_ms(func, iterations):
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500, help='Jumlah render per kasus')
+    parser.add_argument('--items', type=int, default=3, help='Item per transaksi')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.utils import timezone
+    from django.utils.text import compress_string
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from app.middleware import CompressionMiddleware, brotli
+    from app.renderers import FastJSONRenderer, orjson
+
+    user, customer, service = create_fixtures()
+    generate_transactions(100, args.items, customer, service, user)
+    client = APIClient()
+    client.force_authenticate(user)
+    today = timezone.localdate()
+    params = {'date_from': (today.replace(year=today.year - 1)).isoformat(), 'date_to': today.isoformat()}
+    data = client.get('/api/transactions/reports/', params).data
+    print(f"Laporan: {len(data['transactions'])} transaksi x {args.items} item, orjson {'ada' if orjson else 'TIDAK ADA'}")
+
+    content = None
+    for label, renderer in [('JSONRenderer', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())]:
+        content = renderer.render(data)
+        ms = per_call_ms(lambda: renderer.render(data), args.iterations)
+        print(f'{label:<18}: {ms:7.3f} ms/render, {len(content):>8,} byte')
+
+    gzipped = compress_string(content, max_random_bytes=CompressionMiddleware.max_random_bytes)
+    ms = per_call_ms(lambda: compress_string(content), args.iterations)
+    print(f"{'gzip':<18}: {ms:7.3f} ms/kompresi, {len(gzipped):>8,} byte")
+    if brotli is not None:
+        quality = CompressionMiddleware.brotli_quality
+        compressed = brotli.compress(content, quality=quality)
+        ms = per_call_ms(lambda: brotli.compress(content, quality=quality), args.iterations)
+        print(f"{f'brotli q{quality}':<18}: {ms:7.3f} ms/kompresi, {len(compressed):>8,} byte")
+    else:
+        print('brotli            : paket brotli tidak terpasang')
+
+    # Satu request utuh (query + serialisasi + render + kompresi)
+    for encoding in ['identity', 'gzip']:
+        ms = per_call_ms(lambda: client.get('/api/transactions/reports/', params, HTTP_ACCEPT_ENCODING=encoding), 50)
+        size = len(client.get('/api/transactions/reports/', params, HTTP_ACCEPT_ENCODING=encoding).content)
+        print(f'Request {encoding:<10}: {ms:7.3f} ms/request, {size:>8,} byte')
+
+
+if __name__ == '__main__':
+    main()
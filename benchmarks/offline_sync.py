@@ -0,0 +1,58 @@
+"""Benchmark kirim antrean transaksi offline: satu POST per transaksi vs satu batch transactions/sync/.
+
+Mengukur waktu dan jumlah query untuk mengirim N transaksi yang tertunda,
+lalu mengirim ulang batch yang sama (semua kunci sudah tersimpan).
+
+    python -m benchmarks.offline_sync --transactions 500
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, create_fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=500, help='Jumlah transaksi di antrean (maks. 500 per batch)')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from rest_framework.test import APIClient
+    from app.models import Transaction
+
+    user, customer, service = create_fixtures()
+    client = APIClient()
+    client.force_authenticate(user)
+
+    def entry(key):
+        return {'idempotency_key': key, 'customer': customer.id, 'items': [{'service': service.id, 'quantity': '2'}]}
+
+    def measure(label, send):
+        queries = []
+        start = time.perf_counter()
+        with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+            send()
+        elapsed = time.perf_counter() - start
+        print(f'{label:<26}: {elapsed * 1000:8.1f} ms, {len(queries):6} query')
+
+    def post_each(prefix):
+        for n in range(args.transactions):
+            data = entry(f'{prefix}-{n}')
+            response = client.post('/api/transactions/', data, format='json', HTTP_IDEMPOTENCY_KEY=data.pop('idempotency_key'))
+            assert response.status_code == 201, response.content
+
+    def sync(prefix):
+        response = client.post('/api/transactions/sync/', {'transactions': [entry(f'{prefix}-{n}') for n in range(args.transactions)]}, format='json')
+        assert response.status_code == 200, response.content
+
+    print(f'{args.transactions} transaksi offline')
+    measure('POST per transaksi', lambda: post_each('post'))
+    measure('POST per transaksi (ulang)', lambda: post_each('post'))
+    measure('sync/ satu batch', lambda: sync('sync'))
+    measure('sync/ satu batch (ulang)', lambda: sync('sync'))
+    assert Transaction.objects.count() == args.transactions * 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark pagination nomor halaman (OFFSET + COUNT) vs keyset (cursor) di halaman awal dan dalam.
+
+    python -m benchmarks.pagination --transactions 200000 --page 10000
+"""
+import argparse
+import base64
+import json
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=200_000, help='Jumlah transaksi')
+    parser.add_argument('--page', type=int, default=10_000, help='Nomor halaman dalam yang diukur')
+    parser.add_argument('--repeat', type=int, default=5, help='Pengulangan per kasus (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from app.models import Transaction
+    from app.pagination import KeysetPagination
+    from app.views import TransactionViewSet
+
+    user, customer, service = create_fixtures()
+    generate_transactions(args.transactions, 1, customer, service, user)
+
+    page_size = KeysetPagination.page_size
+    depth = (args.page - 1) * page_size
+    anchor = Transaction.objects.order_by('-created_at', '-pk').values('pk', 'created_at')[depth - 1]
+    value = Transaction._meta.get_field('created_at').value_to_string(Transaction(created_at=anchor['created_at']))
+    deep_cursor = base64.urlsafe_b64encode(json.dumps([value, anchor['pk'], 0]).encode()).decode().rstrip('=')
+
+    factory = APIRequestFactory()
+    view = TransactionViewSet.as_view({'get': 'list'})
+
+    def measure(params):
+        best = None
+        for _ in range(args.repeat):
+            request = factory.get('/api/transactions/', params)
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    cases = [
+        ('Nomor halaman, hal. 1', {'page': 1}),
+        (f'Nomor halaman, hal. {args.page:,}', {'page': args.page}),
+        ('Cursor, hal. 1', {'cursor': ''}),
+        (f'Cursor, hal. {args.page:,}', {'cursor': deep_cursor}),
+    ]
+    print(f'{args.transactions:,} transaksi, {page_size} baris per halaman')
+    for label, params in cases:
+        print(f'{label:<28}: {measure(params) * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
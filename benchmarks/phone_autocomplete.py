@@ -0,0 +1,61 @@
+"""Benchmark autocomplete nomor HP: indeks prefix di memori vs icontains di database.
+
+    python -m benchmarks.phone_autocomplete --customers 100000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import setup_django
+
+
+FORMATS = ['0{}', '+62{}', '62{}', '+62 {}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--customers', type=int, default=100_000, help='Jumlah pelanggan')
+    parser.add_argument('--queries', type=int, default=2000, help='Jumlah pencarian per panjang prefix')
+    parser.add_argument('--limit', type=int, default=10, help='Top-N hasil')
+    args = parser.parse_args()
+
+    setup_django()
+    from app.models import Customer
+    from app.phone_utils import normalize_phone, phone_index
+
+    rng = random.Random(42)
+    numbers = rng.sample(range(10**9, 10**10), args.customers)
+    customers = []
+    for i, number in enumerate(numbers):
+        phone = rng.choice(FORMATS).format(f'8{number}')[:20]
+        customers.append(Customer(name=f'Pelanggan {i}', phone=phone, phone_normalized=normalize_phone(phone)))
+    Customer.objects.bulk_create(customers, batch_size=2000)
+
+    start = time.perf_counter()
+    phone_index.load()
+    print(f'{args.customers:,} pelanggan, muat indeks: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    for length in (2, 4, 6, 8):
+        queries = ['08' + str(rng.choice(numbers))[:length] for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            phone_index.search(query, limit=args.limit)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        start = time.perf_counter()
+        for query in queries[:20]:
+            list(Customer.objects.filter(phone__icontains=query[1:]).values('id', 'name', 'phone')[:args.limit])
+        icontains = (time.perf_counter() - start) / 20
+
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(
+            f'prefix {len(queries[0]):>2} digit: indeks p50 {p50:6.1f} µs, p99 {p99:6.1f} µs | '
+            f'icontains {icontains * 1000:6.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark serialisasi halaman 1.000 transaksi: TransactionSerializer vs TransactionReadSerializer (values()).
+
+    python -m benchmarks.read_serializers --rows 1000 --items 3
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000, help='Jumlah transaksi per halaman')
+    parser.add_argument('--items', type=int, default=3, help='Item per transaksi')
+    parser.add_argument('--repeat', type=int, default=10, help='Jumlah pengulangan (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from app.models import Transaction
+    from app.serializers import TransactionReadSerializer, TransactionSerializer
+
+    user, customer, service = create_fixtures()
+    generate_transactions(args.rows, args.items, customer, service, user)
+
+    def model_serializer():
+        return TransactionSerializer(Transaction.objects.with_details()[:args.rows], many=True).data
+
+    def read_serializer():
+        return TransactionReadSerializer(TransactionReadSerializer.values(Transaction.objects.all())[:args.rows]).data
+
+    renderer = JSONRenderer()
+    same = renderer.render(model_serializer()) == renderer.render(read_serializer())
+    print(f'{args.rows} transaksi x {args.items} item, output identik: {same}')
+
+    baseline = best_of(model_serializer, args.repeat)
+    fast = best_of(read_serializer, args.repeat)
+    print(f"{'TransactionSerializer':<26}: {baseline * 1000:8.1f} ms")
+    print(f"{'TransactionReadSerializer':<26}: {fast * 1000:8.1f} ms ({baseline / fast:.1f}x lebih cepat)")
+
+
+if __name__ == '__main__':
+    main()
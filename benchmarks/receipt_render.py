@@ -0,0 +1,61 @@
+"""Benchmark render struk thermal (58/80 mm) dibanding struk A4 ReportLab.
+
+    python -m benchmarks.receipt_render --items 5
+"""
+import argparse
+import timeit
+from decimal import Decimal
+
+from benchmarks.common import setup_django
+
+
+def sample_invoice(items):
+    return {
+        'invoice_number': 'INV-20260131-0001',
+        'received_at': '31/01/2026 10:00',
+        'cashier_name': 'kasir1',
+        'customer_name': 'Budi Santoso',
+        'customer_phone': '081234567890',
+        'items': [
+            {
+                'service_name': 'Cuci Setrika Kiloan',
+                'quantity': Decimal('2.50'),
+                'unit': 'kg',
+                'unit_price': Decimal('7000.00'),
+                'subtotal': Decimal('17500.00'),
+            }
+            for _ in range(items)
+        ],
+        'total_amount': Decimal('17500.00') * items,
+        'discount': Decimal('1000.00'),
+        'final_amount': Decimal('17500.00') * items - Decimal('1000.00'),
+        'paid_amount': Decimal('100000.00'),
+        'status_display': 'Diterima',
+        'estimated_completion': '02/02/2026 10:00',
+        'notes': 'Pisahkan pakaian putih',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=5, help='Item per struk')
+    parser.add_argument('--number', type=int, default=2000, help='Jumlah render per format')
+    args = parser.parse_args()
+
+    setup_django()
+    from app.pdf_utils import render_invoice_pdf
+    from app.receipt_utils import RECEIPT_TEMPLATES
+
+    data = sample_invoice(args.items)
+    cases = [('A4 ReportLab', lambda: render_invoice_pdf(data), max(1, args.number // 20))]
+    for paper, template in RECEIPT_TEMPLATES.items():
+        cases.append((f'{paper} mm PDF', lambda t=template: t.render_pdf(data), args.number))
+        cases.append((f'{paper} mm ESC/POS', lambda t=template: t.render_escpos(data), args.number))
+
+    for label, render, number in cases:
+        per_call = min(timeit.repeat(render, number=number, repeat=3)) / number
+        print(f'{label:<16}: {per_call * 1e6:9.1f} µs/struk  ({len(render()):,} byte)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Stress test SQLite: beberapa kasir menyimpan transaksi sementara laporan berjalan.
+
+Membandingkan profil bawaan Django (journal DELETE, BEGIN biasa, koneksi
+ditutup setiap request) dengan profil di core/settings.py (WAL, PRAGMA,
+BEGIN IMMEDIATE, koneksi persisten). Tiap profil berjalan di proses dan
+database sendiri.
+
+    python -m benchmarks.sqlite_concurrency --writers 8 --readers 2 --seconds 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import setup_django, create_fixtures, generate_transactions
+
+
+PROFILES = ['default', 'tuned']
+
+
+def run_profile(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    from django.conf import settings
+    if args.profile == 'default':
+        settings.DATABASES['default'].update(OPTIONS={}, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+    setup_django()
+
+    from decimal import Decimal
+    from django.db import close_old_connections, connection
+    from django.db.models import Count, Sum
+    from django.utils import timezone
+    from app.models import Transaction
+
+    user, customer, service = create_fixtures()
+    generate_transactions(args.transactions, 2, customer, service, user, days=30)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+    connection.close()
+
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    latencies = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    barrier = threading.Barrier(args.writers + args.readers)
+    items = [{'service': service, 'quantity': Decimal('2'), 'unit_price': Decimal('5000')}] * 2
+    since = timezone.now() - timezone.timedelta(days=30)
+
+    def worker(kind):
+        barrier.wait()
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                if kind == 'writes':
+                    Transaction.create_with_items(items, customer=customer, cashier=user)
+                else:
+                    Transaction.objects.filter(created_at__gte=since).aggregate(
+                        count=Count('pk'), revenue=Sum('final_amount'),
+                    )
+                kind_count, elapsed = kind, time.perf_counter() - start
+            except Exception:
+                kind_count, elapsed = 'errors', None
+            finally:
+                # Sama dengan akhir request: tutup koneksi kecuali CONN_MAX_AGE mengizinkan
+                close_old_connections()
+            with lock:
+                counts[kind_count] += 1
+                if kind == 'writes' and elapsed is not None:
+                    latencies.append(elapsed)
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=('writes',)) for _ in range(args.writers)]
+    threads += [threading.Thread(target=worker, args=('reads',)) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(
+        f"{args.profile:<8} ({journal_mode:<6}): "
+        f"{counts['writes'] / args.seconds:7.1f} tulis/s, {counts['reads'] / args.seconds:7.1f} laporan/s, "
+        f"p99 tulis {p99:7.1f} ms, error {counts['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=8, help='Thread kasir yang menyimpan transaksi')
+    parser.add_argument('--readers', type=int, default=2, help='Thread laporan')
+    parser.add_argument('--seconds', type=float, default=10, help='Durasi per profil')
+    parser.add_argument('--transactions', type=int, default=20000, help='Transaksi awal di database')
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        return run_profile(args)
+
+    print(f'{args.writers} penulis, {args.readers} pembaca, {args.seconds:g} detik per profil')
+    for profile in PROFILES:
+        subprocess.run([sys.executable, '-m', 'benchmarks.sqlite_concurrency', '--profile', profile, *sys.argv[1:]], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark autentikasi token: TokenAuthentication bawaan vs CachedTokenAuthentication.
+
+    python -m benchmarks.token_auth --requests 2000
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, create_fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000, help='Jumlah request per kasus')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from app import views
+    from app.authentication import CachedTokenAuthentication, token_cache
+
+    user, _, _ = create_fixtures()
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    view = views.current_user.cls
+    for label, authentication in [
+        ('TokenAuthentication', TokenAuthentication),
+        ('CachedTokenAuthentication', CachedTokenAuthentication),
+    ]:
+        view.authentication_classes = [authentication]
+        token_cache.clear()
+        client.get('/api/auth/me/')
+
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+            client.get('/api/auth/me/')
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            client.get('/api/auth/me/')
+        per_request = (time.perf_counter() - start) / args.requests
+        print(f'{label:<26}: {len(queries)} query/request, {per_request * 1e6:7.1f} µs/request')
+    print(f"Cache: {token_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Koneksi persisten tidak dipakai di ASGI (lihat DATABASES di settings.py)
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
-application = get_asgi_application()
+# Sama seperti get_asgi_application(), dengan handler yang memakai versi async
+# view dashboard dan laporan (app.urls.async_views)
+django.setup(set_prefix=False)
+
+from app.handlers import AsyncViewASGIHandler  # noqa: E402
+
+application = AsyncViewASGIHandler()
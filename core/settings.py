@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'app.middleware.ReplicaStickinessMiddleware',
 ]
 
 # CSRF Settings untuk API
@@ -78,18 +83,70 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+# Stream event real-time (api/events/) hanya dilayani lewat ASGI, mis. uvicorn core.asgi:application
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Profil SQLite untuk banyak kasir sekaligus: WAL agar laporan (pembaca) tidak
+# memblokir penyimpanan transaksi (penulis) dan sebaliknya
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # aman untuk WAL; fsync hanya saat checkpoint
+    'busy_timeout': 20000,  # ms menunggu kunci tulis sebelum "database is locked"
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,  # negatif = KiB per koneksi
+    'temp_store': 'MEMORY',
+}
+# BEGIN IMMEDIATE: kunci tulis diambil di awal atomic() sehingga busy_timeout
+# berlaku. Dengan BEGIN biasa (deferred), blok yang membaca dulu lalu menulis
+# (mis. InvoiceSequence, trigger FTS5 yang membaca tabel indeks) langsung gagal
+# "database is locked" saat naik ke kunci tulis ketika ada penulis lain.
+SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Koneksi dipakai ulang antar request di WSGI (PRAGMA dan cache halaman
+        # tetap hangat). core/asgi.py menyetel DB_CONN_MAX_AGE=0: di ASGI koneksi
+        # melekat pada thread executor yang bisa lama menganggur, jadi ditutup
+        # di akhir setiap request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': SQLITE_TRANSACTION_MODE,
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+        },
+        # Database test berbasis file agar test konkurensi antar-thread
+        # memakai locking SQLite biasa (bukan shared-cache in-memory)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Replika baca untuk dashboard, laporan dan export (lihat app/routers.py).
+# Aktifkan dengan READ_REPLICA=replica; lokal, replika adalah salinan SQLite
+# yang diperbarui lewat `python manage.py refresh_replica --interval 10`.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.environ.get('REPLICA_DATABASE_NAME', BASE_DIR / 'db_replica.sqlite3'),
+    'TEST': {
+        'NAME': BASE_DIR / 'test_db_replica.sqlite3',
+    },
+}
+DATABASE_ROUTERS = ['app.routers.ReadReplicaRouter']
+READ_REPLICA = os.environ.get('READ_REPLICA') or None
+# Lama bacaan user kembali ke database utama setelah menulis; harus lebih
+# lama dari interval refresh replika
+REPLICA_STICKY_SECONDS = 30
+# Alias cache untuk tanda sticky; dengan beberapa worker harus cache bersama
+# (Redis/Memcached), LocMemCache hanya terlihat di proses yang menulis
+REPLICA_STICKY_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -127,18 +184,42 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Cache PDF struk (lihat app/pdf_utils.py)
+INVOICE_PDF_CACHE_DIR = BASE_DIR / 'cache' / 'invoices'
+INVOICE_PDF_CACHE_MAX_BYTES = 100 * 1024 * 1024
+# Batas struk per request transactions/batch_invoices/ (rentang lebih besar: manage.py render_invoices)
+INVOICE_BATCH_MAX = 2000
+
+# Cache autentikasi token di memori proses (lihat app/authentication.py)
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 60  # detik
+
+# Katalog layanan berversi (lihat app/catalog_utils.py); batas basi antar proses tanpa cache bersama
+SERVICE_CATALOG_TTL = 300  # detik
+
+# Stream event transaksi/dashboard (lihat app/events.py)
+EVENT_BUS_BACKEND = 'app.events.LocalBackend'  # fan-out di memori proses
+EVENT_STREAM_HEARTBEAT = 15  # detik; komentar SSE agar koneksi idle tidak diputus proxy
+EVENT_STREAM_QUEUE_SIZE = 100  # event tertunda per koneksi sebelum klien diminta memuat ulang
+EVENT_STREAM_HISTORY = 256  # event terakhir untuk melanjutkan stream (Last-Event-ID)
+EVENT_STREAM_TICKET_MAX_AGE = 60  # detik; umur tiket events/?ticket= (lihat issue_stream_ticket)
+
 # Custom User Model
 AUTH_USER_MODEL = 'app.User'
 
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'app.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -154,3 +235,6 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Terminal kasir mengirim ulang transaksi dengan kunci yang sama (lihat TransactionViewSet.create)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from 'react';
 import Layout from '@/components/Layout';
-import { dashboardAPI } from '@/lib/api';
+import { dashboardAPI, eventsAPI } from '@/lib/api';
 import { formatCurrency } from '@/lib/utils';
 
 export default function DashboardPage() {
@@ -11,6 +11,50 @@ export default function DashboardPage() {
 
   useEffect(() => {
     fetchStats();
+
+    // Terapkan selisih angka dari stream event, tanpa memuat ulang statistik
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let lastEventId = '';
+    let closed = false;
+    const applyDelta = (event: MessageEvent) => {
+      lastEventId = event.lastEventId || lastEventId;
+      const { dashboard } = JSON.parse(event.data);
+      setStats((prev: any) => {
+        if (!prev) return prev;
+        const next = { ...prev };
+        Object.entries(dashboard).forEach(([field, delta]) => {
+          next[field] = Number(prev[field] || 0) + Number(delta);
+        });
+        return next;
+      });
+    };
+    const connect = async () => {
+      try {
+        const { data } = await eventsAPI.ticket();
+        if (closed) return;
+        source = eventsAPI.connect(data.ticket, lastEventId);
+      } catch (error: any) {
+        // 501: server WSGI/runserver tanpa stream, dashboard cukup memakai data REST
+        if (error.response?.status !== 501 && !closed) retry = setTimeout(connect, 3000);
+        return;
+      }
+      ['created', 'status', 'payment', 'updated', 'deleted'].forEach((type) =>
+        source!.addEventListener(`transaction.${type}`, applyDelta)
+      );
+      source.addEventListener('reset', () => fetchStats());
+      source.onerror = () => {
+        // Reconnect bawaan EventSource memakai tiket lama yang cepat kedaluwarsa; buka ulang dengan tiket baru
+        source?.close();
+        if (!closed) retry = setTimeout(connect, 3000);
+      };
+    };
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      source?.close();
+    };
   }, []);
 
   const fetchStats = async () => {
@@ -52,6 +52,17 @@ export const dashboardAPI = {
   getStats: () => api.get('/dashboard/stats/'),
 };
 
+// Stream event real-time (SSE, hanya di server ASGI). EventSource tidak bisa mengirim header,
+// jadi URL membawa tiket berumur pendek dari ticket(), bukan token login; di WSGI ticket() gagal 501
+export const eventsAPI = {
+  ticket: () => api.post('/events/ticket/'),
+  connect: (ticket: string, lastEventId?: string) => {
+    const params = new URLSearchParams({ ticket });
+    if (lastEventId) params.set('last_event_id', lastEventId);
+    return new EventSource(`${API_URL}/events/?${params}`);
+  },
+};
+
 // Customer API
 export const customerAPI = {
   list: (params?: any) => api.get('/customers/', { params }),
@@ -75,7 +86,9 @@ export const serviceAPI = {
 export const transactionAPI = {
   list: (params?: any) => api.get('/transactions/', { params }),
   get: (id: number) => api.get(`/transactions/${id}/`),
-  create: (data: any) => api.post('/transactions/', data),
+  create: (data: any, idempotencyKey?: string) =>
+    api.post('/transactions/', data, idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : undefined),
+  sync: (transactions: any[]) => api.post('/transactions/sync/', { transactions }),
   update: (id: number, data: any) => api.put(`/transactions/${id}/`, data),
   updateStatus: (id: number, status: string) =>
     api.patch(`/transactions/${id}/update_status/`, { status }),